@@ -0,0 +1,64 @@
+"""
+Helpers shared by the benchmarks. They are imported as `_common`, which
+resolves to this file whichever directory a benchmark is run from, since
+Python puts the directory of the script it runs first on `sys.path`.
+"""
+from multiprocessing.synchronize import Event as EventType
+from selectors import DefaultSelector, EVENT_READ
+from socket import socket, create_connection
+from statistics import quantiles
+import os
+import resource
+
+
+def raise_fd_limit():
+    """
+    Raise the soft limit on open file descriptors to the hard limit.
+    """
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def run_clients(port: int, count: int, handshake: bytes, done: EventType):
+    """
+    Open `count` connections and drain them until `done` is set.
+
+    :param port: The port of the server.
+    :param count: The number of connections to open.
+    :param handshake: The handshake frame to send on each connection.
+    :param done: Set by the server when the benchmark is over.
+    """
+    raise_fd_limit()
+    selector = DefaultSelector()
+    sockets: list[socket] = []
+    for _ in range(count):
+        sock = create_connection(("127.0.0.1", port))
+        sock.sendall(handshake)
+        sock.setblocking(False)
+        selector.register(sock, EVENT_READ)
+        sockets.append(sock)
+    while not done.is_set():
+        for key, _ in selector.select(0.1):
+            try:
+                key.fileobj.recv(1 << 20)  # type: ignore[union-attr]
+            except BlockingIOError:
+                pass
+
+
+def rss():
+    """
+    :return: The current resident set size of the process, in MB.
+    """
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def percentiles(latencies: list[float]):
+    """
+    :param latencies: The measured latencies, in seconds.
+    :return: The median and the 99th percentile, in microseconds.
+    """
+    if len(latencies) < 2:
+        return float("nan"), float("nan")
+    cuts = quantiles(latencies, n=100)
+    return cuts[49] * 1e6, cuts[98] * 1e6
@@ -0,0 +1,120 @@
+"""
+Measure the throughput and latency of request/response exchanges with a
+`tcpio.Server`, with acknowledged emits and with a reply event carrying a
+request ID chosen by the application, while `IN_FLIGHT` requests are kept
+pending.
+
+The server runs in a child process, and one `tcpio.aio.AsyncClient` sends
+the requests.
+"""
+from asyncio import get_running_loop, run as run_loop
+from itertools import count
+from multiprocessing import Process, Queue
+from statistics import quantiles
+from time import monotonic
+from tcpio import Server
+from tcpio.aio import AsyncClient
+import sys
+
+REQUESTS = 20_000
+IN_FLIGHT = 64
+
+
+def serve(ports: "Queue[int]"):
+    """
+    Run a server that answers `add` requests both ways.
+
+    :param ports: Receives the port of the server.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+
+    @server.on
+    def add(client: Server.Client, a: int, b: int):
+        return a + b
+
+    @server.on
+    def add_request(client: Server.Client, request: int, a: int, b: int):
+        client.emit("add_reply", request, a + b)
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+    server.start()
+    ports.put(server.socket.getsockname()[1])
+    server.wait()
+
+
+async def drive(port: int, acknowledged: bool):
+    """
+    Send `REQUESTS` requests, `IN_FLIGHT` at a time.
+
+    :param port: The port of the server.
+    :param acknowledged: Whether to use acknowledged emits or reply events.
+    :return: The duration of the run in seconds, and the latencies of the
+        requests.
+    """
+    client = AsyncClient(f"127.0.0.1:{port}", reconnection=False)
+    await client.connect()
+    done = get_running_loop().create_future()
+    latencies: list[float] = []
+    sent = 0
+    requests = count()
+    pending: dict[int, float] = {}
+
+    def send():
+        nonlocal sent
+        sent += 1
+        if acknowledged:
+            begin = monotonic()
+            client.request("add", 1, 2, ack=lambda _: receive(begin))
+        else:
+            request = next(requests)
+            pending[request] = monotonic()
+            client.emit("add_request", request, 1, 2)
+
+    def receive(begin: float):
+        latencies.append(monotonic() - begin)
+        if sent < REQUESTS:
+            send()
+        elif len(latencies) == REQUESTS:
+            done.set_result(None)
+
+    client.on("add_reply", lambda request, _: receive(pending.pop(request)))
+    begin = monotonic()
+    for _ in range(IN_FLIGHT):
+        send()
+    await done
+    elapsed = monotonic() - begin
+    client.emit("end")
+    client.disconnect()
+    await client.wait()
+    return elapsed, latencies
+
+
+def bench(acknowledged: bool):
+    """
+    Run the benchmark against a new server.
+
+    :param acknowledged: Whether to use acknowledged emits or reply events.
+    :return: The duration of the run in seconds, and the latencies of the
+        requests.
+    """
+    ports: "Queue[int]" = Queue()
+    child = Process(target=serve, args=(ports,), daemon=True)
+    child.start()
+    results = run_loop(drive(ports.get(), acknowledged))
+    child.join()
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        REQUESTS = int(sys.argv[1])
+    print(f"{'exchange':>11} {'requests/s':>10} {'p50 us':>8} {'p99 us':>8}")
+    for acknowledged in True, False:
+        elapsed, latencies = bench(acknowledged)
+        cuts = quantiles(latencies, n=100)
+        kind = "ack" if acknowledged else "reply event"
+        print(f"{kind:>11} {REQUESTS / elapsed:>10.0f} "
+              f"{cuts[49] * 1e6:>8.0f} {cuts[98] * 1e6:>8.0f}")
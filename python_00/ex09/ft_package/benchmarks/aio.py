@@ -0,0 +1,142 @@
+"""
+Compare `tcpio.aio.AsyncServer`, on the default asyncio loop and on uvloop
+when it is installed, with the selector based `tcpio.Server`.
+
+The server runs in a child process and answers every `ping` with a `pong`,
+while `tcpio.aio.AsyncClient`s keep one ping in flight each. The round trips
+per second and the server's CPU time per round trip are reported.
+"""
+from asyncio import Event as AsyncEvent, gather, new_event_loop, \
+    run as run_loop
+from multiprocessing import Process, Queue
+from time import perf_counter, process_time
+from typing import Callable
+from tcpio import Server
+from tcpio.aio import AsyncServer, AsyncClient
+import sys
+
+CLIENT_COUNTS = 1, 100
+DURATION = 2
+KINDS = ["poll", "epoll", "asyncio"]
+try:
+    import uvloop  # type: ignore[import-not-found]
+    KINDS.append("uvloop")
+except ImportError:
+    uvloop = None
+
+
+def serve(kind: str, ports: "Queue[int]", results: "Queue[float]"):
+    """
+    Run a server that answers the pings, until a client emits `end`.
+
+    :param kind: The selector backend of a `tcpio.Server`, or the event loop
+        of a `tcpio.aio.AsyncServer`.
+    :param ports: Receives the port of the server.
+    :param results: Receives the CPU time spent between `begin` and `end`.
+    """
+    server: Server | AsyncServer
+    if kind in ("asyncio", "uvloop"):
+        server = AsyncServer("127.0.0.1:0")
+    else:
+        server = Server("127.0.0.1:0", handle_sigint=False, backend=kind)
+    begin_cpu = 0.
+
+    @server.on
+    def ping(client: Server.Client | AsyncServer.Client, data: bytes):
+        client.emit("pong", data)
+
+    @server.on
+    def begin(client: Server.Client | AsyncServer.Client):
+        nonlocal begin_cpu
+        begin_cpu = process_time()
+
+    @server.on
+    def end(client: Server.Client | AsyncServer.Client):
+        results.put(process_time() - begin_cpu)
+        server.stop()
+
+    if isinstance(server, AsyncServer):
+        async def main():
+            await server.start()
+            ports.put(server.socket.getsockname()[1])
+            await server.wait()
+
+        if kind == "asyncio":
+            loop = new_event_loop()
+        else:
+            loop = uvloop.new_event_loop()
+        loop.run_until_complete(main())
+    else:
+        server.start()
+        ports.put(server.socket.getsockname()[1])
+        server.wait()
+
+
+async def drive(port: int, count: int):
+    """
+    Run `count` clients that ping the server for `DURATION` seconds.
+
+    :param port: The port of the server.
+    :param count: The number of clients.
+    :return: The number of round trips.
+    """
+    clients = [
+        AsyncClient(f"127.0.0.1:{port}", reconnection=False)
+        for _ in range(count)
+    ]
+    await gather(*(client.connect() for client in clients))
+    round_trips = 0
+    running = count
+    finished = AsyncEvent()
+    deadline = perf_counter() + DURATION
+
+    def make_pong(client: AsyncClient) -> Callable[[bytes], None]:
+        def pong(data: bytes):
+            nonlocal round_trips, running
+            round_trips += 1
+            if perf_counter() < deadline:
+                client.emit("ping", data)
+            else:
+                running -= 1
+                if not running:
+                    finished.set()
+        return pong
+
+    clients[0].emit("begin")
+    for client in clients:
+        client.on("pong", make_pong(client))
+        client.emit("ping", bytes(16))
+    await finished.wait()
+    clients[0].emit("end")
+    for client in clients:
+        client.disconnect()
+    await gather(*(client.wait() for client in clients))
+    return round_trips
+
+
+def bench(kind: str, count: int):
+    """
+    Run the benchmark against one kind of server.
+
+    :param kind: The kind of server (see `serve`).
+    :param count: The number of clients.
+    :return: The round trips per second, and the server's CPU time per
+        round trip in microseconds.
+    """
+    ports: "Queue[int]" = Queue()
+    results: "Queue[float]" = Queue()
+    child = Process(target=serve, args=(kind, ports, results), daemon=True)
+    child.start()
+    round_trips = run_loop(drive(ports.get(), count))
+    cpu = results.get()
+    child.join()
+    return round_trips / DURATION, cpu / round_trips * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'server':>8} {'clients':>7} {'round trips/s':>13} "
+          f"{'server cpu us':>13}")
+    for count in [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS:
+        for kind in KINDS:
+            rate, cpu = bench(kind, count)
+            print(f"{kind:>8} {count:>7} {rate:>13.0f} {cpu:>13.1f}")
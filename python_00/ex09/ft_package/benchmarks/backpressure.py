@@ -0,0 +1,111 @@
+"""
+Measure the memory used by a `tcpio.Server` that keeps emitting to slow
+readers, without watermarks and with each overflow policy.
+
+Each configuration runs in its own process, so that its peak resident set
+size can be compared with the others. A child process opens the
+connections, sends their handshakes and reads each of them slowly, while
+the server emits `ROUNDS` messages of `PAYLOAD_SIZE` bytes to all of them.
+"""
+from multiprocessing import Process, Event, Queue
+from multiprocessing.synchronize import Event as EventType
+from selectors import DefaultSelector, EVENT_READ
+from socket import socket, create_connection
+from time import perf_counter, sleep
+from tcpio import Server
+import resource
+import sys
+
+CLIENTS = 20
+ROUNDS = 10_000
+PAYLOAD_SIZE = 1_024
+HIGH_WATERMARK = 256 * 1_024
+READ_SIZE = 4_096
+READ_INTERVAL = 0.01
+POLICIES: list[str | None] = [None, "drop", "disconnect", "block"]
+
+
+def run_clients(port: int, handshake: bytes, done: EventType):
+    """
+    Open `CLIENTS` connections and read them slowly until `done` is set.
+
+    :param port: The port of the server.
+    :param handshake: The handshake frame to send on each connection.
+    :param done: Set when the benchmark is over.
+    """
+    selector = DefaultSelector()
+    for _ in range(CLIENTS):
+        sock = create_connection(("127.0.0.1", port))
+        sock.sendall(handshake)
+        sock.setblocking(False)
+        selector.register(sock, EVENT_READ)
+    while not done.is_set():
+        for key, _ in selector.select(0.1):
+            try:
+                if not key.fileobj.recv(READ_SIZE):  # type: ignore
+                    selector.unregister(key.fileobj)
+            except (BlockingIOError, ConnectionError):
+                pass
+        sleep(READ_INTERVAL)
+
+
+def serve(policy: str | None, results: "Queue[tuple[float, ...]]"):
+    """
+    Emit the messages to the slow readers.
+
+    :param policy: The overflow policy, `None` for no watermarks.
+    :param results: Receives the peak queued bytes per client, the number
+        of refused messages, the number of disconnected clients, the peak
+        resident set size in MB and the duration in seconds.
+    """
+    server = Server(
+        "127.0.0.1:0",
+        handle_sigint=False,
+        high_watermark=None if policy is None else HIGH_WATERMARK,
+        overflow=policy or "drop",
+    )
+    server.start()
+    done = Event()
+    handshake = Server.Client(socket(), None, server)._handshake_frame(
+        "pickle"
+    )
+    child = Process(
+        target=run_clients,
+        args=(server.socket.getsockname()[1], handshake, done),
+        daemon=True,
+    )
+    child.start()
+    while sum(client._handshaken for client in server.clients) < CLIENTS:
+        server.sleep(0.01)
+    payload = "x" * PAYLOAD_SIZE
+    peak = refused = 0
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        for client in server.clients:
+            refused += not client.emit("message", payload)
+            peak = max(peak, client._send_queue.pending)
+        server.sleep(0.0001)
+    elapsed = perf_counter() - begin
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((
+        peak, refused, CLIENTS - len(server.clients), rss, elapsed,
+    ))
+    done.set()
+    child.join()
+    for client in server.clients:
+        client._send_queue.clear()
+    server.stop()
+
+
+if __name__ == "__main__":
+    print(f"{'policy':>10} {'peak queued KB':>14} {'refused':>8} "
+          f"{'dropped clients':>15} {'peak RSS MB':>11} {'seconds':>7}")
+    for policy in [arg if arg != "none" else None
+                   for arg in sys.argv[1:]] or POLICIES:
+        results: "Queue[tuple[float, ...]]" = Queue()
+        process = Process(target=serve, args=(policy, results))
+        process.start()
+        peak, refused, dropped, rss, elapsed = results.get()
+        process.join()
+        print(f"{str(policy):>10} {peak / 1024:>14.0f} {refused:>8.0f} "
+              f"{dropped:>15.0f} {rss:>11.0f} {elapsed:>7.2f}")
@@ -0,0 +1,89 @@
+"""
+Measure the CPU time spent by `tcpio.Server.emit` to queue one broadcast,
+compared to emitting the same message to every client one by one, as the
+number of clients and the size of the message grow.
+
+A child process opens the connections, sends their handshakes and drains
+everything the server sends.
+"""
+from multiprocessing import Process, Event
+from socket import socket
+from time import perf_counter
+from tcpio import Server
+from _common import raise_fd_limit, run_clients
+import sys
+
+CLIENT_COUNTS = 10, 1_000, 5_000
+PAYLOAD_SIZES = 16, 1_024, 65_536
+ROUNDS = 20
+
+
+def bench(server: Server, size: int, broadcast: bool):
+    """
+    Queue `ROUNDS` messages of `size` bytes on every client.
+
+    :param server: The server to emit from.
+    :param size: The size of the message.
+    :param broadcast: Whether to use `tcpio.Server.emit` or to emit to each
+        client in turn.
+    :return: The average time to queue one message on every client, in
+        microseconds.
+    """
+    payload = "x" * size
+    elapsed = 0.
+    for _ in range(ROUNDS):
+        begin = perf_counter()
+        if broadcast:
+            server.emit("message", payload)
+        else:
+            for client in server.clients:
+                client.emit("message", payload)
+        elapsed += perf_counter() - begin
+        while any(client._send_queue for client in server.clients):
+            server.sleep(0.01)
+    return elapsed / ROUNDS * 1e6
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` connected clients.
+
+    :param count: The number of clients to connect.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+    connections = 0
+
+    @server.on
+    def connection(client: Server.Client):
+        nonlocal connections
+        connections += 1
+
+    server.start()
+    done = Event()
+    handshake = Server.Client(socket(), None, server)._handshake_frame(
+        "pickle"
+    )
+    child = Process(
+        target=run_clients,
+        args=(server.socket.getsockname()[1], count, handshake, done),
+        daemon=True,
+    )
+    child.start()
+    while connections < count:
+        server.sleep()
+    for size in PAYLOAD_SIZES:
+        unicast = bench(server, size, False)
+        broadcast = bench(server, size, True)
+        print(f"{count:>6} {size:>7} {unicast:>12.0f} {broadcast:>12.0f} "
+              f"{unicast / broadcast:>7.1f}x")
+    done.set()
+    server.stop()
+    child.join()
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    print(f"{'clients':>6} {'bytes':>7} {'per-client us':>12} "
+          f"{'broadcast us':>12} {'speedup':>8}")
+    for count in [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS:
+        run(count)
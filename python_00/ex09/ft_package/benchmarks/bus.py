@@ -0,0 +1,117 @@
+"""
+Measure the fan-out latency of `tcpio.Server.emit` in prefork mode, where
+the messages reach the clients of the other workers through the broadcast
+bus.
+
+The server runs in a child process. One `tcpio.aio.AsyncClient` sends a
+`shout` with a timestamp every few milliseconds, the server broadcasts it
+to all the clients, and each client records how long the message took to
+reach it. The latencies are reported separately for the clients of the
+sender's worker and for the clients of the other workers.
+"""
+from asyncio import gather, run as run_loop, sleep as async_sleep
+from multiprocessing import Process
+from time import monotonic, sleep
+from tcpio import Server
+from tcpio.aio import AsyncClient
+from _common import percentiles
+import os
+import signal
+import sys
+
+CLIENTS = 100
+ROUNDS = 200
+INTERVAL = 0.005
+WORKER_COUNTS = 1, 2, 4
+
+
+def serve(port: int, workers: int):
+    """
+    Run a server that broadcasts the shouts with `workers` workers.
+
+    :param port: The port to bind the server to.
+    :param workers: The number of worker processes.
+    """
+    server = Server(f"127.0.0.1:{port}")
+
+    @server.on
+    def shout(client: Server.Client, sent: float):
+        server.emit("heard", sent)
+
+    @server.on
+    def whoami(client: Server.Client):
+        client.emit("pid", os.getpid())
+
+    server.start(block=True, workers=workers)
+
+
+async def drive(port: int):
+    """
+    Connect the clients and run the shouts.
+
+    :param port: The port of the server.
+    :return: The latencies of the clients of the sender's worker, and the
+        latencies of the clients of the other workers.
+    """
+    clients = [
+        AsyncClient(f"127.0.0.1:{port}", reconnection=False)
+        for _ in range(CLIENTS)
+    ]
+    await gather(*(client.connect() for client in clients))
+    pids: list[int] = [0] * CLIENTS
+    latencies: list[list[float]] = [[] for _ in range(CLIENTS)]
+    for index, client in enumerate(clients):
+        client.on("pid", lambda pid, index=index: pids.__setitem__(
+            index, pid,
+        ))
+        client.on("heard", lambda sent, index=index: latencies[index].append(
+            monotonic() - sent
+        ))
+        client.emit("whoami")
+    while not all(pids):
+        await async_sleep(0.01)
+    for _ in range(ROUNDS):
+        clients[0].emit("shout", monotonic())
+        await async_sleep(INTERVAL)
+    while sum(map(len, latencies)) < ROUNDS * CLIENTS:
+        await async_sleep(0.01)
+    for client in clients:
+        client.disconnect()
+    await gather(*(client.wait() for client in clients))
+    local = [
+        latency for pid, samples in zip(pids, latencies) if pid == pids[0]
+        for latency in samples
+    ]
+    remote = [
+        latency for pid, samples in zip(pids, latencies) if pid != pids[0]
+        for latency in samples
+    ]
+    return local, remote
+
+
+def bench(port: int, workers: int):
+    """
+    Run the benchmark against a server with `workers` workers.
+
+    :param port: The port to bind the server to.
+    :param workers: The number of worker processes.
+    :return: The latencies of the local and remote deliveries.
+    """
+    server = Process(target=serve, args=(port, workers))
+    server.start()
+    sleep(0.5)
+    try:
+        return run_loop(drive(port))
+    finally:
+        os.kill(server.pid, signal.SIGINT)  # type: ignore[arg-type]
+        server.join()
+
+
+if __name__ == "__main__":
+    print(f"{'workers':>7} {'local p50 us':>12} {'local p99 us':>12} "
+          f"{'remote p50 us':>13} {'remote p99 us':>13}")
+    counts = [int(arg) for arg in sys.argv[1:]] or WORKER_COUNTS
+    for index, workers in enumerate(counts):
+        local, remote = bench(32000 + index, workers)
+        print(f"{workers:>7} {'%12.0f %12.0f' % percentiles(local)} "
+              f"{'%13.0f %13.0f' % percentiles(remote)}")
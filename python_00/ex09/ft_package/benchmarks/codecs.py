@@ -0,0 +1,60 @@
+"""
+Measure the encode and decode throughput of every registered `tcpio` codec,
+along with the size of the messages they produce, with the event sent by
+name and by interned symbol ID.
+"""
+from time import perf_counter
+from tcpio.Codec import CODECS, Codec
+from tcpio.Message import EventRef
+
+ROUNDS = 20_000
+
+Payload = tuple[EventRef, tuple[object, ...], dict[str, object]]
+
+PAYLOADS: dict[str, Payload] = {
+    "empty": ("ping", (), {}),
+    "small": ("move", ("player-42", 12, -3.5), {"running": True}),
+    "record": ("profile", ({
+        "id": 123456,
+        "name": "Jane Doe",
+        "tags": ["admin", "beta", "eu-west"],
+        "score": 98.25,
+        "friends": list(range(20)),
+        "active": True,
+        "parent": None,
+    },), {}),
+    "text": ("chat", ("lorem ipsum dolor sit amet " * 40,), {"room": "main"}),
+}
+
+
+def bench(codec: Codec, message: Payload):
+    """
+    Measure the throughput of `codec` on `message`.
+
+    :param codec: The codec to measure.
+    :param message: The event, arguments and keyword arguments to encode.
+    :return: The encoded size in bytes, and the number of messages encoded
+        and decoded per second.
+    """
+    event, args, kwargs = message
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        data = codec.encode(event, args, kwargs)
+    encode = ROUNDS / (perf_counter() - begin)
+    view = memoryview(data)
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        codec.decode(view)
+    decode = ROUNDS / (perf_counter() - begin)
+    return len(data), encode, decode
+
+
+if __name__ == "__main__":
+    print(f"{'payload':>8} {'codec':>8} {'event':>6} {'bytes':>6} "
+          f"{'encode/s':>10} {'decode/s':>10}")
+    for payload, (event, args, kwargs) in PAYLOADS.items():
+        for name, codec in CODECS.items():
+            for ref, label in (event, "name"), (7, "symbol"):
+                size, encode, decode = bench(codec, (ref, args, kwargs))
+                print(f"{payload:>8} {name:>8} {label:>6} {size:>6} "
+                      f"{encode:>10.0f} {decode:>10.0f}")
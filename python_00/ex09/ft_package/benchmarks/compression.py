@@ -0,0 +1,104 @@
+"""
+Measure the effect of `tcpio` frame compression on realistic message mixes:
+the bytes put on the wire, the CPU time spent compressing and decompressing,
+and the resulting throughput over a bandwidth-bound link.
+"""
+from random import Random
+from time import perf_counter
+from tcpio.Codec import get_codec
+from tcpio.Compression import Compression
+
+MESSAGES = 2_000
+LINK_MBITS = 100
+SETTINGS: list[tuple[int | None, int]] = [
+    (None, -1), (256, 1), (256, 6), (1024, 1), (1024, 6), (1024, 9),
+]
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are "
+    "or his from at which but have an they you were her she there been one "
+    "all we their has would when if so no will more can out up into do any "
+    "server client event message connection player room score update state"
+).split()
+
+Message = tuple[str, tuple[object, ...], dict[str, object]]
+
+
+def text(rng: Random, size: int):
+    """
+    :param rng: The random generator to use.
+    :param size: The approximate size of the text.
+    :return: A pseudo natural language text of about `size` characters.
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(size // 5))
+
+
+def chat(rng: Random) -> Message:
+    """
+    :return: A chat message, with an occasional long paste.
+    """
+    size = 2_000 if rng.random() < 0.1 else rng.randint(10, 80)
+    return "chat", (text(rng, size),), {"room": f"room-{rng.randint(0, 9)}"}
+
+
+def telemetry(rng: Random) -> Message:
+    """
+    :return: A telemetry record.
+    """
+    return "telemetry", ({
+        "host": f"node-{rng.randint(0, 99):02}",
+        "cpu": [round(rng.random(), 3) for _ in range(16)],
+        "memory": rng.randint(1 << 20, 1 << 34),
+        "tags": rng.sample(WORDS, 5),
+    },), {}
+
+
+def documents(rng: Random) -> Message:
+    """
+    :return: A small event, or a 100 KB+ document from time to time.
+    """
+    if rng.random() < 0.05:
+        return "document", (text(rng, rng.randint(100_000, 300_000)),), {}
+    return "cursor", (rng.randint(0, 5000), rng.randint(0, 200)), {}
+
+
+MIXES = {"chat": chat, "telemetry": telemetry, "documents": documents}
+
+
+def bench(messages: list[Message], threshold: int | None, level: int):
+    """
+    Encode, compress and decompress `messages` like a `tcpio` connection.
+
+    :param messages: The messages to send.
+    :param threshold: The compression threshold.
+    :param level: The compression level.
+    :return: The payload bytes, the wire bytes and the CPU time.
+    """
+    codec = get_codec("pickle")
+    sender = Compression(threshold, level)
+    receiver = Compression()
+    payload = wire = 0
+    begin = perf_counter()
+    for event, args, kwargs in messages:
+        pkt = codec.encode(event, args, kwargs)
+        payload += len(pkt) + 8
+        if sender.should_compress(len(pkt)):
+            pkt = sender.compress(pkt)
+            codec.decode(memoryview(receiver.decompress(memoryview(pkt))))
+        else:
+            codec.decode(memoryview(pkt))
+        wire += len(pkt) + 8
+    return payload, wire, perf_counter() - begin
+
+
+if __name__ == "__main__":
+    print(f"{'mix':>10} {'threshold':>9} {'level':>5} {'ratio':>6} "
+          f"{'cpu us/msg':>10} {'MB/s @ ' + str(LINK_MBITS) + ' Mbit/s':>18}")
+    for name, make in MIXES.items():
+        rng = Random(0)
+        messages = [make(rng) for _ in range(MESSAGES)]
+        for threshold, level in SETTINGS:
+            payload, wire, cpu = bench(messages, threshold, level)
+            seconds = wire * 8 / (LINK_MBITS * 1e6) + cpu
+            print(f"{name:>10} {str(threshold):>9} {level:>5} "
+                  f"{wire / payload:>6.2f} {cpu / MESSAGES * 1e6:>10.1f} "
+                  f"{payload / seconds / 1e6:>18.1f}")
@@ -0,0 +1,111 @@
+"""
+Measure the cost of dispatching one incoming event in `tcpio.Server.sleep`
+as the number of connected clients grows.
+
+A child process opens the connections, sends their handshakes and writes
+`ping` frames on randomly chosen ones, while the server counts them.
+"""
+from multiprocessing import Process, Event
+from multiprocessing.synchronize import Event as EventType
+from random import Random
+from socket import socket, create_connection
+from time import perf_counter
+from tcpio import Server
+from tcpio.Codec import get_codec
+from _common import raise_fd_limit
+import sys
+
+CLIENT_COUNTS = 10, 1_000, 10_000
+EVENTS = 20_000
+
+
+def encode_ping():
+    """
+    :return: A handshake frame and an encoded `ping` frame, as a
+        `tcpio.Client` would send them.
+    """
+    client = Server.Client(
+        socket(),
+        None,
+        Server("127.0.0.1:0", handle_sigint=False),
+    )
+    client._codec = get_codec("pickle")
+    return client._handshake_frame("pickle"), \
+        client._queue_message("ping", (), {})
+
+
+def run_clients(
+        port: int,
+        count: int,
+        handshake: bytes,
+        frame: bytes,
+        start: EventType,
+        done: EventType,
+):
+    """
+    Open `count` connections, then send `EVENTS` frames on random ones.
+
+    :param port: The port of the server.
+    :param count: The number of connections to open.
+    :param handshake: The handshake frame to send on each connection.
+    :param frame: The frame to send.
+    :param start: Set by the server when every connection was accepted.
+    :param done: Set by the server when the benchmark is over.
+    """
+    raise_fd_limit()
+    sockets = [create_connection(("127.0.0.1", port)) for _ in range(count)]
+    for sock in sockets:
+        sock.sendall(handshake)
+    rng = Random(0)
+    start.wait()
+    for _ in range(EVENTS):
+        rng.choice(sockets).sendall(frame)
+    done.wait()
+
+
+def bench(count: int):
+    """
+    Run the benchmark with `count` connected clients.
+
+    :param count: The number of clients to connect.
+    :return: The average dispatch time of one event, in microseconds.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+    connections = received = 0
+
+    @server.on
+    def connection(client: Server.Client):
+        nonlocal connections
+        connections += 1
+
+    @server.on
+    def ping(client: Server.Client):
+        nonlocal received
+        received += 1
+
+    server.start()
+    start, done = Event(), Event()
+    child = Process(
+        target=run_clients,
+        args=(server.socket.getsockname()[1], count, *encode_ping(), start,
+              done),
+        daemon=True,
+    )
+    child.start()
+    while connections < count:
+        server.sleep()
+    start.set()
+    begin = perf_counter()
+    while received < EVENTS:
+        server.sleep()
+    elapsed = perf_counter() - begin
+    done.set()
+    server.stop()
+    return elapsed / EVENTS * 1e6
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    counts = [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS
+    for count in counts:
+        print(f"{count:>6} clients: {bench(count):8.2f} us/event")
@@ -0,0 +1,59 @@
+"""
+Measure the cost of the event listener registry of `tcpio.IO` as the
+number of listeners of unrelated events grows: triggering an event, and
+adding then removing a per-request listener with its handle, or with
+`off(callback)`.
+"""
+from time import perf_counter
+from tcpio import Server
+import sys
+
+LISTENER_COUNTS = 10, 1_000, 100_000
+OPERATIONS = 200_000
+
+
+def noop(*args: object):
+    """
+    A listener that does nothing.
+    """
+
+
+def reply(*args: object):
+    """
+    A per-request listener that does nothing.
+    """
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` unrelated listeners.
+
+    :param count: The number of listeners of other events.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+    for index in range(count):
+        server.on(f"event.{index}", lambda *args: None)
+    server.on("chat.*", noop)
+    server.on("ping", noop)
+    begin = perf_counter()
+    for _ in range(OPERATIONS):
+        server._trigger_event("ping", None)
+    trigger = (perf_counter() - begin) / OPERATIONS
+    begin = perf_counter()
+    for _ in range(OPERATIONS):
+        server.add_listener("reply", reply).remove()
+    handle = (perf_counter() - begin) / OPERATIONS
+    begin = perf_counter()
+    for _ in range(OPERATIONS):
+        server.on("reply", reply)
+        server.off(reply)
+    off = (perf_counter() - begin) / OPERATIONS
+    print(f"{count:>9} {trigger * 1e9:>10.0f} {handle * 1e9:>10.0f} "
+          f"{off * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    print(f"{'listeners':>9} {'trigger ns':>10} {'handle ns':>10} "
+          f"{'off ns':>10}")
+    for count in [int(arg) for arg in sys.argv[1:]] or LISTENER_COUNTS:
+        run(count)
@@ -0,0 +1,69 @@
+"""
+Measure how a `tcpio.Server` with heartbeats reaps dead peers: the time it
+takes to reap them all, the CPU time spent per heartbeat check, and the
+resident memory of the server before, while and after holding them.
+
+A child process opens the connections and sends their handshakes, then
+reads them without ever answering a ping, like peers behind a dropped NAT
+mapping would.
+"""
+from multiprocessing import Process, Event
+from socket import socket
+from time import monotonic, process_time
+from tcpio import Server
+from _common import raise_fd_limit, rss, run_clients
+import sys
+
+CLIENT_COUNTS = 1_000, 5_000
+INTERVAL = 1.
+MISSES = 1
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` dead peers.
+
+    :param count: The number of dead peers.
+    """
+    server = Server(
+        "127.0.0.1:0",
+        handle_sigint=False,
+        heartbeat_interval=INTERVAL,
+        heartbeat_misses=MISSES,
+    )
+    server.start()
+    before = rss()
+    done = Event()
+    handshake = Server.Client(socket(), None, server)._handshake_frame(
+        "pickle"
+    )
+    child = Process(
+        target=run_clients,
+        args=(server.socket.getsockname()[1], count, handshake, done),
+        daemon=True,
+    )
+    child.start()
+    while server.reaped + sum(
+        client._handshaken for client in server.clients
+    ) < count:
+        server.sleep(0.01)
+    holding = rss()
+    begin, cpu = monotonic(), process_time()
+    while server.reaped < count:
+        server.sleep(0.1)
+    elapsed, cpu = monotonic() - begin, process_time() - cpu
+    after = rss()
+    checks = count * (MISSES + 2)
+    print(f"{count:>7} {elapsed:>9.2f} {cpu / checks * 1e6:>9.1f} "
+          f"{before:>10.1f} {holding:>11.1f} {after:>9.1f}")
+    done.set()
+    server.stop()
+    child.join()
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    print(f"{'clients':>7} {'reaped s':>9} {'check us':>9} "
+          f"{'before MB':>10} {'holding MB':>11} {'after MB':>9}")
+    for count in [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS:
+        run(count)
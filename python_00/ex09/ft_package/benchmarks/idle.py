@@ -0,0 +1,112 @@
+"""
+Measure the CPU usage of an idle `tcpio.Server` holding many connections,
+and the latency of waking it up with an incoming message.
+
+The server runs in a child process and reports its own CPU time, while this
+process keeps the idle connections open and sends `ping` events with a
+`tcpio.Client`.
+"""
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import Connection
+from socket import create_connection
+from statistics import quantiles
+from time import perf_counter, sleep
+from tcpio import Server, Client
+import resource
+import sys
+
+IDLE_CONNECTIONS = 1_000
+IDLE_SECONDS = 2.0
+PINGS = 1_000
+
+
+def cpu_time():
+    """
+    :return: The CPU time used by the current process, in seconds.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_server(pipe: Connection, backend: str | None):
+    """
+    Run a server that answers `ping` with `pong` and `cpu` with its CPU time.
+
+    :param pipe: The pipe to send the server's port to.
+    :param backend: The selector backend of the server.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False, backend=backend)
+
+    @server.on
+    def ping(client: Server.Client):
+        client.emit("pong")
+
+    @server.on
+    def cpu(client: Server.Client):
+        client.emit("cpu", cpu_time())
+
+    @server.on
+    def stop(client: Server.Client):
+        server.stop()
+
+    server.start()
+    pipe.send(server.socket.getsockname()[1])
+    server.wait()
+
+
+def bench(backend: str | None):
+    """
+    Run the benchmark against a server using the selector backend `backend`.
+
+    :param backend: The selector backend of the server.
+    """
+    parent, child = Pipe()
+    process = Process(target=run_server, args=(child, backend), daemon=True)
+    process.start()
+    port = parent.recv()
+    idle = [
+        create_connection(("127.0.0.1", port))
+        for _ in range(IDLE_CONNECTIONS)
+    ]
+    client = Client(f"127.0.0.1:{port}", handle_sigint=False, backend=backend)
+    replies: list[object] = []
+    client.on("pong", lambda: replies.append(None))
+    client.on("cpu", replies.append)
+    client.connect()
+
+    def request(event: str):
+        replies.clear()
+        client.emit(event)
+        while not replies:
+            client.sleep()
+        return replies[0]
+
+    before = request("cpu")
+    sleep(IDLE_SECONDS)
+    after = request("cpu")
+    assert isinstance(before, float) and isinstance(after, float)
+    latencies: list[float] = []
+    for _ in range(PINGS):
+        begin = perf_counter()
+        request("ping")
+        latencies.append((perf_counter() - begin) * 1e6)
+        sleep(0.001)
+    percentiles = quantiles(latencies, n=100)
+    print(
+        f"{backend or 'default':>7}: "
+        f"idle CPU {(after - before) / IDLE_SECONDS:6.1%} "
+        f"with {IDLE_CONNECTIONS} connections, "
+        f"wake-up round trip p50 {percentiles[49]:.0f} us, "
+        f"p99 {percentiles[98]:.0f} us"
+    )
+    client.emit("stop")
+    client.sleep(0.1)
+    client.disconnect()
+    process.join()
+    for sock in idle:
+        sock.close()
+
+
+if __name__ == "__main__":
+    for backend in sys.argv[1:] or ["epoll", "poll"]:
+        bench(backend)
@@ -0,0 +1,103 @@
+"""
+Measure the latency of a fast `tcpio.Server` event while other clients keep
+triggering a slow, blocking event, with the slow listener running on the
+event loop and then offloaded to the thread pool shared by `tcpio`.
+
+The server runs in a child process. One `tcpio.aio.AsyncClient` sends a
+`ping` with a timestamp every few milliseconds and records when the `pong`
+comes back, while the other clients keep one `slow` request in flight each.
+"""
+from asyncio import gather, run as run_loop, sleep as async_sleep
+from multiprocessing import Process, Queue
+from time import monotonic, sleep
+from tcpio import Server
+from tcpio.aio import AsyncClient
+from _common import percentiles
+import sys
+
+SLOW_CLIENTS = 4
+SLOW_DURATION = 0.05
+ROUNDS = 200
+INTERVAL = 0.005
+
+
+def serve(threaded: bool, ports: "Queue[int]"):
+    """
+    Run a server with a fast `ping` listener and a slow `slow` listener.
+
+    :param threaded: Whether to offload the slow listener.
+    :param ports: Receives the port of the server.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+
+    @server.on
+    def ping(client: Server.Client, sent: float):
+        client.emit("pong", sent)
+
+    @server.on(threaded=threaded, ordered=True)
+    def slow(client: Server.Client):
+        sleep(SLOW_DURATION)
+        client.emit("slow")
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+    server.start()
+    ports.put(server.socket.getsockname()[1])
+    server.wait()
+
+
+async def drive(port: int):
+    """
+    Keep the slow requests in flight while pinging the server.
+
+    :param port: The port of the server.
+    :return: The latencies of the pings.
+    """
+    clients = [
+        AsyncClient(f"127.0.0.1:{port}", reconnection=False)
+        for _ in range(SLOW_CLIENTS + 1)
+    ]
+    await gather(*(client.connect() for client in clients))
+    pinger, *slow_clients = clients
+    latencies: list[float] = []
+    pinger.on("pong", lambda sent: latencies.append(monotonic() - sent))
+    for client in slow_clients:
+        client.on("slow", lambda client=client: client.emit("slow"))
+        client.emit("slow")
+    for _ in range(ROUNDS):
+        pinger.emit("ping", monotonic())
+        await async_sleep(INTERVAL)
+    while len(latencies) < ROUNDS:
+        await async_sleep(0.01)
+    pinger.emit("end")
+    for client in clients:
+        client.disconnect()
+    await gather(*(client.wait() for client in clients))
+    return latencies
+
+
+def bench(threaded: bool):
+    """
+    Run the benchmark against one server.
+
+    :param threaded: Whether the server offloads the slow listener.
+    :return: The latencies of the pings.
+    """
+    ports: "Queue[int]" = Queue()
+    child = Process(target=serve, args=(threaded, ports), daemon=True)
+    child.start()
+    latencies = run_loop(drive(ports.get()))
+    child.join()
+    return latencies
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        SLOW_DURATION = float(sys.argv[1]) / 1000
+    print(f"{'slow listener':>13} {'ping p50 us':>11} {'ping p99 us':>11}")
+    for threaded in False, True:
+        p50, p99 = percentiles(bench(threaded))
+        kind = "offloaded" if threaded else "inline"
+        print(f"{kind:>13} {p50:>11.0f} {p99:>11.0f}")
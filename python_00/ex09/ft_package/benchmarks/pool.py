@@ -0,0 +1,89 @@
+"""
+Measure how a single `tcpio.ClientPool` drives many connections: the time
+it takes to connect and handshake all of them, the resident memory of the
+pool, and the acknowledged round trips per second when every connection
+keeps one request in flight.
+
+The server runs in a child process.
+"""
+from multiprocessing import Process, Queue
+from time import monotonic, process_time
+from tcpio import Server, ClientPool
+from _common import raise_fd_limit, rss
+import sys
+
+CLIENT_COUNTS = 100, 1_000, 10_000
+DURATION = 2.
+
+
+def serve(ports: "Queue[int]"):
+    """
+    Run a server that answers the `ping` requests, until a client emits
+    `end`.
+
+    :param ports: Receives the port of the server.
+    """
+    raise_fd_limit()
+    server = Server("127.0.0.1:0", handle_sigint=False)
+
+    @server.on
+    def ping(client: Server.Client, sequence: int):
+        return sequence
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+    server.start()
+    ports.put(server.socket.getsockname()[1])
+    server.wait()
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` connections.
+
+    :param count: The number of connections.
+    """
+    ports: "Queue[int]" = Queue()
+    child = Process(target=serve, args=(ports,), daemon=True)
+    child.start()
+    address = f"127.0.0.1:{ports.get()}"
+    before = rss()
+    pool = ClientPool(connect_timeout=30, handle_sigint=False)
+    begin = monotonic()
+    connections = [pool.connect(address) for _ in range(count)]
+    while not all(connection._handshaken for connection in connections):
+        pool.sleep(0.01)
+    connect = monotonic() - begin
+    holding = rss()
+    round_trips = 0
+    deadline = monotonic() + DURATION
+
+    def make_send(connection: ClientPool.Connection):
+        def send(sequence: object):
+            nonlocal round_trips
+            round_trips += 1
+            if monotonic() < deadline:
+                connection.request("ping", sequence, ack=send)
+        return send
+
+    begin, cpu = monotonic(), process_time()
+    for connection in connections:
+        connection.request("ping", 0, ack=make_send(connection))
+    while len(pool._acks):
+        pool.sleep(0.01)
+    elapsed, cpu = monotonic() - begin, process_time() - cpu
+    connections[0].emit("end")
+    pool.close()
+    child.join()
+    print(f"{count:>7} {connect:>9.2f} {holding - before:>8.1f} "
+          f"{round_trips / elapsed:>13.0f} {cpu / round_trips * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    print(f"{'clients':>7} {'connect s':>9} {'pool MB':>8} "
+          f"{'round trips/s':>13} {'cpu us':>9}")
+    for count in [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS:
+        run(count)
@@ -0,0 +1,122 @@
+"""
+Measure how the throughput of `tcpio.Server` scales with the number of
+prefork workers.
+
+The server runs in a child process, and several load processes run
+`tcpio.aio.AsyncClient`s that keep one ping in flight each, for
+`DURATION` seconds. The total round trips per second are reported.
+"""
+from asyncio import Event, gather, run as run_loop
+from multiprocessing import Process, Queue
+from time import perf_counter, sleep
+from tcpio import Server
+from tcpio.aio import AsyncClient
+import os
+import signal
+import sys
+
+DURATION = 3
+CLIENTS_PER_PROCESS = 50
+LOAD_PROCESSES = os.cpu_count() or 1
+
+
+def serve(port: int, workers: int):
+    """
+    Run a server that answers the pings with `workers` workers.
+
+    :param port: The port to bind the server to.
+    :param workers: The number of worker processes.
+    """
+    server = Server(f"127.0.0.1:{port}")
+
+    @server.on
+    def ping(client: Server.Client, data: bytes):
+        client.emit("pong", data)
+
+    server.start(block=True, workers=workers)
+
+
+async def drive(port: int):
+    """
+    Run `CLIENTS_PER_PROCESS` clients that ping the server for `DURATION`
+    seconds.
+
+    :param port: The port of the server.
+    :return: The number of round trips.
+    """
+    clients = [
+        AsyncClient(f"127.0.0.1:{port}", reconnection=False)
+        for _ in range(CLIENTS_PER_PROCESS)
+    ]
+    await gather(*(client.connect() for client in clients))
+    round_trips = 0
+    running = len(clients)
+    finished = Event()
+    deadline = perf_counter() + DURATION
+
+    def make_pong(client: AsyncClient):
+        def pong(data: bytes):
+            nonlocal round_trips, running
+            round_trips += 1
+            if perf_counter() < deadline:
+                client.emit("ping", data)
+            else:
+                running -= 1
+                if not running:
+                    finished.set()
+        return pong
+
+    for client in clients:
+        client.on("pong", make_pong(client))
+        client.emit("ping", bytes(16))
+    await finished.wait()
+    for client in clients:
+        client.disconnect()
+    await gather(*(client.wait() for client in clients))
+    return round_trips
+
+
+def load(port: int, results: "Queue[int]"):
+    """
+    Run one load process.
+
+    :param port: The port of the server.
+    :param results: Receives the number of round trips.
+    """
+    results.put(run_loop(drive(port)))
+
+
+def bench(port: int, workers: int):
+    """
+    Run the benchmark against a server with `workers` workers.
+
+    :param port: The port to bind the server to.
+    :param workers: The number of worker processes.
+    :return: The round trips per second.
+    """
+    server = Process(target=serve, args=(port, workers))
+    server.start()
+    sleep(0.5)
+    results: "Queue[int]" = Queue()
+    loaders = [
+        Process(target=load, args=(port, results))
+        for _ in range(LOAD_PROCESSES)
+    ]
+    for loader in loaders:
+        loader.start()
+    round_trips = sum(results.get() for _ in loaders)
+    for loader in loaders:
+        loader.join()
+    os.kill(server.pid, signal.SIGINT)  # type: ignore[arg-type]
+    server.join()
+    return round_trips / DURATION
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    counts = [int(arg) for arg in sys.argv[1:]] or sorted({1, 2, 4, cpus})
+    print(f"{cpus} CPUs, {LOAD_PROCESSES} load processes")
+    print(f"{'workers':>7} {'round trips/s':>13}")
+    for index, workers in enumerate(counts):
+        rate = bench(31000 + index, workers)
+        print(f"{workers:>7} {rate:>13.0f}")
@@ -0,0 +1,88 @@
+"""
+Measure how long a `tcpio.Client` takes to reconnect after its server
+restarts: the server is stopped, a new one is started on the same port
+`gap` seconds after the old one exited, and the time from the new server
+listening to the client being connected again is measured, with the
+default first reconnection delay and with the former default of half a
+second.
+
+The servers run in child processes.
+"""
+from multiprocessing import Process, Queue
+from threading import Thread
+from time import monotonic, sleep
+from tcpio import Server, Client
+import sys
+
+GAPS = 0., 0.05, 0.2, 1.
+DELAYS = 0.05, 0.5
+RUNS = 5
+
+
+def serve(port: int, started: "Queue[tuple[int, float]]"):
+    """
+    Run a server until a client emits `end`.
+
+    :param port: The port to bind the server to, 0 for any.
+    :param started: Receives the port of the server and the time it
+        started listening.
+    """
+    server = Server(f"127.0.0.1:{port}", handle_sigint=False)
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+    server.start()
+    started.put((server.socket.getsockname()[1], monotonic()))
+    server.wait()
+
+
+def restart(gap: float, delay: float):
+    """
+    Restart the server once.
+
+    :param gap: The number of seconds the server is down for.
+    :param delay: The first reconnection delay of the client.
+    :return: The number of seconds from the new server listening to the
+        client being connected.
+    """
+    started: "Queue[tuple[int, float]]" = Queue()
+    server = Process(target=serve, args=(0, started), daemon=True)
+    server.start()
+    port, _ = started.get()
+    client = Client(
+        f"127.0.0.1:{port}",
+        reconnection_delay=delay,
+        handle_sigint=False,
+    )
+    client.connect()
+    client.emit("end")
+    client.wait()
+    server.join()
+
+    def start_later():
+        sleep(gap)
+        Process(target=serve, args=(port, started), daemon=True).start()
+
+    Thread(target=start_later, daemon=True).start()
+    client.connect()
+    connected = monotonic()
+    _, listening = started.get()
+    client.emit("end")
+    client.wait()
+    return connected - listening
+
+
+if __name__ == "__main__":
+    print(f"{'gap s':>6} " + " ".join(
+        f"{f'delay {delay}':>10}" for delay in DELAYS
+    ) + "  (median ms to reconnect)")
+    for gap in [float(arg) for arg in sys.argv[1:]] or GAPS:
+        medians = []
+        for delay in DELAYS:
+            samples = sorted(restart(gap, delay) for _ in range(RUNS))
+            medians.append(samples[len(samples) // 2])
+        print(f"{gap:>6.2f} " + " ".join(
+            f"{median * 1e3:>10.1f}" for median in medians
+        ))
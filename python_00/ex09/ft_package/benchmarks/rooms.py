@@ -0,0 +1,87 @@
+"""
+Measure the CPU time spent by `tcpio.Server.to(room).emit` to queue one
+message on the members of a room, compared to filtering `server.clients` and
+emitting to each member, as the number of connected clients grows while the
+room keeps `ROOM_SIZE` members.
+
+A child process opens the connections, sends their handshakes and drains
+everything the server sends.
+"""
+from multiprocessing import Process, Event
+from socket import socket
+from time import perf_counter
+from tcpio import Server
+from _common import raise_fd_limit, run_clients
+import sys
+
+CLIENT_COUNTS = 100, 1_000, 5_000
+ROOM_SIZE = 100
+ROUNDS = 50
+
+
+def bench(server: Server, members: set[int], indexed: bool):
+    """
+    Queue `ROUNDS` messages on the members of the room.
+
+    :param server: The server to emit from.
+    :param members: The identifiers of the members of the room, for the
+        filtering loop.
+    :param indexed: Whether to use `tcpio.Server.to` or to filter the
+        clients.
+    :return: The average time to queue one message on the members, in
+        microseconds.
+    """
+    elapsed = 0.
+    for _ in range(ROUNDS):
+        begin = perf_counter()
+        if indexed:
+            server.to("room").emit("message", "hello")
+        else:
+            for client in server.clients:
+                if id(client) in members:
+                    client.emit("message", "hello")
+        elapsed += perf_counter() - begin
+        while any(client._send_queue for client in server.clients):
+            server.sleep(0.01)
+    return elapsed / ROUNDS * 1e6
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` connected clients.
+
+    :param count: The number of clients to connect.
+    """
+    server = Server("127.0.0.1:0", handle_sigint=False)
+    server.start()
+    done = Event()
+    handshake = Server.Client(socket(), None, server)._handshake_frame(
+        "pickle"
+    )
+    child = Process(
+        target=run_clients,
+        args=(server.socket.getsockname()[1], count, handshake, done),
+        daemon=True,
+    )
+    child.start()
+    while sum(client._handshaken for client in server.clients) < count:
+        server.sleep(0.01)
+    members = set()
+    for client in server.clients[::max(count // ROOM_SIZE, 1)][:ROOM_SIZE]:
+        client.join("room")
+        members.add(id(client))
+    filtered = bench(server, members, False)
+    indexed = bench(server, members, True)
+    print(f"{count:>7} {len(members):>7} {filtered:>11.0f} {indexed:>10.0f} "
+          f"{filtered / indexed:>7.1f}x")
+    done.set()
+    server.stop()
+    child.join()
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    print(f"{'clients':>7} {'members':>7} {'filter us':>11} "
+          f"{'to(room) us':>10} {'speedup':>8}")
+    for count in [int(arg) for arg in sys.argv[1:]] or CLIENT_COUNTS:
+        run(count)
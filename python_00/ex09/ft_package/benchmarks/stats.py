@@ -0,0 +1,73 @@
+"""
+Measure the overhead of the runtime metrics of `tcpio.Server` on the hot
+path: decoding a message, running its listener and queuing a reply, with
+and without `collect_stats`.
+
+The frames are written straight into the receive buffer of a
+`tcpio.Server.Client`, so that only the work of the event loop is timed.
+"""
+from socket import socket
+from time import perf_counter
+from tcpio import Server
+from tcpio.Codec import get_codec
+import sys
+
+MESSAGES = 100_000
+BATCH = 100
+
+
+def client(collect_stats: bool):
+    """
+    :param collect_stats: Whether the server collects metrics.
+    :return: A handshaken client of a server that echoes the `ping`
+        messages.
+    """
+    server = Server(
+        "127.0.0.1:0",
+        handle_sigint=False,
+        collect_stats=collect_stats,
+    )
+
+    @server.on
+    def ping(client: Server.Client, sequence: int):
+        client.emit("pong", sequence)
+
+    receiver = Server.Client(socket(), ("127.0.0.1", 0), server)
+    receiver._codec = get_codec("pickle")
+    receiver._handshaken = True
+    return receiver
+
+
+def bench(collect_stats: bool):
+    """
+    Dispatch `MESSAGES` messages, `BATCH` frames per read.
+
+    :param collect_stats: Whether the server collects metrics.
+    :return: The average time to dispatch one message, in nanoseconds.
+    """
+    receiver = client(collect_stats)
+    sender = client(False)
+    frames = b"".join(
+        sender._queue_message("ping", (sequence,), {})
+        for sequence in range(BATCH)
+    )
+    elapsed = 0.
+    for _ in range(MESSAGES // BATCH):
+        buffer = receiver._recv_buffer
+        buffer.get_buffer()[:len(frames)] = frames
+        buffer.advance(len(frames))
+        begin = perf_counter()
+        receiver._dispatch()
+        elapsed += perf_counter() - begin
+        receiver._send_queue.clear()
+    return elapsed / MESSAGES * 1e9
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        MESSAGES = int(sys.argv[1])
+    off, on = bench(False), bench(True)
+    print(f"{'stats':>5} {'ns/message':>10}")
+    print(f"{'off':>5} {off:>10.0f}")
+    print(f"{'on':>5} {on:>10.0f}")
+    print(f"overhead {on / off - 1:.1%}")
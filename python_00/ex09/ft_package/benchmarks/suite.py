@@ -0,0 +1,275 @@
+"""
+End-to-end throughput and latency benchmark of `tcpio` over loopback.
+
+A `tcpio.Server` runs in a child process, and `tcpio.aio.AsyncClient`s
+connected to it send messages of a given size for a given duration, in two
+modes:
+
+- `unicast`: every client keeps one `echo` message in flight, which the
+  server sends back to it.
+- `broadcast`: one client emits a `broadcast` message, which the server
+  sends to every client, and the next one is emitted once every client
+  received it.
+
+For each mode, payload size and number of clients, the messages delivered
+per second and the median and 99th percentile of their latency (from the
+emit to the reception by a client) are reported, and saved as JSON with a
+description of the machine, so that the runs can be compared with
+`--compare`. The combinations that would keep more than `--max-in-flight`
+bytes in flight are skipped.
+
+The clients share the machine with the server, so the results are meant to
+compare changes to `tcpio` on the same machine, not to size a deployment.
+"""
+from argparse import ArgumentParser
+from asyncio import gather, get_running_loop, run as run_loop
+from datetime import datetime, timezone
+from multiprocessing import Process, Queue
+from statistics import quantiles
+from time import monotonic
+from typing import Any
+from tcpio import Server
+from tcpio.aio import AsyncClient
+from _common import raise_fd_limit
+import json
+import os
+import platform
+
+MODES = "unicast", "broadcast"
+PAYLOAD_SIZES = 16, 1_024, 65_536, 1_048_576
+CLIENT_COUNTS = 1, 100, 1_000, 10_000
+DURATION = 2.
+MAX_IN_FLIGHT = 128 * 1_048_576
+CONNECT_BATCH = 256
+
+
+def serve(ports: "Queue[int]"):
+    """
+    Run a server that echoes the `echo` messages to their sender and sends
+    the `broadcast` messages to every client, until a client emits `end`.
+
+    :param ports: Receives the port of the server.
+    """
+    raise_fd_limit()
+    server = Server("127.0.0.1:0", handle_sigint=False)
+
+    @server.on
+    def echo(client: Server.Client, stamp: float, payload: bytes):
+        client.emit("echo", stamp, payload)
+
+    @server.on
+    def broadcast(client: Server.Client, stamp: float, payload: bytes):
+        server.emit("broadcast", stamp, payload)
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+    server.start()
+    ports.put(server.socket.getsockname()[1])
+    server.wait()
+
+
+async def drive(port: int, mode: str, size: int, count: int, duration: float):
+    """
+    Connect `count` clients and exchange messages for `duration` seconds.
+
+    :param port: The port of the server.
+    :param mode: `unicast` or `broadcast`.
+    :param size: The size of the payloads.
+    :param count: The number of clients.
+    :param duration: The number of seconds to send messages for.
+    :return: The duration of the run in seconds, and the latencies of the
+        messages delivered.
+    """
+    clients = [
+        AsyncClient(f"127.0.0.1:{port}", connect_timeout=30,
+                    reconnection=False)
+        for _ in range(count)
+    ]
+    for batch in range(0, count, CONNECT_BATCH):
+        await gather(*(
+            client.connect()
+            for client in clients[batch:batch + CONNECT_BATCH]
+        ))
+    payload = bytes(size)
+    latencies: list[float] = []
+    done = get_running_loop().create_future()
+    deadline = 0.
+    running = count if mode == "unicast" else 1
+    delivered = 0
+
+    def finish():
+        nonlocal running
+        running -= 1
+        if not running:
+            done.set_result(None)
+
+    def make_echo(client: AsyncClient):
+        def on_echo(stamp: float, _: bytes):
+            now = monotonic()
+            latencies.append(now - stamp)
+            if now < deadline:
+                client.emit("echo", now, payload)
+            else:
+                finish()
+        return on_echo
+
+    def on_broadcast(stamp: float, _: bytes):
+        nonlocal delivered
+        now = monotonic()
+        latencies.append(now - stamp)
+        delivered += 1
+        if delivered % count:
+            return
+        if now < deadline:
+            clients[0].emit("broadcast", now, payload)
+        else:
+            finish()
+
+    for client in clients:
+        if mode == "unicast":
+            client.on("echo", make_echo(client))
+        else:
+            client.on("broadcast", on_broadcast)
+    begin = monotonic()
+    deadline = begin + duration
+    if mode == "unicast":
+        for client in clients:
+            client.emit("echo", begin, payload)
+    else:
+        clients[0].emit("broadcast", begin, payload)
+    await done
+    elapsed = monotonic() - begin
+    clients[0].emit("end")
+    for client in clients:
+        client.disconnect()
+    await gather(*(client.wait() for client in clients))
+    return elapsed, latencies
+
+
+def bench(mode: str, size: int, count: int, duration: float):
+    """
+    Run one combination against a new server.
+
+    :param mode: `unicast` or `broadcast`.
+    :param size: The size of the payloads.
+    :param count: The number of clients.
+    :param duration: The number of seconds to send messages for.
+    :return: The result of the combination.
+    """
+    ports: "Queue[int]" = Queue()
+    child = Process(target=serve, args=(ports,), daemon=True)
+    child.start()
+    elapsed, latencies = run_loop(
+        drive(ports.get(), mode, size, count, duration)
+    )
+    child.join()
+    if len(latencies) > 1:
+        cuts = quantiles(latencies, n=100)
+        p50, p99 = cuts[49], cuts[98]
+    else:
+        p50 = p99 = latencies[0]
+    return {
+        "mode": mode,
+        "payload": size,
+        "clients": count,
+        "messages": len(latencies),
+        "seconds": elapsed,
+        "messages_per_second": len(latencies) / elapsed,
+        "p50_us": p50 * 1e6,
+        "p99_us": p99 * 1e6,
+    }
+
+
+def machine():
+    """
+    :return: A description of the machine and of the Python runtime.
+    """
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_row(result: dict[str, Any], baseline: dict[str, Any] | None):
+    """
+    Print a result, and its ratios to `baseline` when there is one.
+
+    :param result: The result of a combination.
+    :param baseline: The result of the same combination in a previous run.
+    """
+    line = f"{result['mode']:>9} {result['payload']:>9} " \
+        f"{result['clients']:>7} {result['messages_per_second']:>11.0f} " \
+        f"{result['p50_us']:>9.0f} {result['p99_us']:>9.0f}"
+    if baseline is not None:
+        rate = result["messages_per_second"] / \
+            baseline["messages_per_second"]
+        p99 = result["p99_us"] / baseline["p99_us"]
+        line += f" {rate:>8.2f}x {p99:>8.2f}x"
+    print(line, flush=True)
+
+
+def main():
+    """
+    Run the combinations selected on the command line.
+    """
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--payloads", nargs="+", type=int,
+                        default=PAYLOAD_SIZES, metavar="BYTES")
+    parser.add_argument("--clients", nargs="+", type=int,
+                        default=CLIENT_COUNTS, metavar="COUNT")
+    parser.add_argument("--duration", type=float, default=DURATION,
+                        metavar="SECONDS")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        metavar="BYTES")
+    parser.add_argument("--output", metavar="PATH",
+                        help="the JSON file to save the results to "
+                             "(suite-<date>.json by default)")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="a previous JSON file to compare the results "
+                             "with")
+    args = parser.parse_args()
+    raise_fd_limit()
+    baselines = {}
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baselines = {
+                (result["mode"], result["payload"], result["clients"]): result
+                for result in json.load(file)["results"]
+            }
+    report = {
+        "machine": machine(),
+        "duration": args.duration,
+        "results": [],
+        "skipped": [],
+    }
+    header = f"{'mode':>9} {'payload':>9} {'clients':>7} {'messages/s':>11} " \
+        f"{'p50 us':>9} {'p99 us':>9}"
+    if baselines:
+        header += f" {'msg/s':>9} {'p99':>9}"
+    print(header)
+    for mode in args.modes:
+        for size in args.payloads:
+            for count in args.clients:
+                if size * count > args.max_in_flight:
+                    report["skipped"].append(
+                        {"mode": mode, "payload": size, "clients": count}
+                    )
+                    continue
+                result = bench(mode, size, count, args.duration)
+                report["results"].append(result)
+                print_row(result, baselines.get((mode, size, count)))
+    output = args.output or datetime.now().strftime("suite-%Y%m%d-%H%M%S.json")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measure the cost of the timers of a `tcpio` event loop as their number
+grows, with the access pattern of per-connection idle timeouts: each timer
+is cancelled and rescheduled over and over, while the event loop asks for
+its next timeout and runs the due timers between the reschedules.
+
+Also report the number of heap entries left, which stays proportional to
+the number of live timers thanks to the compaction of cancelled ones.
+"""
+from random import Random
+from time import perf_counter
+from tcpio.Timers import Timers
+import sys
+
+TIMER_COUNTS = 1_000, 10_000, 100_000
+RESCHEDULES = 300_000
+LOOP_EVERY = 100
+TIMEOUT = 30.
+
+
+def run(count: int):
+    """
+    Run the benchmark with `count` live timers.
+
+    :param count: The number of live timers.
+    """
+    random = Random(42)
+    timers = Timers()
+    handles = [
+        timers.call_later(TIMEOUT * random.random(), lambda: None)
+        for _ in range(count)
+    ]
+    begin = perf_counter()
+    for i in range(RESCHEDULES):
+        index = random.randrange(count)
+        handles[index].cancel()
+        handles[index] = timers.call_later(
+            TIMEOUT * random.random(), lambda: None,
+        )
+        if not i % LOOP_EVERY:
+            timers.timeout(None)
+            timers.run()
+    elapsed = perf_counter() - begin
+    print(f"{count:>7} {elapsed / RESCHEDULES * 1e9:>17.0f} "
+          f"{len(timers._heap):>12} {len(timers._heap) / count:>7.2f}")
+
+
+if __name__ == "__main__":
+    print(f"{'timers':>7} {'reschedule ns/op':>17} {'heap entries':>12} "
+          f"{'ratio':>7}")
+    for count in [int(arg) for arg in sys.argv[1:]] or TIMER_COUNTS:
+        run(count)
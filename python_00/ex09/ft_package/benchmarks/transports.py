@@ -0,0 +1,151 @@
+"""
+Compare the transports of a `tcpio.Client`: TCP on 127.0.0.1, a Unix
+domain socket, and an in-process socket pair (see `tcpio.Server.pair`).
+For each, measure the latency of an acknowledged round trip with one
+request in flight, and the round trips per second with `WINDOW` requests
+in flight.
+
+The TCP and Unix domain socket servers run in a child process, the
+socket pair server runs in a thread of the client process, where it
+shares the interpreter lock with the client.
+"""
+from multiprocessing import Process, Queue
+from threading import Thread
+from time import monotonic, perf_counter
+from tcpio import Server, Client
+import os
+import sys
+import tempfile
+
+TRANSPORTS = "tcp", "unix", "pair"
+ROUND_TRIPS = 20_000
+WINDOW = 64
+DURATION = 2.
+
+
+def listen(server: Server):
+    """
+    Answer the `ping` requests of the clients of `server`, and stop it when
+    a client emits `end`.
+
+    :param server: The server to set up.
+    """
+    @server.on
+    def ping(client: Server.Client, sequence: int):
+        return sequence
+
+    @server.on
+    def end(client: Server.Client):
+        server.stop()
+
+
+def serve(address: str, ports: "Queue[int]"):
+    """
+    Run a server until a client emits `end`.
+
+    :param address: The address to bind the server to.
+    :param ports: Receives the port of the server, 0 for a Unix domain
+        socket.
+    """
+    server = Server(address, handle_sigint=False)
+    listen(server)
+    server.start()
+    name = server.socket.getsockname()
+    ports.put(name[1] if isinstance(name, tuple) else 0)
+    server.wait()
+
+
+def latency(client: Client):
+    """
+    :param client: A connected client.
+    :return: The sorted latencies of `ROUND_TRIPS` round trips, one at a
+        time, in seconds.
+    """
+    samples: list[float] = []
+    sent = perf_counter()
+
+    def reply(sequence: object):
+        nonlocal sent
+        now = perf_counter()
+        samples.append(now - sent)
+        if len(samples) < ROUND_TRIPS:
+            sent = now
+            client.request("ping", len(samples), ack=reply)
+
+    client.request("ping", 0, ack=reply)
+    while len(samples) < ROUND_TRIPS:
+        client.sleep(0.01)
+    return sorted(samples)
+
+
+def throughput(client: Client):
+    """
+    :param client: A connected client.
+    :return: The round trips per second with `WINDOW` requests in flight
+        for `DURATION` seconds.
+    """
+    round_trips = 0
+    in_flight = WINDOW
+    deadline = monotonic() + DURATION
+
+    def reply(sequence: object):
+        nonlocal round_trips, in_flight
+        round_trips += 1
+        if monotonic() < deadline:
+            client.request("ping", round_trips, ack=reply)
+        else:
+            in_flight -= 1
+
+    begin = monotonic()
+    for sequence in range(WINDOW):
+        client.request("ping", sequence, ack=reply)
+    while in_flight:
+        client.sleep(0.01)
+    return round_trips / (monotonic() - begin)
+
+
+def run(transport: str):
+    """
+    Run the benchmark on a transport.
+
+    :param transport: `tcp`, `unix` or `pair`.
+    """
+    thread = child = None
+    if transport == "pair":
+        server = Server("127.0.0.1:0", handle_sigint=False)
+        listen(server)
+        server.start()
+        thread = Thread(target=server.wait, daemon=True)
+        thread.start()
+        client = Client(server, handle_sigint=False)
+    else:
+        address = "127.0.0.1:0" if transport == "tcp" else \
+            f"unix:{tempfile.gettempdir()}/tcpio-{os.getpid()}.sock"
+        ports: "Queue[int]" = Queue()
+        child = Process(target=serve, args=(address, ports), daemon=True)
+        child.start()
+        port = ports.get()
+        if port:
+            address = f"127.0.0.1:{port}"
+        client = Client(address, handle_sigint=False)
+    client.connect()
+    samples = latency(client)
+    rate = throughput(client)
+    client.emit("end")
+    client.sleep(0.1)
+    client.disconnect()
+    if thread is not None:
+        thread.join()
+    if child is not None:
+        child.join()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[len(samples) * 99 // 100]
+    print(f"{transport:>9} {p50 * 1e6:>8.1f} {p99 * 1e6:>8.1f} "
+          f"{rate:>13.0f}")
+
+
+if __name__ == "__main__":
+    print(f"{'transport':>9} {'p50 us':>8} {'p99 us':>8} "
+          f"{'round trips/s':>13}")
+    for transport in sys.argv[1:] or TRANSPORTS:
+        run(transport)
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Iterator, Protocol
+
+
+class Cancellable(Protocol):
+    """
+    A scheduled call that can be cancelled, such as a `tcpio.Timer` or an
+    `asyncio.TimerHandle`.
+    """
+    def cancel(self) -> object:
+        ...
+
+
+@dataclass(slots=True)
+class Acks:
+    """
+    The acknowledgements awaited by the connections of an event loop.
+
+    Each acknowledged message gets a correlation ID, and its callback is
+    kept, along with the connection it was emitted on, until the peer
+    replies on that connection, the deadline of the message expires, or
+    the connection is lost. The deadlines are timers of the event loop,
+    which are cancelled when the acknowledgement is settled otherwise.
+    """
+    _pending: dict[int, tuple[int, Callable[[object], object]]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _by_connection: dict[int, set[int]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _timers: dict[int, Cancellable] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _ids: Iterator[int] = field(init=False, default_factory=lambda: count(1))
+
+    def __len__(self):
+        """
+        :return: The number of pending acknowledgements.
+        """
+        return len(self._pending)
+
+    def add(self, connection: object, callback: Callable[[object], object]):
+        """
+        Register an acknowledgement, without a deadline until `expire_with`
+        is called.
+
+        :param connection: The connection the message is emitted on.
+        :param callback: The callback to call with the reply.
+        :return: The correlation ID of the message.
+        """
+        ack = next(self._ids)
+        self._pending[ack] = id(connection), callback
+        self._by_connection.setdefault(id(connection), set()).add(ack)
+        return ack
+
+    def expire_with(self, ack: int, timer: Cancellable):
+        """
+        Attach its deadline to a pending acknowledgement.
+
+        :param ack: The correlation ID of the message.
+        :param timer: The timer that calls `expire(ack)` at the deadline.
+        """
+        self._timers[ack] = timer
+
+    def resolve(self, connection: object, ack: int, value: object):
+        """
+        Call the callback of an acknowledgement with the reply `value`, if
+        it is still pending and `connection` is the one it was emitted on.
+
+        :param connection: The connection that the reply came from.
+        :param ack: The correlation ID of the reply.
+        :param value: The reply.
+        """
+        pending = self._pending.get(ack)
+        if pending is not None and pending[0] == id(connection):
+            self._pop(ack)(value)
+
+    def discard(self, ack: int):
+        """
+        Forget an acknowledgement without calling its callback.
+
+        :param ack: The correlation ID of the message.
+        """
+        if ack in self._pending:
+            self._pop(ack)
+
+    def cancel(self, connection: object, error: BaseException):
+        """
+        Call the callbacks of the acknowledgements pending on a lost
+        connection with `error`.
+
+        :param connection: The lost connection.
+        :param error: The error to pass to the callbacks.
+        """
+        for ack in sorted(self._by_connection.get(id(connection), ())):
+            self._pop(ack)(error)
+
+    def expire(self, ack: int):
+        """
+        Call the callback of an acknowledgement whose deadline passed with a
+        `TimeoutError`, if it is still pending.
+
+        :param ack: The correlation ID of the message.
+        """
+        if ack in self._pending:
+            self._pop(ack)(TimeoutError(
+                f"no acknowledgement received for message {ack}"
+            ))
+
+    def _pop(self, ack: int):
+        """
+        :private:
+
+        Forget a pending acknowledgement, and cancel its deadline.
+
+        :param ack: The correlation ID of the message.
+        :return: Its callback.
+        """
+        connection, callback = self._pending.pop(ack)
+        if (timer := self._timers.pop(ack, None)) is not None:
+            timer.cancel()
+        acks = self._by_connection[connection]
+        acks.discard(ack)
+        if not acks:
+            del self._by_connection[connection]
+        return callback
+
+
+__all__ = "Acks", "Cancellable"
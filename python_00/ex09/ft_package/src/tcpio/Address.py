@@ -0,0 +1,68 @@
+from socket import getaddrinfo, AddressFamily, SocketKind, AF_INET, \
+    SOCK_STREAM, IPPROTO_TCP
+from typing import Final, TypeAlias
+import socket as socket_module
+
+AddressInfo: TypeAlias = list[tuple[
+    AddressFamily,
+    SocketKind,
+    int,
+    str,
+    str | tuple[str, int] | tuple[str, int, int, int] | tuple[int, bytes],
+]]
+
+UNIX_PREFIX: Final = "unix:"
+
+
+def is_unix(address: str):
+    """
+    :param address: A `host:port` or `unix:/path/to.sock` address.
+    :return: Whether `address` is the path of a Unix domain socket.
+    """
+    return address.startswith(UNIX_PREFIX)
+
+
+def split_address(address: str):
+    """
+    :param address: A `host:port` or `unix:/path/to.sock` address, an IPv6
+        host may be enclosed in brackets (`[::1]:3000`).
+    :return: The host and the port of a TCP address, or the path of a Unix
+        domain socket and an empty port.
+    """
+    if is_unix(address):
+        return address[len(UNIX_PREFIX):], ""
+    port_sep = address.rfind(":")
+    host = address[:port_sep]
+    if host.startswith("[") and host.endswith("]"):
+        host = host[1:-1]
+    return host, address[port_sep + 1:]
+
+
+def resolve(address: str, family: int = AF_INET) -> AddressInfo:
+    """
+    Resolve an address into the arguments of `socket.socket` and of its
+    `connect` or `bind` methods, like `socket.getaddrinfo`.
+
+    :param address: A `host:port` or `unix:/path/to.sock` address.
+    :param family: The address family of a TCP address, `AF_UNSPEC` for
+        both IPv4 and IPv6.
+    :return: The resolved addresses, a single one for a Unix domain socket.
+    :raise OSError: If the host name cannot be resolved, or if the
+        platform has no Unix domain sockets.
+    """
+    host, port = split_address(address)
+    if is_unix(address):
+        if not hasattr(socket_module, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported")
+        return [(socket_module.AF_UNIX, SOCK_STREAM, 0, "", host)]
+    return list(getaddrinfo(
+        host=host,
+        port=port,
+        family=family,
+        type=SOCK_STREAM,
+        proto=IPPROTO_TCP,
+    ))
+
+
+__all__ = "AddressInfo", "UNIX_PREFIX", "is_unix", "split_address", \
+    "resolve"
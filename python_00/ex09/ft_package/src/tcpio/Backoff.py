@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Final
+from random import random
+
+RECONNECTION_DELAY: Final = 0.05
+RECONNECTION_DELAY_MAX: Final = 5.
+
+
+@dataclass(slots=True)
+class Backoff:
+    """
+    The randomized exponential backoff between the connection attempts of
+    one connection.
+
+    The delay starts at `delay` and doubles after each failed attempt, up to
+    `delay_max`, and each delay is drawn at random between half and all of
+    its nominal value, so that the connections lost together do not all
+    retry at once.
+
+    :attr attempts: The number of failed attempts in a row before the
+        connection is given up (0 = infinite).
+    :attr delay: The first delay between attempts.
+    :attr delay_max: The maximum delay between attempts.
+    :attr failures: The number of failed attempts since the last `reset`.
+    """
+    attempts: Final[int] = 0
+    delay: Final[float] = RECONNECTION_DELAY
+    delay_max: Final[float] = RECONNECTION_DELAY_MAX
+
+    _failures: int = field(init=False, default=0)
+    _delay: float = field(init=False)
+
+    def __post_init__(self):
+        """
+        `tcpio.Backoff` post constructor.
+        """
+        self._delay = self.delay
+
+    @property
+    def failures(self):
+        """
+        `failures` getter.
+
+        :return: The number of failed attempts since the last `reset`.
+        """
+        return self._failures
+
+    def fail(self):
+        """
+        Count a failed attempt.
+
+        :return: Whether it was the last attempt.
+        """
+        self._failures += 1
+        return bool(self.attempts) and self._failures >= self.attempts
+
+    def next_delay(self):
+        """
+        Draw the delay before the next attempt, and double the nominal delay
+        up to `delay_max`.
+
+        :return: The delay in seconds.
+        """
+        delay = min(self._delay, self.delay_max)
+        self._delay = delay * 2
+        return delay * (0.5 + random() / 2)
+
+    def reset(self):
+        """
+        Start over from the first delay, for a new connection.
+        """
+        self._failures = 0
+        self._delay = self.delay
+
+
+__all__ = "Backoff", "RECONNECTION_DELAY", "RECONNECTION_DELAY_MAX"
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from typing import Final
+
+POLICIES: Final = "drop", "disconnect", "block"
+
+
+@dataclass(slots=True)
+class Backpressure:
+    """
+    The watermarks that bound the outgoing bytes queued on one connection.
+
+    A frame is refused when the bytes already queued are above the low
+    watermark and the frame would bring them above the high watermark: the
+    connection is congested then, and `policy` tells what to do with the
+    frame:
+        - `drop` -> The frame is dropped.
+        - `disconnect` -> The frame is dropped, and the connection is closed
+            without sending the frames already queued.
+        - `block` -> The emitter blocks until the queued bytes are sent down
+            to the low watermark, then the frame is queued.
+    Once a congested connection's queued bytes fall to the low watermark,
+    it is drained.
+
+    :attr high: The high watermark in bytes, `None` for no limit.
+    :attr low: The low watermark in bytes, half of `high` by default.
+    :attr policy: What to do with the frames refused by a congested
+        connection, one of `POLICIES`.
+    :attr congested: Whether a frame was refused since the connection was
+        last drained.
+    """
+    high: Final[int | None] = None
+    low: int | None = None
+    policy: Final[str] = "drop"
+
+    _low: int = field(init=False)
+    _congested: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        """
+        `tcpio.Backpressure` post constructor.
+
+        :raise ValueError: If the policy is unknown, or if the low watermark
+            is above the high watermark.
+        """
+        if self.policy not in POLICIES:
+            raise ValueError(f"unknown overflow policy: {self.policy!r}")
+        if self.low is None:
+            self.low = 0 if self.high is None else self.high // 2
+        self._low = self.low
+        if self.high is not None and not 0 <= self._low <= self.high:
+            raise ValueError("the low watermark must be between 0 and the "
+                             "high watermark")
+
+    @property
+    def congested(self):
+        """
+        `congested` getter.
+
+        :return: Whether a frame was refused since the connection was last
+            drained.
+        """
+        return self._congested
+
+    def admits(self, pending: int, size: int):
+        """
+        Check whether a frame can be queued, and mark the connection as
+        congested if it cannot.
+
+        :param pending: The number of bytes already queued.
+        :param size: The size of the frame.
+        :return: Whether the frame can be queued.
+        """
+        if self.high is None or pending <= self._low or \
+                pending + size <= self.high:
+            return True
+        self._congested = True
+        return False
+
+    def drained(self, pending: int):
+        """
+        Check whether a congested connection fell to the low watermark, and
+        clear its congestion if it did.
+
+        :param pending: The number of bytes still queued.
+        :return: Whether the connection was just drained.
+        """
+        if not self._congested or pending > self._low:
+            return False
+        self._congested = False
+        return True
+
+
+__all__ = "Backpressure", "POLICIES"
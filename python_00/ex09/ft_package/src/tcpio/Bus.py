@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from socket import socket
+from typing import Iterable
+from .RecvBuffer import RecvBuffer
+from .SendQueue import SendQueue
+import pickle as pkl
+import sys
+
+
+@dataclass(slots=True)
+class Bus:
+    """
+    One end of the broadcast bus that links a prefork worker of a
+    `tcpio.Server` to its supervisor, over a Unix socket pair.
+
+    A bus message is an 8 bytes size header followed by the event, the
+    arguments and the rooms of a broadcast, pickled: the processes of a
+    server trust each other, and `pickle` supports the objects of every
+    codec. The supervisor forwards the messages it receives to the other
+    workers as raw bytes, and each worker encodes the event once per codec
+    and event symbol in use among its own clients, like a local broadcast.
+    """
+    _socket: socket
+    _recv_buffer: RecvBuffer = field(init=False, default_factory=RecvBuffer)
+    _send_queue: SendQueue = field(init=False, default_factory=SendQueue)
+
+    def __post_init__(self):
+        """
+        `tcpio.Bus` post constructor.
+        """
+        self._socket.setblocking(False)
+
+    def __bool__(self):
+        """
+        :return: Whether messages are waiting to be sent.
+        """
+        return bool(self._send_queue)
+
+    def fileno(self):
+        """
+        :return: The file descriptor of the bus socket.
+        """
+        return self._socket.fileno()
+
+    def publish(self, message: bytes | memoryview):
+        """
+        Queue an encoded message.
+
+        :param message: The message to send.
+        :return: Whether the queue was empty, in which case the owner of
+            the bus must watch it for writability.
+        """
+        idle = not self._send_queue
+        self._send_queue.push(message)
+        return idle
+
+    def send(self):
+        """
+        Send the queued messages, or as many as possible.
+
+        :return: False if the other end of the bus is closed.
+        """
+        try:
+            self._send_queue.send_to(self._socket)
+        except OSError:
+            return False
+        return True
+
+    def receive(self):
+        """
+        Receive the pending data from the bus socket.
+
+        :return: The complete messages received, or `None` if the other
+            end of the bus is closed.
+        """
+        messages: list[bytes] = []
+        while True:
+            try:
+                received = self._recv_buffer.recv_from(self._socket)
+            except BlockingIOError:
+                break
+            if not received:
+                return None
+            while len(self._recv_buffer) >= 8:
+                with self._recv_buffer.view() as view:
+                    size = int.from_bytes(view[:8], sys.byteorder) + 8
+                    if len(view) < size:
+                        break
+                    messages.append(bytes(view[:size]))
+                self._recv_buffer.consume(size)
+        return messages
+
+    def close(self):
+        """
+        Close the bus socket.
+        """
+        self._socket.close()
+
+    @staticmethod
+    def encode(
+            event: str,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            rooms: Iterable[str] = (),
+    ):
+        """
+        Encode a bus message.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :param rooms: The names of the rooms that the message is emitted
+            to, none to emit it to all the clients.
+        :return: The encoded message.
+        :raise pickle.PicklingError: If the arguments cannot be pickled.
+        """
+        body = pkl.dumps(
+            (event, args, kwargs, tuple(rooms)),
+            pkl.HIGHEST_PROTOCOL,
+        )
+        return len(body).to_bytes(8, sys.byteorder) + body
+
+    @staticmethod
+    def decode(message: bytes) -> tuple[
+        str, tuple[object, ...], dict[str, object], tuple[str, ...],
+    ]:
+        """
+        Decode a bus message.
+
+        :param message: The encoded message.
+        :return: The event, the arguments and the keyword arguments of the
+            message, and the names of the rooms that it is emitted to
+            (empty for all the clients).
+        """
+        return pkl.loads(memoryview(message)[8:])
+
+
+__all__ = "Bus",
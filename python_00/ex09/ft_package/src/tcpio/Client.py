@@ -1,31 +1,56 @@
 from dataclasses import dataclass
-from typing import TypeAlias, Final
+from typing import Final
 from typing_extensions import override
-from select import poll, POLLIN, POLLOUT, POLLERR
-from socket import socket, AF_INET, SOCK_STREAM, SOCK_NONBLOCK, IPPROTO_TCP, \
-    getaddrinfo, AddressFamily, SocketKind
-from time import sleep, time
+from socket import socket, AF_INET, AF_UNSPEC, SOCK_STREAM, SOCK_NONBLOCK, \
+    SOL_SOCKET, SO_ERROR
+from errno import EINPROGRESS
+from time import monotonic
+from functools import partial
+from itertools import zip_longest
+from ipaddress import ip_address
+from threading import get_ident
 from .SocketIO import SocketIO
+from .EventLoop import EventLoop
+from .Codec import get_codec
+from .Compression import Compression
+from .Backpressure import Backpressure
+from .Backoff import Backoff, RECONNECTION_DELAY, \
+    RECONNECTION_DELAY_MAX
+from .Selector import Selector, make_selector, READ, WRITE, ERROR
+from .Waker import Waker
+from .Timers import Timer
+from .Stats import Stats
+from .Address import AddressInfo, is_unix, split_address, resolve
+from .Offloaded import default_executor
+from .Server import Server
 from signal import signal, SIGINT
 from types import FrameType
 import atexit
 
-AddressInfo: TypeAlias = list[tuple[
-    AddressFamily,
-    SocketKind,
-    int,
-    str,
-    tuple[str, int] | tuple[str, int, int, int],
-]]
+CONNECTION_ATTEMPT_DELAY: Final = 0.25
 
 
 @dataclass(slots=True, init=False)
-class Client(SocketIO):
+class Client(EventLoop, SocketIO):
     """
     A client that connects to a `tcpio.Server`.
+    Calls can be scheduled on the event loop with `call_later` and
+    `call_every` (see `tcpio.Timers`), they run while the client sleeps or
+    connects.
+    The client connects to a TCP address (`host:port`), to a Unix domain
+    socket (`unix:/path/to.sock`), or to a `tcpio.Server` of the same
+    process through a socket pair (see `tcpio.Server.pair`), which a
+    reconnection replaces by a new one.
+    The host name of a TCP address is resolved on each round of connection
+    attempts, without blocking the event loop, and its IPv4 and IPv6
+    addresses are raced (see `connect`).
+    A client created with `collect_stats=True` collects runtime metrics, see
+    `stats`.
 
-    :attr host: The client's host name.
-    :attr port: The client's port number.
+    :attr host: The client's host name, or the path of the Unix domain
+        socket of the server, empty for a socket pair.
+    :attr port: The client's port number, empty for a Unix domain socket or
+        a socket pair.
     :attr connected: Whether the client is connected to the server.
     :attr special_events: Special events that are triggered by the client.
 
@@ -34,6 +59,8 @@ class Client(SocketIO):
             callback takes no arguments.
         - `disconnection` -> The client is disconnected from the server, the
             callback takes no arguments.
+        - `drain` -> The client was congested and its queued bytes fell to
+            its low watermark, the callback takes no arguments.
         - `error` -> Triggered when an error occurs, the callback takes
             an `Exception` as its first argument.
     """
@@ -46,63 +73,124 @@ class Client(SocketIO):
     reconnection_delay_max: Final[float]
 
     _connected: bool
-    _poller: poll
+    _selector: Selector
+    _address: str
     _addr_info: AddressInfo
+    _server: Server | None
     _first_conn: bool
+    _connecting: bool
+    _round: int
+    _reconnect: Backoff
+    _candidates: AddressInfo
+    _attempts: dict[int, tuple[socket, Timer]]
+    _stagger: Timer | None
+    _backoff: Timer | None
 
     @override
     def __init__(
             self,
-            address: str,
+            address: str | Server,
             connect_timeout: float = 1,
             reconnection: bool = True,
             reconnection_attempts: int = 0,
-            reconnection_delay: float = 0.5,
-            reconnection_delay_max: float = 5,
+            reconnection_delay: float = RECONNECTION_DELAY,
+            reconnection_delay_max: float = RECONNECTION_DELAY_MAX,
             handle_sigint: bool = True,
             buffer_size: int = 4096,
+            backend: str | None = None,
+            codec: str = "pickle",
+            compression_threshold: int | None = None,
+            compression_level: int = -1,
+            high_watermark: int | None = None,
+            low_watermark: int | None = None,
+            overflow: str = "drop",
+            collect_stats: bool = False,
     ):
         """
         `tcpio.Client` constructor.
 
-        :param address: The address of the server to connect to.
+        :param address: The address of the server to connect to,
+            `host:port` or `unix:/path/to.sock`, or a server of the same
+            process to connect to through a socket pair.
         :param connect_timeout: The timeout for the connection.
         :param reconnection: Whether to attempt to reconnect to the server.
         :param reconnection_attempts: The number of reconnection attempts
             (0 = infinite).
         :param reconnection_delay: The first delay between reconnection
-            attempts (doubled on each retry).
+            attempts (doubled on each retry, and drawn at random between
+            half and all of its value).
         :param reconnection_delay_max: The maximum delay between reconnection
             attempts.
         :param handle_sigint: Whether to handle SIGINT (Ctrl+C).
+        :param buffer_size: The size of the client's internal buffer.
+        :param backend: The selector backend to use (`epoll`, `poll` or
+            `select`), `None` for the best one available on the platform.
+        :param codec: The name of the codec to encode the messages with, it
+            must be accepted by the server.
+        :param compression_threshold: The minimum size of a message to
+            compress it, `None` to never compress the messages.
+        :param compression_level: The zlib compression level (0-9, -1 for
+            the default).
+        :param high_watermark: The maximum number of outgoing bytes queued,
+            `None` for no limit.
+        :param low_watermark: The number of queued bytes under which the
+            client is drained, half of `high_watermark` by default.
+        :param overflow: What to do with the messages emitted while the
+            client is congested: `drop` them, `disconnect` the client, or
+            `block` until the client is drained (see `tcpio.Backpressure`).
+        :param collect_stats: Whether to collect runtime metrics (see
+            `tcpio.Stats`).
+        :raise ValueError: If the watermarks or the overflow policy are
+            invalid.
         """
         if handle_sigint:
             def sigint_handler(sig: int, frame: FrameType | None):
                 self.disconnect()
             signal(SIGINT, sigint_handler)
-        port_sep = address.rfind(":")
-        self.host = address[:port_sep]
-        self.port = address[port_sep + 1:]
-        super(Client, self).__init__(
-            socket(AF_INET, SOCK_STREAM | SOCK_NONBLOCK, IPPROTO_TCP),
-            buffer_size,
+        if isinstance(address, Server):
+            self.host = self.port = self._address = ""
+            self._server = address
+            connection = address.pair()
+            connection.setblocking(False)
+        else:
+            self.host, self.port = split_address(address)
+            self._address = address
+            self._server = None
+            connection = socket(AF_INET, SOCK_STREAM | SOCK_NONBLOCK)
+        super(Client, self).__init__(connection, buffer_size)
+        self._codec = get_codec(codec)
+        self._compression = Compression(
+            compression_threshold,
+            compression_level,
         )
+        self._backpressure = Backpressure(
+            high_watermark,
+            low_watermark,
+            overflow,
+        )
+        self._stats = Stats() if collect_stats else None
         self.connect_timeout = connect_timeout
         self.reconnection = reconnection
         self.reconnection_attempts = reconnection_attempts
         self.reconnection_delay = reconnection_delay
         self.reconnection_delay_max = reconnection_delay_max
-        self._poller = poll()
+        self._selector = make_selector(backend)
         self._connected = False
-        self._addr_info = getaddrinfo(
-            host=self.host,
-            port=self.port,
-            family=AF_INET,
-            type=SOCK_STREAM,
-            proto=IPPROTO_TCP,
-        )
+        self._addr_info = []
         self._first_conn = True
-        self._poller.register(self._socket.fileno())
+        self._connecting = False
+        self._round = 0
+        self._reconnect = Backoff(
+            reconnection_attempts,
+            reconnection_delay,
+            reconnection_delay_max,
+        )
+        self._candidates = []
+        self._attempts = {}
+        self._stagger = self._backoff = None
+        self._selector.register(self._socket.fileno(), READ)
+        self._waker = Waker()
+        self._selector.register(self._waker.fileno(), READ)
         atexit.register(self._atexit)
 
     def wait(self):
@@ -126,7 +214,14 @@ class Client(SocketIO):
             if self._connected:
                 # case where user reconnects in disconnect handler
                 self._atexit()
+        if not self._first_conn:
+            try:
+                self._flush()
+            except OSError:
+                pass
         self._socket.close()
+        self._selector.close()
+        self._waker.close()
 
     @property
     def connected(self):
@@ -144,85 +239,293 @@ class Client(SocketIO):
 
         :return: Special events that are triggered by the client.
         """
-        return "connect", "disconnect", "error"
+        return "connect", "disconnect", "drain", "error"
+
+    @override
+    def _overflow(self):
+        self._send_queue.clear()
+        self.disconnect()
+
+    @override
+    def _want_write(self):
+        if self._connected:
+            self._selector.modify(self._socket.fileno(), READ | WRITE)
 
     def disconnect(self):
         """
-        Disconnect the client from the server.
+        Disconnect the client from the server, or stop connecting it.
+        Safe to call from a signal handler or from another thread.
         """
-        self._connected = False
+        self._connected = self._connecting = False
+        self._waker.wake()
 
     def sleep(self, seconds: float = 0):
         """
         Sleep for `seconds` seconds, if `seconds` is 0, sleep until the next
         event is triggered.
+        The client blocks in its selector while there is nothing to do,
+        and never past the next timer, the timers that are due run while
+        sleeping. The acknowledgements still pending when the connection
+        is lost are failed with a `ConnectionError`.
 
         :param seconds: The number of seconds to sleep.
         """
-        begin = time()
+        deadline = monotonic() + seconds
+        self._waker.thread = get_ident()
         while True:
-            if fd_events := self._poller.poll():
-                _, events = fd_events[0]
-                if events & POLLIN:
-                    if not self._recv():
-                        self._connected = False
-                        break
-                if events & POLLOUT:
+            timeout = self._timers.timeout(
+                max(deadline - monotonic(), 0) if seconds else None
+            )
+            ready = self._selector.select(timeout)
+            busy = monotonic()
+            for fd, events in ready:
+                if fd == self._waker.fileno():
+                    self._waker.drain()
+                    continue
+                if events & READ and not self._recv():
+                    self._connected = self._handshaken = False
+                    if self._stats is not None:
+                        self._stats.disconnections += 1
+                    self._acks.cancel(self, ConnectionError(
+                        "disconnected before acknowledging"
+                    ))
+                    return
+                if events & WRITE:
                     self._send()
-                if time() - begin > seconds:
-                    break
+                    if not self._send_queue:
+                        self._selector.modify(fd, READ)
+            self._timers.run()
+            if self._stats is not None:
+                self._stats.loop_lag.record(monotonic() - busy)
+            if monotonic() >= deadline:
+                break
+
+    def stats(self):
+        """
+        Get a snapshot of the runtime metrics of the client (see
+        `tcpio.Stats.snapshot`).
+
+        :return: The metrics as a dict, `None` if the client was created
+            without `collect_stats=True`.
+        """
+        return None if self._stats is None else self._stats.snapshot()
 
     def connect(self):
         """
         Connect the client to the server.
-        If `reconnection` was set to `True` in the constructor, attempt to
-        reconnect to the server if the connection fails.
-        Trigger the `error` events on each failed attempt with a
+        Each round of connection attempts resolves the address of the
+        server again, in the default executor of `tcpio` for a host name,
+        then races its addresses, alternating between IPv4 and IPv6 in the
+        order of the resolver: an attempt is started every
+        `CONNECTION_ATTEMPT_DELAY` seconds, or as soon as the previous one
+        fails, each attempt is given `connect_timeout` seconds, and the
+        first one to succeed wins.
+        If `reconnection` was set to `True` in the constructor, start a new
+        round if they all fail, after a randomized exponential backoff.
+        Trigger the `error` events on each failed round with a
         `ConnectionError` as their first argument.
+        While connecting and between the rounds, the timers and the calls
+        scheduled from other threads keep running, and `disconnect` stops
+        connecting.
         When the connection is successful, trigger the `connect` event.
+        A client of a server of the same process is connected at once.
+
+        :return: Whether the client is connected.
         """
-        reconnect_interval = self.reconnection_delay
-        attempts = 1
-        if not self._first_conn:
-            self._poller.unregister(self._socket.fileno())
-            self._socket = socket(
-                family=AF_INET,
-                type=SOCK_STREAM | SOCK_NONBLOCK,
-                proto=IPPROTO_TCP,
-            )
-            self._poller.register(self._socket.fileno())
-        while not self._connected and (
-            self.reconnection and (
-                not self.reconnection_attempts or
-                attempts <= self.reconnection_attempts
-            )
-        ):
-            if reconnect_interval > self.reconnection_delay_max:
-                reconnect_interval = self.reconnection_delay_max
-            self._poller.modify(self._socket.fileno(), POLLOUT)
-            for addr_info in self._addr_info:
-                try:
-                    self._socket.connect(addr_info[-1])
-                except BlockingIOError:
-                    fd_events = self._poller.poll(self.connect_timeout * 1000)
-                    _, event = fd_events[0]
-                    if event & POLLOUT and not event & POLLERR:
-                        self._connected = True
-                except Exception:
-                    pass
-                else:
-                    self._connected = True
-                finally:
-                    if self._connected:
-                        break
+        self._selector.unregister(self._socket.fileno())
+        if self._server is not None:
+            if not self._first_conn:
+                self._socket.close()
+                self._socket = self._server.pair()
+                self._socket.setblocking(False)
+            self._connected = True
+        else:
+            self._socket.close()
+            self._connecting = True
+            self._reconnect.reset()
+            self._waker.thread = get_ident()
+            self._lookup()
+            while self._connecting:
+                for fd, events in self._selector.select(
+                    self._timers.timeout(None)
+                ):
+                    if fd == self._waker.fileno():
+                        self._waker.drain()
+                    elif fd in self._attempts:
+                        self._settle(fd, events)
+                self._timers.run()
+            self._abandon()
             if not self._connected:
-                self._trigger_event("error", ConnectionError)
-                sleep(reconnect_interval)
-                attempts += 1
-                reconnect_interval *= 2
-        self._trigger_event("connect")
-        self._poller.modify(self._socket, POLLIN | POLLOUT)
+                self._socket = socket(AF_INET, SOCK_STREAM | SOCK_NONBLOCK)
         self._first_conn = False
+        if not self._connected:
+            self._selector.register(self._socket.fileno(), READ)
+            return False
+        self._new_session()
+        self._selector.register(self._socket.fileno(), READ | WRITE)
+        self._trigger_event("connect")
+        return True
+
+    def _lookup(self):
+        """
+        :private:
+
+        Start a round of connection attempts by resolving the address of
+        the server: in the default executor of `tcpio` for a host name, at
+        once for a Unix domain socket or a numeric address.
+        """
+        self._backoff = None
+        self._round += 1
+        try:
+            ip_address(self.host)
+        except ValueError:
+            if not is_unix(self._address):
+                current = self._round
+                future = default_executor().submit(
+                    resolve, self._address, AF_UNSPEC,
+                )
+                future.add_done_callback(lambda done: self._waker.call_soon(
+                    partial(
+                        self._looked_up,
+                        current,
+                        done.exception() or done.result(),
+                    )
+                ))
+                return
+        try:
+            addr_info = resolve(self._address, AF_UNSPEC)
+        except OSError as error:
+            self._looked_up(self._round, error)
+        else:
+            self._looked_up(self._round, addr_info)
+
+    def _looked_up(self, current: int, result: AddressInfo | BaseException):
+        """
+        :private:
+
+        Start racing the resolved addresses of the server, alternating
+        between their families, or fail the round if they could not be
+        resolved.
+
+        :param current: The round that the addresses were resolved for,
+            the result of an earlier round is ignored.
+        :param result: The resolved addresses, or the error of the
+            resolver.
+        """
+        if current != self._round or not self._connecting:
+            return
+        if isinstance(result, BaseException):
+            self._trigger_event("error", ConnectionError(
+                f"cannot resolve {self.host}: {result}"
+            ))
+            self._retry()
+            return
+        self._addr_info = result
+        families: dict[int, AddressInfo] = {}
+        for addr_info in result:
+            families.setdefault(addr_info[0], []).append(addr_info)
+        self._candidates = [
+            addr_info
+            for alternation in zip_longest(*families.values())
+            for addr_info in alternation if addr_info is not None
+        ]
+        self._next_attempt()
+
+    def _next_attempt(self):
+        """
+        :private:
+
+        Start connecting to the next address of the round without blocking,
+        and schedule the attempt after it in `CONNECTION_ATTEMPT_DELAY`
+        seconds. Fail the round once all of its attempts failed.
+        """
+        if self._stagger is not None:
+            self._stagger.cancel()
+            self._stagger = None
+        while self._candidates:
+            family, _, proto, _, addr = self._candidates.pop(0)
+            try:
+                attempt = socket(family, SOCK_STREAM | SOCK_NONBLOCK, proto)
+            except OSError:
+                continue
+            error = attempt.connect_ex(addr)
+            if error and error != EINPROGRESS:
+                attempt.close()
+                continue
+            fd = attempt.fileno()
+            self._attempts[fd] = attempt, self._timers.call_later(
+                self.connect_timeout, self._settle, fd, ERROR,
+            )
+            self._selector.register(fd, WRITE)
+            if self._candidates:
+                self._stagger = self._timers.call_later(
+                    CONNECTION_ATTEMPT_DELAY, self._next_attempt,
+                )
+            return
+        if not self._attempts:
+            self._trigger_event("error", ConnectionError(
+                f"cannot connect to {self.host}:{self.port}"
+            ))
+            self._retry()
+
+    def _settle(self, fd: int, events: int):
+        """
+        :private:
+
+        Finish a connection attempt: keep its socket if it is connected,
+        or close it and start the next attempt at once.
+
+        :param fd: The file descriptor of the attempt.
+        :param events: The events reported for it, `ERROR` if it timed out.
+        """
+        if (pending := self._attempts.pop(fd, None)) is None:
+            return
+        attempt, timeout = pending
+        timeout.cancel()
+        self._selector.unregister(fd)
+        if events & ERROR or attempt.getsockopt(SOL_SOCKET, SO_ERROR):
+            attempt.close()
+            self._next_attempt()
+            return
+        self._socket = attempt
+        self._connected = True
+        self._connecting = False
+
+    def _retry(self):
+        """
+        :private:
+
+        Schedule the next round of connection attempts after the current
+        delay, drawn at random between half and all of it, and double the
+        delay up to `reconnection_delay_max`, or stop connecting after the
+        last round.
+        """
+        if not self._connecting:
+            return
+        if not self.reconnection or self._reconnect.fail():
+            self._connecting = False
+            return
+        self._backoff = self._timers.call_later(
+            self._reconnect.next_delay(), self._lookup,
+        )
+
+    def _abandon(self):
+        """
+        :private:
+
+        Close the connection attempts still pending, and cancel the timers
+        of the round.
+        """
+        for fd, (attempt, timeout) in self._attempts.items():
+            timeout.cancel()
+            self._selector.unregister(fd)
+            attempt.close()
+        self._attempts.clear()
+        self._candidates.clear()
+        for timer in self._stagger, self._backoff:
+            if timer is not None:
+                timer.cancel()
+        self._stagger = self._backoff = None
 
 
-__all__ = "Client", "AddressInfo"
+__all__ = "Client", "AddressInfo", "CONNECTION_ATTEMPT_DELAY"
@@ -0,0 +1,642 @@
+from typing import Callable, Final
+from typing_extensions import override
+from dataclasses import dataclass, replace
+from .IO import IO
+from .EventLoop import EventLoop
+from .SocketIO import SocketIO
+from .FrameIO import broadcast
+from .Address import AddressInfo, split_address, resolve
+from .Codec import Codec, get_codec
+from .Compression import Compression
+from .Backpressure import Backpressure
+from .Backoff import Backoff, RECONNECTION_DELAY, \
+    RECONNECTION_DELAY_MAX
+from .Selector import Selector, make_selector, READ, WRITE
+from .Waker import Waker
+from .Acks import Acks
+from .Timers import Timer, Timers
+from .Stats import Stats
+from socket import socket, SOCK_STREAM, SOCK_NONBLOCK, SOL_SOCKET, \
+    SO_ERROR
+from errno import EINPROGRESS
+from time import monotonic
+from threading import get_ident
+from signal import signal, SIGINT
+from types import FrameType
+import sys
+
+
+@dataclass(slots=True, init=False)
+class ClientPool(EventLoop, IO):
+    """
+    Many connections to `tcpio.Server`s, driven by a single event loop.
+
+    Unlike a `tcpio.Client`, a connection of a pool has no selector, signal
+    handler or exit hook of its own: the pool watches all of them with one
+    selector, runs their timers on one heap, and connects them without
+    blocking, so that a single thread can drive thousands of them.
+    Each connection has its own event listeners (see `connect`), and the
+    listeners added on the pool are triggered for every connection, with
+    the connection as their first argument.
+
+    A connection that fails to connect is retried after
+    `reconnection_delay` seconds, doubled on each failure up to
+    `reconnection_delay_max`, and a connection that is lost is reconnected
+    the same way, until `disconnect` is called. The delays are drawn at
+    random between half and all of their nominal value, so that the
+    connections lost together do not all retry at once. The frames queued
+    while a connection is down are sent once it is back, like with a
+    `tcpio.Client`.
+
+    Calls can be scheduled on the event loop with `call_later` and
+    `call_every` (see `tcpio.Timers`), they run while the pool sleeps.
+    A pool created with `collect_stats=True` collects the runtime metrics
+    of all its connections, see `stats`.
+
+    :attr connections: The connections of the pool, connected or not.
+    :attr special_events: Special events that are triggered by the pool.
+
+    List of special events:
+        - `connect` -> A connection is established, the callback takes a
+            `tcpio.ClientPool.Connection` as its first argument.
+        - `disconnect` -> A connection is lost or closed, the callback takes
+            a `tcpio.ClientPool.Connection` as its first argument.
+        - `drain` -> A congested connection's queued bytes fell to its low
+            watermark, the callback takes a `tcpio.ClientPool.Connection`
+            as its first argument.
+        - `error` -> Triggered when an error occurs, the callback takes
+            an `Exception` as its first argument.
+    The listeners added on a connection itself take the same arguments,
+    without the connection.
+    """
+    @dataclass(slots=True, init=False)
+    class Connection(SocketIO):
+        """
+        A connection of a `tcpio.ClientPool`.
+
+        The connection connects itself without blocking, on the event loop
+        of its pool: the pool watches its socket and hands it the events of
+        the socket.
+
+        :attr host: The host name of the server, or the path of its Unix
+            domain socket.
+        :attr port: The port number of the server, empty for a Unix domain
+            socket.
+        :attr connected: Whether the connection is established.
+        :attr closed: Whether the connection was closed for good, by
+            `disconnect` or after its last reconnection attempt.
+        """
+        host: Final[str]
+        port: Final[str]
+        _pool: Final["ClientPool"]
+        _addr_info: Final[AddressInfo]
+        _addr_index: int
+        _connected: bool
+        _connecting: bool
+        _closed: bool
+        _reconnect: Backoff
+        _timer: Timer | None
+
+        @override
+        def __init__(
+                self,
+                host: str,
+                port: str,
+                addr_info: AddressInfo,
+                pool: "ClientPool",
+        ):
+            """
+            `tcpio.ClientPool.Connection` constructor.
+
+            :param host: The host name of the server.
+            :param port: The port number of the server.
+            :param addr_info: The resolved addresses of the server.
+            :param pool: The pool that the connection belongs to.
+            """
+            family, _, proto, _, _ = addr_info[0]
+            super(ClientPool.Connection, self).__init__(
+                socket(family, SOCK_STREAM | SOCK_NONBLOCK, proto),
+                pool._buffer_size,
+            )
+            self.host = host
+            self.port = port
+            self._pool = pool
+            self._addr_info = addr_info
+            self._addr_index = 0
+            self._codec = pool._codec
+            self._compression = Compression(
+                pool._compression_threshold,
+                pool._compression_level,
+            )
+            self._backpressure = replace(pool._backpressure)
+            self._acks = pool._acks
+            self._timers = pool._timers
+            self._waker = pool._waker
+            self._stats = pool._stats
+            self._connected = self._connecting = self._closed = False
+            self._reconnect = Backoff(
+                pool.reconnection_attempts,
+                pool.reconnection_delay,
+                pool.reconnection_delay_max,
+            )
+            self._timer = None
+
+        @property
+        def connected(self):
+            """
+            `connected` getter.
+
+            :return: Whether the connection is established.
+            """
+            return self._connected
+
+        @property
+        def closed(self):
+            """
+            `closed` getter.
+
+            :return: Whether the connection was closed for good.
+            """
+            return self._closed
+
+        @override
+        def _trigger_event(
+                self,
+                event: str,
+                *args: object,
+                **kwargs: object,
+        ) -> object:
+            if event == "error":
+                result = self._pool._trigger_event(event, *args, **kwargs)
+            else:
+                result = self._pool._trigger_event(
+                    event, self, *args, **kwargs,
+                )
+            own = super(ClientPool.Connection, self)._trigger_event(
+                event, *args, **kwargs,
+            )
+            return result if own is None else own
+
+        @override
+        def _want_write(self):
+            if self._connected:
+                self._pool._selector.modify(
+                    self._socket.fileno(), READ | WRITE,
+                )
+
+        @override
+        def _overflow(self):
+            self._send_queue.clear()
+            self._waker.call_soon(self._lose)
+
+        def connect(self):
+            """
+            Start connecting the connection without blocking, unless it is
+            connected, connecting, waiting for its next attempt or closed.
+            The `connect` events are triggered once it is established.
+            Safe to call from another thread.
+            """
+            if self._marshal(self.connect):
+                return
+            if not self._connected and not self._connecting and \
+                    self._timer is None:
+                self._attempt()
+
+        def disconnect(self):
+            """
+            Close the connection for good, after sending its queued frames,
+            and trigger its `disconnect` events if it was established.
+            Safe to call from another thread.
+            """
+            if self._marshal(self.disconnect):
+                return
+            if self._closed:
+                return
+            self._closed = True
+            if self._connected:
+                self._send_queue.push((0).to_bytes(8, sys.byteorder))
+                try:
+                    self._flush()
+                except OSError:
+                    pass
+                self._lose()
+            else:
+                self._close()
+            self._give_up()
+
+        def _attempt(self):
+            """
+            :private:
+
+            Start connecting to the current address of the server without
+            blocking, and give the attempt `connect_timeout` seconds.
+            """
+            self._timer = None
+            if self._closed:
+                return
+            pool = self._pool
+            pool._connections[id(self)] = self
+            family, _, proto, _, addr = self._addr_info[self._addr_index]
+            if self._socket.fileno() == -1:
+                self._socket = socket(
+                    family, SOCK_STREAM | SOCK_NONBLOCK, proto,
+                )
+            fd = self._socket.fileno()
+            error = self._socket.connect_ex(addr)
+            pool._sockets[fd] = self._ready
+            pool._selector.register(fd, WRITE)
+            self._connecting = True
+            if error and error != EINPROGRESS:
+                self._failed()
+                return
+            self._timer = self._timers.call_later(
+                pool.connect_timeout, self._failed,
+            )
+
+        def _ready(self, events: int):
+            """
+            :private:
+
+            Handle the events reported by the selector of the pool for the
+            socket of the connection: finish connecting it, or process its
+            incoming and outgoing data.
+
+            :param events: The events reported for the socket.
+            """
+            if self._connecting:
+                self._established()
+                return
+            if events & READ and not self._recv():
+                self._lose()
+                return
+            if events & WRITE and self._connected:
+                self._send()
+                if not self._send_queue and self._connected:
+                    self._pool._selector.modify(self._socket.fileno(), READ)
+
+        def _established(self):
+            """
+            :private:
+
+            Finish connecting once the socket is writable: start a new
+            session and trigger the `connect` events.
+            """
+            if self._socket.getsockopt(SOL_SOCKET, SO_ERROR):
+                self._failed()
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._connecting = False
+            self._connected = True
+            self._reconnect.reset()
+            self._new_session()
+            self._trigger_event("connect")
+            if self._connected:
+                self._pool._selector.modify(
+                    self._socket.fileno(), READ | WRITE,
+                )
+
+        def _failed(self):
+            """
+            :private:
+
+            Handle a failed or timed out connection attempt: try the next
+            address of the server, or trigger the `error` events and
+            schedule the next attempt, or give the connection up after its
+            last attempt.
+            """
+            self._close()
+            self._connecting = False
+            if self._addr_index + 1 < len(self._addr_info):
+                self._addr_index += 1
+                self._attempt()
+                return
+            self._addr_index = 0
+            self._trigger_event("error", ConnectionError(
+                f"cannot connect to {self.host}:{self.port}"
+            ))
+            if not self._pool.reconnection or self._reconnect.fail():
+                self._give_up()
+                return
+            self._retry()
+
+        def _retry(self):
+            """
+            :private:
+
+            Schedule the next connection attempt after the next delay of
+            the backoff (see `tcpio.Backoff`).
+            """
+            self._timer = self._timers.call_later(
+                self._reconnect.next_delay(), self._attempt,
+            )
+
+        def _lose(self):
+            """
+            :private:
+
+            Close the lost connection without sending its queued frames,
+            trigger the `disconnect` events, then reconnect it if the pool
+            reconnects its connections, or give it up.
+            """
+            if not self._connected:
+                return
+            self._close()
+            self._connected = self._handshaken = False
+            if self._stats is not None:
+                self._stats.disconnections += 1
+            self._acks.cancel(self, ConnectionError(
+                f"{self.host}:{self.port} disconnected before acknowledging"
+            ))
+            self._trigger_event("disconnect")
+            if self._closed:
+                return
+            if self._pool.reconnection:
+                self._retry()
+            else:
+                self._give_up()
+
+        def _close(self):
+            """
+            :private:
+
+            Stop watching the socket, cancel the pending timer, and close
+            the socket.
+            """
+            pool = self._pool
+            fd = self._socket.fileno()
+            if fd in pool._sockets:
+                pool._selector.unregister(fd)
+                del pool._sockets[fd]
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._socket.close()
+
+        def _give_up(self):
+            """
+            :private:
+
+            Remove the connection from the pool for good.
+            """
+            self._closed = True
+            self._pool._connections.pop(id(self), None)
+            self._acks.cancel(self, ConnectionError(
+                f"{self.host}:{self.port} closed before acknowledging"
+            ))
+
+    connect_timeout: Final[float]
+    reconnection: Final[bool]
+    reconnection_attempts: Final[int]
+    reconnection_delay: Final[float]
+    reconnection_delay_max: Final[float]
+
+    _connections: dict[int, Connection]
+    _sockets: dict[int, Callable[[int], object]]
+    _addresses: dict[str, AddressInfo]
+    _acks: Acks
+    _selector: Selector
+    _timers: Timers
+    _waker: Waker
+    _buffer_size: int
+    _codec: Codec
+    _compression_threshold: int | None
+    _compression_level: int
+    _backpressure: Backpressure
+    _stopped: bool
+    _stats: Stats | None
+
+    @override
+    def __init__(
+            self,
+            connect_timeout: float = 1,
+            reconnection: bool = True,
+            reconnection_attempts: int = 0,
+            reconnection_delay: float = RECONNECTION_DELAY,
+            reconnection_delay_max: float = RECONNECTION_DELAY_MAX,
+            handle_sigint: bool = True,
+            buffer_size: int = 4096,
+            backend: str | None = None,
+            codec: str = "pickle",
+            compression_threshold: int | None = None,
+            compression_level: int = -1,
+            high_watermark: int | None = None,
+            low_watermark: int | None = None,
+            overflow: str = "drop",
+            collect_stats: bool = False,
+    ):
+        """
+        `tcpio.ClientPool` constructor.
+
+        :param connect_timeout: The timeout for each connection attempt.
+        :param reconnection: Whether to attempt to reconnect the connections
+            that fail or are lost.
+        :param reconnection_attempts: The number of connection attempts in a
+            row before a connection is given up (0 = infinite).
+        :param reconnection_delay: The first delay between connection
+            attempts (doubled on each retry).
+        :param reconnection_delay_max: The maximum delay between connection
+            attempts.
+        :param handle_sigint: Whether to stop the pool on SIGINT (Ctrl+C).
+        :param buffer_size: The size of the internal buffer of each
+            connection.
+        :param backend: The selector backend to use (`epoll`, `poll` or
+            `select`), `None` for the best one available on the platform.
+        :param codec: The name of the codec to encode the messages with, it
+            must be accepted by the servers.
+        :param compression_threshold: The minimum size of a message to
+            compress it, `None` to never compress the messages.
+        :param compression_level: The zlib compression level (0-9, -1 for
+            the default).
+        :param high_watermark: The maximum number of outgoing bytes queued
+            per connection, `None` for no limit.
+        :param low_watermark: The number of queued bytes under which a
+            congested connection is drained, half of `high_watermark` by
+            default.
+        :param overflow: What to do with the messages emitted on a
+            congested connection: `drop` them or `disconnect` the
+            connection, which is then reconnected like a lost one (see
+            `tcpio.Backpressure`).
+        :param collect_stats: Whether to collect runtime metrics (see
+            `tcpio.Stats`).
+        :raise ValueError: If the watermarks or the overflow policy are
+            invalid.
+        """
+        if overflow == "block":
+            raise ValueError("an event loop cannot block on a connection")
+        super(ClientPool, self).__init__()
+        self.connect_timeout = connect_timeout
+        self.reconnection = reconnection
+        self.reconnection_attempts = reconnection_attempts
+        self.reconnection_delay = reconnection_delay
+        self.reconnection_delay_max = reconnection_delay_max
+        self._connections = {}
+        self._sockets = {}
+        self._addresses = {}
+        self._acks = Acks()
+        self._selector = make_selector(backend)
+        self._timers = Timers()
+        self._waker = Waker()
+        self._selector.register(self._waker.fileno(), READ)
+        self._buffer_size = buffer_size
+        self._codec = get_codec(codec)
+        self._compression_threshold = compression_threshold
+        self._compression_level = compression_level
+        self._backpressure = Backpressure(
+            high_watermark,
+            low_watermark,
+            overflow,
+        )
+        self._stopped = False
+        self._stats = Stats() if collect_stats else None
+        if handle_sigint:
+            def sigint_handler(sig: int, frame: FrameType | None):
+                self.stop()
+            signal(SIGINT, sigint_handler)
+
+    @property
+    def connections(self):
+        """
+        `connections` getter.
+
+        :return: A copy of the connections of the pool, connected or not.
+        """
+        return list(self._connections.values())
+
+    @property
+    def special_events(self):
+        """
+        `special_events` getter.
+
+        :return: Special events that are triggered by the pool.
+        """
+        return "connect", "disconnect", "drain", "error"
+
+    @override
+    def emit(self, event: str, *args: object, **kwargs: object):
+        """
+        Emit an event on all the established connections of the pool.
+        The message is encoded once per event symbol, and the same frame is
+        queued on every connection that does not compress it.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        """
+        if not self._marshal(self.emit, (event, *args), kwargs):
+            broadcast(self._connections.values(), event, args, kwargs)
+
+    @override
+    def _order_key(self, args: tuple[object, ...]):
+        return id(args[0]) if args else None
+
+    def connect(self, address: str):
+        """
+        Add a connection to the server at `address` to the pool, and start
+        connecting it. The host name is resolved once per address.
+        Safe to call from another thread.
+
+        :param address: The address of the server to connect to,
+            `host:port` or `unix:/path/to.sock`.
+        :return: The new connection, whose own event listeners can be
+            added right away, and on which messages can be emitted before
+            it is established.
+        """
+        if (addr_info := self._addresses.get(address)) is None:
+            addr_info = self._addresses[address] = resolve(address)
+        connection = ClientPool.Connection(
+            *split_address(address),
+            addr_info,
+            self,
+        )
+        connection.connect()
+        return connection
+
+    def disconnect(self, connection: Connection):
+        """
+        Call `connection.disconnect()`: close a connection of the pool for
+        good, after sending its queued frames.
+
+        :param connection: The connection to close.
+        """
+        connection.disconnect()
+
+    def stop(self):
+        """
+        Stop the event loop of the pool, `run` returns.
+        Safe to call from a signal handler or from another thread.
+        """
+        self._stopped = True
+        self._waker.wake()
+
+    def run(self):
+        """
+        Run the event loop of the pool until `stop` is called.
+        """
+        self._stopped = False
+        while not self._stopped:
+            self.sleep()
+
+    def close(self):
+        """
+        Close all the connections of the pool, after sending their queued
+        frames, and release its selector.
+        """
+        for connection in list(self._connections.values()):
+            connection.disconnect()
+        self._selector.close()
+        self._waker.close()
+
+    def sleep(self, seconds: float = 0):
+        """
+        Sleep for `seconds` seconds or until the pool gets stopped, while
+        sleeping, connect the connections and process their incoming and
+        outgoing data. If `seconds` is 0, sleep until the next event.
+        The pool blocks in its selector while there is nothing to do, and
+        never past the next timer, the timers that are due run while
+        sleeping.
+
+        :param seconds: The number of seconds to sleep.
+        """
+        deadline = monotonic() + seconds
+        self._waker.thread = get_ident()
+        while not self._stopped:
+            timeout = self._timers.timeout(
+                max(deadline - monotonic(), 0) if seconds else None
+            )
+            ready = self._selector.select(timeout)
+            busy = monotonic()
+            for fd, events in ready:
+                if fd == self._waker.fileno():
+                    self._waker.drain()
+                    continue
+                if (handle := self._sockets.get(fd)) is not None:
+                    handle(events)
+            self._timers.run()
+            if self._stats is not None:
+                self._stats.loop_lag.record(monotonic() - busy)
+            if monotonic() >= deadline:
+                break
+
+    def stats(self):
+        """
+        Get a snapshot of the runtime metrics of the pool (see
+        `tcpio.Stats.snapshot`), along with its number of `connected`
+        connections.
+
+        :return: The metrics as a dict, `None` if the pool was created
+            without `collect_stats=True`.
+        """
+        if self._stats is None:
+            return None
+        return {
+            **self._stats.snapshot(),
+            "connected": sum(
+                connection.connected
+                for connection in self._connections.values()
+            ),
+        }
+
+
+__all__ = "ClientPool",
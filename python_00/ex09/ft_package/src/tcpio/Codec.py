@@ -0,0 +1,343 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from struct import Struct
+from typing import ClassVar, Final, Any, cast
+from .Message import Message, EventRef
+import json
+import marshal
+import pickle as pkl
+
+
+@dataclass(slots=True, frozen=True)
+class Codec(ABC):
+    """
+    Base class for the wire formats of the `tcpio` messages.
+
+    :attr name: The name that identifies the codec during the handshake.
+    """
+    name: ClassVar[str]
+
+    @abstractmethod
+    def encode(
+            self,
+            event: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            ack: int | None = None,
+    ) -> bytes:
+        """
+        Encode a message.
+
+        :param event: The event of the message (see `tcpio.Message`).
+        :param args: The arguments of the event.
+        :param kwargs: The keyword arguments of the event.
+        :param ack: The correlation ID of the message, if any. It is only
+            encoded when it is not `None`, as a fourth item.
+        :return: The encoded message.
+        """
+        ...
+
+    @abstractmethod
+    def decode(self, data: memoryview) -> Message:
+        """
+        Decode a message.
+
+        :param data: The encoded message.
+        :return: The decoded message.
+        """
+        ...
+
+
+@dataclass(slots=True, frozen=True)
+class PickleCodec(Codec):
+    """
+    Codec based on `pickle`, supports any picklable object.
+    Only use it between trusted peers.
+    """
+    name: ClassVar[str] = "pickle"
+
+    def encode(
+            self,
+            event: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            ack: int | None = None,
+    ):
+        return pkl.dumps(
+            (event, args, kwargs) if ack is None else
+            (event, args, kwargs, ack),
+            pkl.HIGHEST_PROTOCOL,
+        )
+
+    def decode(self, data: memoryview):
+        return Message(*pkl.loads(data))
+
+
+@dataclass(slots=True, frozen=True)
+class MarshalCodec(Codec):
+    """
+    Codec based on `marshal`, supports the built-in types only.
+    The format depends on the Python version, so both peers must run the
+    same one.
+    """
+    name: ClassVar[str] = "marshal"
+
+    def encode(
+            self,
+            event: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            ack: int | None = None,
+    ):
+        return marshal.dumps(cast(
+            Any,
+            (event, args, kwargs) if ack is None else
+            (event, args, kwargs, ack),
+        ))
+
+    def decode(self, data: memoryview):
+        return Message(*marshal.loads(data))
+
+
+@dataclass(slots=True, frozen=True)
+class JSONCodec(Codec):
+    """
+    Codec based on `json`, supports the JSON types only.
+    Tuples are decoded as lists, except the positional arguments and the
+    symbol definitions of the events.
+    """
+    name: ClassVar[str] = "json"
+
+    def encode(
+            self,
+            event: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            ack: int | None = None,
+    ):
+        return json.dumps(
+            (event, args, kwargs) if ack is None else
+            (event, args, kwargs, ack),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+
+    def decode(self, data: memoryview):
+        event, args, kwargs, *ack = json.loads(str(data, "utf-8"))
+        if type(event) is list:
+            event = cast(tuple[int, str], tuple(event))
+        return Message(event, tuple(args), kwargs, *ack)
+
+
+_DOUBLE: Final = Struct("<d")
+
+
+@dataclass(slots=True, frozen=True)
+class BinaryCodec(Codec):
+    """
+    Compact tagged binary codec for `None`, `bool`, `int`, `float`, `str`,
+    `bytes`, `list`, `tuple` and `dict`.
+
+    Each value is a one byte tag followed by its payload. Lengths are
+    encoded as unsigned LEB128 varints, and integers as zigzag varints.
+    """
+    name: ClassVar[str] = "binary"
+
+    def encode(
+            self,
+            event: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            ack: int | None = None,
+    ):
+        out = bytearray()
+        _write(out, event)
+        _write(out, args)
+        _write(out, kwargs)
+        if ack is not None:
+            _write(out, ack)
+        return bytes(out)
+
+    def decode(self, data: memoryview):
+        event, offset = _read(data, 0)
+        args, offset = _read(data, offset)
+        kwargs, offset = _read(data, offset)
+        ack = None
+        if offset != len(data):
+            ack, offset = _read(data, offset)
+        if offset != len(data) or ack is not None and type(ack) is not int:
+            raise ValueError("trailing data after binary message")
+        return Message(
+            cast(EventRef | None, event),
+            cast(tuple[object, ...], args),
+            cast(dict[str, object], kwargs),
+            ack,
+        )
+
+
+def _write_size(out: bytearray, size: int):
+    """
+    :private:
+
+    Append `size` to `out` as an unsigned LEB128 varint.
+
+    :param out: The output buffer.
+    :param size: The non-negative integer to write.
+    """
+    while size > 0x7f:
+        out.append(size & 0x7f | 0x80)
+        size >>= 7
+    out.append(size)
+
+
+def _write(out: bytearray, value: object):
+    """
+    :private:
+
+    Append the tagged encoding of `value` to `out`.
+
+    :param out: The output buffer.
+    :param value: The value to encode.
+    :raise TypeError: If `value` is of an unsupported type.
+    """
+    kind = type(value)
+    if kind is str:
+        data = cast(str, value).encode()
+        out.append(0x73)  # s
+        _write_size(out, len(data))
+        out += data
+    elif kind is int:
+        number = cast(int, value)
+        out.append(0x69)  # i
+        _write_size(out, number << 1 if number >= 0 else ~number << 1 | 1)
+    elif value is None:
+        out.append(0x4e)  # N
+    elif kind is bool:
+        out.append(0x54 if value else 0x46)  # T / F
+    elif kind is float:
+        out.append(0x64)  # d
+        out += _DOUBLE.pack(value)
+    elif kind is bytes or kind is bytearray:
+        out.append(0x62)  # b
+        _write_size(out, len(cast(bytes, value)))
+        out += cast(bytes, value)
+    elif kind is list or kind is tuple:
+        items = cast(list[object], value)
+        out.append(0x6c if kind is list else 0x74)  # l / t
+        _write_size(out, len(items))
+        for item in items:
+            _write(out, item)
+    elif kind is dict:
+        mapping = cast(dict[object, object], value)
+        out.append(0x6d)  # m
+        _write_size(out, len(mapping))
+        for key, item in mapping.items():
+            _write(out, key)
+            _write(out, item)
+    else:
+        raise TypeError(
+            f"BinaryCodec cannot encode objects of type {kind.__name__}"
+        )
+
+
+def _read_size(data: memoryview, offset: int):
+    """
+    :private:
+
+    Read an unsigned LEB128 varint from `data` at `offset`.
+
+    :param data: The input buffer.
+    :param offset: The offset of the varint.
+    :return: The decoded integer and the offset following it.
+    """
+    size = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        size |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return size, offset
+        shift += 7
+
+
+def _read(data: memoryview, offset: int) -> tuple[Any, int]:
+    """
+    :private:
+
+    Decode the tagged value of `data` at `offset`.
+
+    :param data: The input buffer.
+    :param offset: The offset of the value's tag.
+    :return: The decoded value and the offset following it.
+    :raise ValueError: If the tag is unknown.
+    """
+    tag = data[offset]
+    offset += 1
+    if tag == 0x73:  # s
+        size, offset = _read_size(data, offset)
+        return str(data[offset:offset + size], "utf-8"), offset + size
+    if tag == 0x69:  # i
+        number, offset = _read_size(data, offset)
+        return (~(number >> 1) if number & 1 else number >> 1), offset
+    if tag == 0x4e:  # N
+        return None, offset
+    if tag == 0x54 or tag == 0x46:  # T / F
+        return tag == 0x54, offset
+    if tag == 0x64:  # d
+        return _DOUBLE.unpack_from(data, offset)[0], offset + 8
+    if tag == 0x62:  # b
+        size, offset = _read_size(data, offset)
+        return bytes(data[offset:offset + size]), offset + size
+    if tag == 0x6c or tag == 0x74:  # l / t
+        size, offset = _read_size(data, offset)
+        items: list[object] = []
+        for _ in range(size):
+            item, offset = _read(data, offset)
+            items.append(item)
+        return (items if tag == 0x6c else tuple(items)), offset
+    if tag == 0x6d:  # m
+        size, offset = _read_size(data, offset)
+        mapping: dict[object, object] = {}
+        for _ in range(size):
+            key, offset = _read(data, offset)
+            mapping[key], offset = _read(data, offset)
+        return mapping, offset
+    raise ValueError(f"unknown BinaryCodec tag: {tag:#x}")
+
+
+CODECS: Final[dict[str, Codec]] = {}
+
+
+def register_codec(codec: Codec):
+    """
+    Make `codec` available to the clients and servers of this process,
+    replacing any codec registered with the same name.
+
+    :param codec: The codec to register.
+    :return: `codec`.
+    """
+    CODECS[codec.name] = codec
+    return codec
+
+
+def get_codec(name: str):
+    """
+    Get the registered codec named `name`.
+
+    :param name: The name of the codec.
+    :return: The codec.
+    :raise ValueError: If no codec is registered with this name.
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown codec: {name}") from None
+
+
+for _codec in PickleCodec(), MarshalCodec(), JSONCodec(), BinaryCodec():
+    register_codec(_codec)
+
+__all__ = (
+    "Codec", "PickleCodec", "MarshalCodec", "JSONCodec", "BinaryCodec",
+    "CODECS", "register_codec", "get_codec",
+)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Final
+import zlib
+
+MAX_DECOMPRESSED_SIZE: Final = 64 << 20
+
+
+@dataclass(slots=True)
+class Compression:
+    """
+    The zlib streams used to compress the frames of one connection.
+
+    A single compressor and a single decompressor are kept for the whole
+    connection and flushed with `Z_SYNC_FLUSH` after each frame, so that
+    every frame benefits from the history of the previous ones. The streams
+    are only allocated when the first frame needs them.
+    An incoming payload is never decompressed past `max_size` bytes, so that
+    a small frame cannot expand into an unbounded amount of memory.
+
+    :attr threshold: The minimum size of a payload to compress it, `None`
+        to never compress outgoing payloads.
+    :attr level: The zlib compression level (0-9, -1 for the default).
+    :attr max_size: The maximum size of a decompressed payload.
+    """
+    threshold: Final[int | None] = None
+    level: Final[int] = -1
+    max_size: Final[int] = MAX_DECOMPRESSED_SIZE
+
+    _compressor: "zlib._Compress | None" = field(init=False, default=None)
+    _decompressor: "zlib._Decompress | None" = field(init=False, default=None)
+
+    def should_compress(self, size: int):
+        """
+        :param size: The size of an outgoing payload.
+        :return: Whether the payload must be compressed.
+        """
+        return self.threshold is not None and size >= self.threshold
+
+    def compress(self, data: bytes):
+        """
+        Compress an outgoing payload.
+
+        :param data: The payload to compress.
+        :return: The compressed payload.
+        """
+        if self._compressor is None:
+            self._compressor = zlib.compressobj(self.level)
+        return self._compressor.compress(data) + \
+            self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def decompress(self, data: memoryview):
+        """
+        Decompress an incoming payload.
+
+        :param data: The compressed payload.
+        :return: The decompressed payload.
+        :raise ValueError: If the payload decompresses to more than
+            `max_size` bytes.
+        """
+        if self._decompressor is None:
+            self._decompressor = zlib.decompressobj()
+        pkt = self._decompressor.decompress(data, self.max_size)
+        if self._decompressor.unconsumed_tail:
+            raise ValueError(
+                f"compressed payload expands past {self.max_size} bytes"
+            )
+        return pkt
+
+    def reset(self):
+        """
+        Drop both streams, for a new connection.
+        """
+        self._compressor = self._decompressor = None
+
+
+__all__ = "Compression", "MAX_DECOMPRESSED_SIZE"
@@ -0,0 +1,91 @@
+from time import monotonic
+from typing import Callable
+from .Timers import Timer, Timers
+from .Waker import Waker
+
+
+class EventLoop:
+    """
+    Mixin for the `tcpio` classes that run their own event loop: it
+    schedules timers on the loop, and the calls made from other threads
+    through the waker of the loop. The classes that use it provide a
+    `_timers` heap and a `_waker`.
+    """
+    __slots__ = ()
+
+    _timers: Timers
+    _waker: Waker
+
+    def call_later(
+            self,
+            delay: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        """
+        Call `callback(*args)` on the event loop in `delay` seconds, while
+        the loop runs. Safe to call from another thread.
+
+        :param delay: The number of seconds to wait.
+        :param callback: The function to call.
+        :param args: The arguments of the call.
+        :return: The timer, whose `cancel` method cancels the call.
+        """
+        return self._schedule(Timer(monotonic() + delay, None, callback, args))
+
+    def call_every(
+            self,
+            interval: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        """
+        Call `callback(*args)` on the event loop every `interval` seconds,
+        while the loop runs, until the returned timer is cancelled.
+        Safe to call from another thread.
+
+        :param interval: The number of seconds between the calls.
+        :param callback: The function to call.
+        :param args: The arguments of the calls.
+        :return: The timer, whose `cancel` method cancels the calls.
+        :raise ValueError: If `interval` is not positive.
+        """
+        return self._schedule(
+            Timer(monotonic() + interval, interval, callback, args)
+        )
+
+    def _schedule(self, timer: Timer):
+        """
+        :private:
+
+        Add `timer` to the timers of the event loop, from any thread.
+
+        :param timer: The timer to schedule.
+        :return: The timer.
+        """
+        if not self._marshal(self._timers.schedule, (timer,)):
+            self._timers.schedule(timer)
+        return timer
+
+    def _marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ):
+        """
+        :private:
+
+        If the current thread does not run the event loop, schedule
+        `call(*args, **kwargs)` on it (see `tcpio.Waker.marshal`).
+
+        :param call: The function to call.
+        :param args: The arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :return: Whether the call was scheduled, in which case the caller
+            must not perform it.
+        """
+        return self._waker.marshal(call, args, kwargs)
+
+
+__all__ = "EventLoop",
@@ -0,0 +1,725 @@
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from .IO import IO
+from .Acks import Acks, Cancellable
+from .Backpressure import Backpressure
+from .Codec import Codec, get_codec
+from .Compression import Compression
+from .Message import EventRef, Message
+from .RecvBuffer import RecvBuffer
+from .SendQueue import SendQueue
+from .Stats import Stats
+import sys as sys
+from asyncio import Future as AsyncFuture
+from concurrent.futures import Future
+from functools import partial
+from time import perf_counter
+from typing import Callable, Final, Iterable, TypeAlias, cast
+from typing_extensions import override
+
+HANDSHAKE: Final = b"TCPIO\x04"
+MAX_SYMBOLS: Final = 1024
+COMPRESSED: Final = 1 << 63
+CONTROL: Final = 1 << 62
+PING: Final = (1 | CONTROL).to_bytes(8, sys.byteorder) + b"\x01"
+PONG: Final = (1 | CONTROL).to_bytes(8, sys.byteorder) + b"\x02"
+
+Encoded: TypeAlias = dict[tuple[Codec, EventRef | None], tuple[bytes, bytes]]
+
+
+class Control(Enum):
+    """
+    The frames that carry no message, as decoded by `FrameIO._decode`.
+    """
+    EOF = "EOF"
+    PING = "PING"
+    PONG = "PONG"
+
+
+@dataclass(slots=True)
+class FrameIO(IO):
+    """
+    Base class for the framed connections of `tcpio`, independent of the
+    way their bytes are transported.
+
+    The first frame sent on a connection is a handshake made of `HANDSHAKE`
+    followed by the name of a codec: the client proposes the codec it
+    encodes its messages with, and the server answers with the same name
+    if it accepts it, or with an empty name otherwise.
+
+    Event names are interned per connection and per direction: the first
+    message of an event carries a `(symbol ID, name)` pair, and the next
+    ones only carry the symbol ID. At most `MAX_SYMBOLS` names are
+    interned, the next ones are always sent in full. The client's handshake
+    also lists the names it already interned, in ID order, so that the
+    frames it queued before a reconnection stay valid. A symbol ID that is
+    not defined yet, or a definition that skips IDs or goes past
+    `MAX_SYMBOLS`, is a protocol error.
+
+    Once the handshake is done, the payloads that reach the compression
+    threshold are compressed with the connection's zlib stream, and the
+    `COMPRESSED` bit of their size header is set.
+
+    The outgoing bytes queued on a connection are bounded by its
+    watermarks (see `tcpio.Backpressure`): the `drain` events are
+    triggered when a congested connection falls to its low watermark.
+    A message is only compressed, and the symbol it defines only interned,
+    once the watermarks admitted it, so that a refused message leaves the
+    zlib stream and the symbol table as they were.
+
+    A message emitted with `request` carries a correlation ID, and
+    the peer replies to it with the value returned by its listeners, tagged
+    with the same ID (see `tcpio.Acks`). When the listeners return a future
+    that fails, or a value that the codec cannot encode, the reply carries
+    no value but an `error` keyword argument that describes the failure.
+
+    Frames whose `CONTROL` bit is set carry no message: a `PING` frame is
+    answered right away with a `PONG` frame, without running any listener
+    and regardless of the watermarks, so that the peer can tell that the
+    connection is alive.
+
+    A frame that cannot be decoded, or whose event cannot be resolved,
+    triggers the `error` events with the error, and closes the connection.
+    When the owner of the connection collects metrics, the messages and the
+    frames that cannot be decoded are counted in its `tcpio.Stats`.
+
+    :attr codec: The codec used to encode and decode the messages.
+    """
+    _recv_buffer: RecvBuffer = field(init=False)
+    _send_queue: SendQueue = field(init=False, default_factory=SendQueue)
+    _codec: Codec = field(init=False)
+    _handshaken: bool = field(init=False, default=False)
+    _out_symbols: dict[str, int] = field(init=False, default_factory=dict)
+    _in_symbols: list[str] = field(init=False, default_factory=list)
+    _compression: Compression = field(init=False, default_factory=Compression)
+    _backpressure: Backpressure = field(
+        init=False,
+        default_factory=Backpressure,
+    )
+    _acks: Acks = field(init=False, default_factory=Acks)
+    _stats: Stats | None = field(init=False, default=None)
+
+    def __post_init__(self):
+        """
+        `tcpio.FrameIO` post constructor.
+        """
+        self._codec = get_codec("pickle")
+
+    @property
+    def codec(self):
+        """
+        `codec` getter.
+
+        :return: The codec used to encode and decode the messages.
+        """
+        return self._codec
+
+    @property
+    def congested(self):
+        """
+        `congested` getter.
+
+        :return: Whether a frame was refused since the connection last
+            fell to its low watermark.
+        """
+        return self._backpressure.congested
+
+    @override
+    def emit(self, event: str, *args: object, **kwargs: object):
+        """
+        Emit the event `event` with `args` and `kwargs` as arguments.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :return: `False` if the message was refused because the connection
+            is congested, `True` otherwise (including when the call is
+            scheduled on the event loop from another thread).
+        """
+        if self._marshal(self.emit, (event, *args), kwargs):
+            return True
+        return self._emit(event, args, kwargs)
+
+    def request(
+            self,
+            event: str,
+            *args: object,
+            ack: Callable[[object], object],
+            timeout: float | None = None,
+            **kwargs: object,
+    ):
+        """
+        Emit the event `event` with `args` and `kwargs` as arguments, and
+        ask the peer for a reply: the peer replies with the value returned
+        by the last of its listeners that returned one (or the result of the
+        coroutine or the offloaded call it returned), and `ack` is called
+        with the reply.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param ack: The callback to call with the reply of the peer, with
+            a `RuntimeError` if the listeners of the peer failed to produce
+            one, with a `TimeoutError` if there is no reply after `timeout`
+            seconds, or with a `ConnectionError` if the connection is lost
+            first.
+        :param timeout: The number of seconds to wait for the reply, `None`
+            to wait until the connection is lost.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :return: `False` if the message was refused because the connection
+            is congested, `True` otherwise (including when the call is
+            scheduled on the event loop from another thread).
+        """
+        if self._marshal(self.request, (event, *args),
+                         {**kwargs, "ack": ack, "timeout": timeout}):
+            return True
+        correlation = self._acks.add(self, ack)
+        if timeout is not None:
+            self._acks.expire_with(correlation, self._call_later(
+                timeout, self._acks.expire, correlation,
+            ))
+        if self._emit(event, args, kwargs, correlation):
+            return True
+        self._acks.discard(correlation)
+        return False
+
+    def _emit(
+            self,
+            event: str,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            correlation: int | None = None,
+    ):
+        """
+        :private:
+
+        Queue a message and count it in the stats of the owner of the
+        connection.
+
+        :param event: The event of the message.
+        :param args: The positional arguments of the message.
+        :param kwargs: The keyword arguments of the message.
+        :param correlation: The correlation ID of the message, `None` if it
+            expects no reply.
+        :return: Whether the message was queued.
+        """
+        frame = self._queue_message(event, args, kwargs, correlation)
+        if frame is None:
+            return False
+        if self._stats is not None:
+            self._stats.sent(event, len(frame))
+        return True
+
+    @abstractmethod
+    def _call_later(
+            self,
+            delay: float,
+            callback: Callable[..., object],
+            *args: object,
+    ) -> Cancellable:
+        """
+        :private:
+
+        Schedule `callback(*args)` on the event loop of the connection in
+        `delay` seconds.
+
+        :param delay: The number of seconds to wait.
+        :param callback: The function to call.
+        :param args: The arguments of the call.
+        :return: The timer, to cancel the call.
+        """
+        ...
+
+    def _reply(self, correlation: int, result: object):
+        """
+        :private:
+
+        Send `result` as the reply to the acknowledged message
+        `correlation`. If `result` is a future (a task or an offloaded
+        call), send its result once it is done. If the codec cannot encode
+        `result`, trigger the `error` events with the encoding error and
+        send an error reply instead.
+
+        :param correlation: The correlation ID of the message.
+        :param result: The value returned by the listeners of the message.
+        """
+        if self._marshal(self._reply, (correlation, result)):
+            return
+        if isinstance(result, (Future, AsyncFuture)):
+            result.add_done_callback(partial(self._reply_outcome, correlation))
+            return
+        try:
+            self._queue_message(None, (result,), {}, correlation)
+        except Exception as error:
+            self._report_error(error)
+            self._queue_message(None, (), {
+                "error": f"{type(error).__name__}: {error}",
+            }, correlation)
+
+    def _reply_outcome(
+            self,
+            correlation: int,
+            done: Future[object] | AsyncFuture[object],
+    ):
+        """
+        :private:
+
+        Reply to the acknowledged message `correlation` with the outcome
+        of the future `done`: its result, or an error reply if it failed or
+        was cancelled. The failure itself is reported where the future is
+        run (see `tcpio.Offloaded` and `tcpio.aio.Tasks`).
+
+        :param correlation: The correlation ID of the message.
+        :param done: The future returned by the listeners of the message.
+        """
+        if self._marshal(self._reply_outcome, (correlation, done)):
+            return
+        if done.cancelled():
+            error = "cancelled"
+        elif (exception := done.exception()) is not None:
+            error = f"{type(exception).__name__}: {exception}"
+        else:
+            self._reply(correlation, done.result())
+            return
+        self._queue_message(None, (), {"error": error}, correlation)
+
+    def _queue(self, frame: bytes):
+        """
+        :private:
+
+        Queue the encoded frame `frame` if the watermarks admit it, apply
+        the overflow policy otherwise.
+
+        :param frame: The encoded frame to send.
+        :return: Whether the frame was queued.
+        """
+        if not self._admit(len(frame)):
+            return False
+        self._push(frame)
+        return True
+
+    def _queue_message(
+            self,
+            event: str | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            correlation: int | None = None,
+            encoded: Encoded | None = None,
+    ):
+        """
+        :private:
+
+        Encode a message and queue it if the watermarks admit it, apply the
+        overflow policy otherwise. The symbol that the message defines is
+        only interned, and the message only compressed, once it is
+        admitted.
+
+        :param event: The event of the message, `None` for a reply.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :param correlation: The correlation ID of the message, if it is
+            acknowledged or if it is a reply.
+        :param encoded: The messages already encoded for the other clients
+            of a broadcast, by codec and event reference, with and without
+            their size header, `None` if the message is not broadcast.
+        :return: The queued frame, `None` if the message was refused.
+        """
+        ref = None if event is None else self._event_ref(event)
+        pkt, frame = self._encoded(ref, args, kwargs, correlation, encoded)
+        if not self._admit(len(frame)):
+            return None
+        if event is not None and (admitted := self._event_ref(event)) != ref:
+            # The `drain` listeners interned symbols while blocking.
+            ref = admitted
+            pkt, frame = self._encoded(
+                ref, args, kwargs, correlation, encoded,
+            )
+        if type(ref) is tuple:
+            self._out_symbols[ref[1]] = ref[0]
+        if self._handshaken and self._compression.should_compress(len(pkt)):
+            frame = self._frame(pkt)
+        self._push(frame)
+        return frame
+
+    def _encoded(
+            self,
+            ref: EventRef | None,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            correlation: int | None,
+            encoded: Encoded | None,
+    ):
+        """
+        :private:
+
+        Encode a message with the codec of the connection, unless it is in
+        `encoded` already.
+
+        :param ref: The reference to the event of the message.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :param correlation: The correlation ID of the message, if any.
+        :param encoded: The messages already encoded, see `_queue_message`.
+        :return: The encoded message, and its uncompressed frame.
+        """
+        key = self._codec, ref
+        if encoded is None or (cached := encoded.get(key)) is None:
+            pkt = self._codec.encode(ref, args, kwargs, correlation)
+            cached = pkt, len(pkt).to_bytes(8, sys.byteorder) + pkt
+            if encoded is not None:
+                encoded[key] = cached
+        return cached
+
+    def _admit(self, size: int):
+        """
+        :private:
+
+        Check whether the watermarks admit a frame of `size` bytes, and
+        apply the overflow policy if they do not. A connection is only
+        disconnected once, when it becomes congested.
+
+        :param size: The size of the frame.
+        :return: Whether the frame can be queued.
+        """
+        backpressure = self._backpressure
+        congested = backpressure.congested
+        if not backpressure.admits(self._pending(), size):
+            if backpressure.policy != "block" or not self._block():
+                if backpressure.policy == "disconnect" and not congested:
+                    self._report_error(BufferError(
+                        "outgoing bytes over the high watermark"
+                    ))
+                    self._overflow()
+                return False
+        return True
+
+    def _push(self, frame: bytes | memoryview):
+        """
+        :private:
+
+        Add the encoded frame `frame` to the send queue, and call
+        `_want_write` if the queue was empty.
+
+        :param frame: The encoded frame to send.
+        """
+        idle = not self._send_queue
+        self._send_queue.push(frame)
+        if idle:
+            self._want_write()
+
+    def _pending(self):
+        """
+        :private:
+
+        :return: The number of outgoing bytes queued on the connection.
+        """
+        return self._send_queue.pending
+
+    def _block(self) -> bool:
+        """
+        :private:
+
+        Send the queued frames until the queued bytes fall to the low
+        watermark, for the `block` overflow policy.
+        By default, the connection cannot block.
+
+        :return: Whether the queued bytes fell to the low watermark.
+        """
+        return False
+
+    def _overflow(self) -> None:
+        """
+        :private:
+
+        Close the connection without sending its queued frames, for the
+        `disconnect` overflow policy.
+        """
+
+    def _want_write(self) -> None:
+        """
+        :private:
+
+        Called when frames are queued on an empty send queue, so that the
+        owner of the connection can start sending them.
+        """
+
+    def _dispatch(self):
+        """
+        :private:
+
+        Decode the frames waiting in the receive buffer, and trigger the
+        events corresponding to the decoded messages.
+
+        :return: False if the peer closed the connection, the handshake
+            failed or a frame could not be decoded or was malformed, True
+            otherwise.
+        """
+        stats = self._stats
+        while True:
+            size = 0 if stats is None else len(self._recv_buffer)
+            try:
+                pkt = self._decode()
+                event = self._event_name(pkt) if isinstance(pkt, Message) \
+                    else None
+            except Exception as error:
+                if stats is not None:
+                    stats.decode_errors += 1
+                self._report_error(error)
+                return False
+            if pkt is None:
+                return True
+            if isinstance(pkt, Control):
+                if pkt is Control.EOF:
+                    return False
+                if pkt is Control.PING:
+                    self._push(PONG)
+                continue
+            if not isinstance(pkt, Message):
+                if not self._handshake(pkt):
+                    return False
+                continue
+            if event is None:
+                if pkt.ack is None:
+                    continue
+                if "error" in pkt.kwargs:
+                    value: object = RuntimeError(
+                        f"message {pkt.ack} failed: {pkt.kwargs['error']}"
+                    )
+                else:
+                    value = pkt.args[0] if pkt.args else None
+                self._acks.resolve(self, pkt.ack, value)
+                continue
+            if stats is None:
+                result = self._trigger_event(event, *pkt.args, **pkt.kwargs)
+            else:
+                size -= len(self._recv_buffer)
+                begin = perf_counter()
+                result = self._trigger_event(event, *pkt.args, **pkt.kwargs)
+                stats.received(event, size, perf_counter() - begin)
+            if pkt.ack is not None:
+                self._reply(pkt.ack, result)
+
+    def _event_ref(self, event: str) -> EventRef:
+        """
+        :private:
+
+        Get the reference to send for the event `event`. The symbol table
+        is left as it is: a `(symbol ID, name)` pair defines the next
+        symbol, and it is up to the caller to record it once the message
+        is sent.
+
+        :param event: The name of the event.
+        :return: The symbol ID of the event, a `(symbol ID, name)` pair if
+            it is not interned yet and there is room left in the symbol
+            table, or its name if it cannot be interned.
+        """
+        if (symbol := self._out_symbols.get(event)) is not None:
+            return symbol
+        if len(self._out_symbols) < MAX_SYMBOLS and "\0" not in event:
+            return len(self._out_symbols), event
+        return event
+
+    def _frame(self, pkt: bytes):
+        """
+        :private:
+
+        Compress the encoded message `pkt` if needed, and prefix it with
+        its size header.
+
+        :param pkt: The encoded message.
+        :return: The frame to send.
+        """
+        if self._handshaken and self._compression.should_compress(len(pkt)):
+            pkt = self._compression.compress(pkt)
+            return (len(pkt) | COMPRESSED).to_bytes(8, sys.byteorder) + pkt
+        return len(pkt).to_bytes(8, sys.byteorder) + pkt
+
+    def _event_name(self, message: Message):
+        """
+        :private:
+
+        Check the shape of the received message `message`, and get the name
+        of its event.
+
+        :param message: The decoded message.
+        :return: The name of the event, `None` for a reply.
+        :raise ValueError: If the arguments or the correlation ID of the
+            message are not of the expected types, or if its event cannot
+            be resolved.
+        """
+        args, kwargs, ack = message.args, message.kwargs, message.ack
+        if type(args) is not tuple and type(args) is not list or \
+                type(kwargs) is not dict or \
+                any(type(key) is not str for key in kwargs) or \
+                ack is not None and type(ack) is not int:
+            raise ValueError(f"malformed message: {message!r:.80}")
+        event = message.event
+        if event is None or type(event) is str:
+            return event
+        return self._resolve(event)
+
+    def _resolve(self, ref: object):
+        """
+        :private:
+
+        Get the event name referenced by the received symbol `ref`, and
+        record the symbol first if `ref` defines it. A symbol can be
+        defined again, or defined with the next free ID if there are less
+        than `MAX_SYMBOLS` symbols.
+
+        :param ref: A symbol ID, or a `(symbol ID, name)` pair.
+        :return: The interned event name.
+        :raise ValueError: If `ref` is not a valid reference, or if its
+            symbol is not defined and `ref` does not define it.
+        """
+        symbols = self._in_symbols
+        if type(ref) is int:
+            if not 0 <= ref < len(symbols):
+                raise ValueError(f"undefined symbol ID: {ref}")
+            return symbols[ref]
+        if type(ref) is not tuple or len(ref) != 2 or \
+                type(ref[0]) is not int or type(ref[1]) is not str:
+            raise ValueError(f"invalid event reference: {ref!r:.80}")
+        symbol, name = cast(tuple[int, str], ref)
+        name = sys.intern(name)
+        if symbol == len(symbols) < MAX_SYMBOLS:
+            symbols.append(name)
+        elif 0 <= symbol < len(symbols):
+            symbols[symbol] = name
+        else:
+            raise ValueError(
+                f"symbol ID {symbol} defined out of order, "
+                f"{len(symbols)} symbols are defined"
+            )
+        return name
+
+    def _define_symbols(self, symbols: list[str]):
+        """
+        :private:
+
+        Record the event names listed by the handshake of the peer as the
+        symbols it already defined, in ID order. Trigger the `error` events
+        with a `ValueError` if there are more than `MAX_SYMBOLS` of them.
+
+        :param symbols: The event names of the handshake.
+        :return: Whether the symbols were recorded.
+        """
+        if len(symbols) > MAX_SYMBOLS:
+            self._report_error(ValueError(
+                f"{len(symbols)} symbols listed in the handshake, "
+                f"at most {MAX_SYMBOLS} are allowed"
+            ))
+            return False
+        self._in_symbols = [sys.intern(name) for name in symbols]
+        return True
+
+    def _handshake_frame(self, codec: str, symbols: Iterable[str] = ()):
+        """
+        :private:
+
+        Encode a handshake frame.
+
+        :param codec: The name of the proposed or accepted codec, or an
+            empty string to refuse the connection.
+        :param symbols: The event names already interned, in ID order.
+        :return: The encoded handshake frame.
+        """
+        pkt = b"\0".join([HANDSHAKE + codec.encode(), *(
+            name.encode() for name in symbols
+        )])
+        return len(pkt).to_bytes(8, sys.byteorder) + pkt
+
+    def _handshake(self, pkt: bytes):
+        """
+        :private:
+
+        Process the handshake frame `pkt` received from the peer.
+        By default, check that the peer accepted our codec, and trigger the
+        `error` events with a `ConnectionRefusedError` otherwise.
+
+        :param pkt: The payload of the handshake frame.
+        :return: Whether the connection can go on.
+        """
+        if pkt != HANDSHAKE + self._codec.name.encode():
+            self._trigger_event("error", ConnectionRefusedError(
+                f"codec {self._codec.name!r} refused by the peer"
+            ))
+            return False
+        self._handshaken = True
+        return True
+
+    def _decode(self) -> Message | bytes | Control | None:
+        """
+        :private:
+
+        Decode the next event in the receive buffer, if any.
+
+        :return: The first decoded event, the payload of the handshake
+            frame as `bytes` if the handshake is not done yet,
+            `Control.EOF` if the peer closed the connection,
+            `Control.PING` or `Control.PONG` for a control frame, or `None`
+            if there is no event to decode.
+        """
+        if len(self._recv_buffer) < 8:
+            return None
+        with self._recv_buffer.view() as view:
+            header = int.from_bytes(view[:8], sys.byteorder)
+            pkt_size = header & ~(COMPRESSED | CONTROL)
+            if len(view) < pkt_size + 8:
+                return None
+            if not pkt_size:
+                pkt = Control.EOF
+            elif header & CONTROL:
+                pkt = Control.PING if view[8] == PING[8] else Control.PONG
+            elif not self._handshaken:
+                pkt = bytes(view[8:pkt_size+8])
+            elif header & COMPRESSED:
+                pkt = self._codec.decode(memoryview(
+                    self._compression.decompress(view[8:pkt_size+8])
+                ))
+            else:
+                pkt = self._codec.decode(view[8:pkt_size+8])
+        self._recv_buffer.consume(pkt_size + 8)
+        return pkt
+
+
+def broadcast(
+        clients: Iterable[FrameIO],
+        event: str,
+        args: tuple[object, ...],
+        kwargs: dict[str, object],
+        exclude: FrameIO | None = None,
+):
+    """
+    Emit an event to all the handshaken `clients` except `exclude`,
+    encoding each distinct `(codec, event reference)` pair only once, and
+    queuing the same frame on every client that does not compress it. The
+    watermarks of each client are checked before its symbol is interned
+    and before the message is compressed for it. The clients whose codec
+    cannot encode the message are skipped, and the `error` events are
+    triggered with the encoding error, once per codec.
+
+    :param clients: The clients to emit the event to.
+    :param event: The event to emit.
+    :param args: The arguments to pass to the event's callbacks.
+    :param kwargs: The keyword arguments to pass to the event's callbacks.
+    :param exclude: The client to skip, if any.
+    """
+    encoded: Encoded = {}
+    failed: set[Codec] = set()
+    for client in clients:
+        if client is exclude or not client._handshaken or \
+                client._codec in failed:
+            continue
+        try:
+            frame = client._queue_message(event, args, kwargs, None, encoded)
+        except Exception as error:
+            failed.add(client._codec)
+            client._report_error(error)
+            continue
+        if frame is not None and client._stats is not None:
+            client._stats.sent(event, len(frame))
+
+
+__all__ = "FrameIO", "broadcast", "Encoded", "Control", "HANDSHAKE", \
+    "MAX_SYMBOLS", "COMPRESSED", "CONTROL", "PING", "PONG"
@@ -0,0 +1,283 @@
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count
+from typing import Callable, Final, Iterator
+
+WILDCARD: Final = "*"
+SEPARATOR: Final = "."
+MAX_SNAPSHOTS: Final = 1024
+
+
+@dataclass(slots=True, eq=False)
+class Handle:
+    """
+    An event listener registered on a `tcpio.Handlers` registry, returned by
+    `tcpio.IO.add_listener`.
+
+    :attr event: The event name or the wildcard pattern listened to.
+    :attr callback: The callback given at registration.
+    :attr active: Whether the listener is still registered.
+    """
+    event: Final[str]
+    callback: Final[Callable[..., object]]
+    _listener: Final[Callable[..., object]]
+    _order: Final[int]
+
+    _handlers: "Handlers | None" = field(init=False, default=None, repr=False)
+
+    @property
+    def active(self):
+        """
+        `active` getter.
+
+        :return: Whether the listener is still registered.
+        """
+        return self._handlers is not None
+
+    def remove(self):
+        """
+        Remove the listener from its registry, in O(1) for an event name.
+        Safe to call more than once, and while the event is triggered: the
+        triggers already running still call it.
+        """
+        if self._handlers is not None:
+            self._handlers._remove(self)
+
+
+@dataclass(slots=True)
+class Node:
+    """
+    A node of the trie of the wildcard patterns of a `tcpio.Handlers`
+    registry, reached by the dot-separated segments before the final
+    wildcard of a pattern.
+
+    :attr children: The nodes of the patterns with one more segment.
+    :attr handles: The listeners of the pattern ending at this node.
+    """
+    children: dict[str, "Node"] = field(default_factory=dict)
+    handles: dict[Handle, None] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Handlers:
+    """
+    The event listeners of a `tcpio.IO`.
+
+    Listeners are registered on an event name, or on a wildcard pattern: a
+    pattern is `*`, or an event name whose last dot-separated segment is
+    `*`, and it matches the events that have more segments after its
+    prefix, so `chat.*` matches `chat.message` and `chat.room.join` but not
+    `chat`, and `*` matches every event. The listeners of a pattern get the
+    name of the triggered event as their first argument.
+
+    Registering and removing a listener costs O(1) for an event name, and
+    O(segments) for a pattern. The listeners of an event are called in
+    registration order from an immutable snapshot, which is only rebuilt
+    after the listeners of that event, or any pattern, changed, so that
+    triggering an event costs a dictionary lookup whatever the number of
+    listeners of the other events. At most `MAX_SNAPSHOTS` snapshots are
+    kept, so that the events received from a peer cannot grow them
+    without bound.
+    """
+    _events: dict[str, dict[Handle, None]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _patterns: Node = field(init=False, default_factory=Node)
+    _callbacks: dict[Callable[..., object], dict[Handle, None]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _snapshots: dict[str, tuple[Callable[..., object], ...]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _orders: Iterator[int] = field(init=False, default_factory=count)
+
+    @staticmethod
+    def is_pattern(event: str):
+        """
+        :param event: An event name or a wildcard pattern.
+        :return: Whether `event` is a wildcard pattern.
+        """
+        return event == WILDCARD or event.endswith(SEPARATOR + WILDCARD)
+
+    def add(
+            self,
+            event: str,
+            callback: Callable[..., object],
+            listener: Callable[..., object] | None = None,
+    ):
+        """
+        Register a listener on an event name or a wildcard pattern.
+
+        :param event: The event name or the wildcard pattern.
+        :param callback: The callback to remove the listener by, with
+            `remove_callback`.
+        :param listener: The function to call when the event is triggered,
+            `callback` by default.
+        :return: The handle of the listener.
+        """
+        handle = Handle(event, callback, listener or callback,
+                        next(self._orders))
+        handle._handlers = self
+        if self.is_pattern(event):
+            self._node(event).handles[handle] = None
+            self._snapshots.clear()
+        else:
+            self._events.setdefault(event, {})[handle] = None
+            self._snapshots.pop(event, None)
+        self._callbacks.setdefault(callback, {})[handle] = None
+        return handle
+
+    def _node(self, pattern: str):
+        """
+        :private:
+
+        :param pattern: A wildcard pattern.
+        :return: The trie node of `pattern`, created along with the missing
+            nodes of its path.
+        """
+        node = self._patterns
+        for segment in pattern.split(SEPARATOR)[:-1]:
+            if (child := node.children.get(segment)) is None:
+                child = node.children[segment] = Node()
+            node = child
+        return node
+
+    def _find(self, pattern: str):
+        """
+        :private:
+
+        :param pattern: A wildcard pattern.
+        :return: The trie node of `pattern`, `None` if it is missing.
+        """
+        node = self._patterns
+        for segment in pattern.split(SEPARATOR)[:-1]:
+            if (child := node.children.get(segment)) is None:
+                return None
+            node = child
+        return node
+
+    def _remove(self, handle: Handle):
+        """
+        :private:
+
+        Unregister the listener of `handle`, and drop the trie nodes and
+        the entries that are left empty.
+
+        :param handle: The handle of the listener.
+        """
+        handle._handlers = None
+        event = handle.event
+        if self.is_pattern(event):
+            segments = event.split(SEPARATOR)[:-1]
+            path = [self._patterns]
+            for segment in segments:
+                path.append(path[-1].children[segment])
+            del path[-1].handles[handle]
+            while len(path) > 1 and not path[-1].handles and \
+                    not path[-1].children:
+                path.pop()
+                del path[-1].children[segments[len(path) - 1]]
+            self._snapshots.clear()
+        else:
+            handles = self._events[event]
+            del handles[handle]
+            if not handles:
+                del self._events[event]
+            self._snapshots.pop(event, None)
+        registered = self._callbacks[handle.callback]
+        del registered[handle]
+        if not registered:
+            del self._callbacks[handle.callback]
+
+    def remove_callback(
+            self,
+            callback: Callable[..., object],
+            event: str | None = None,
+    ):
+        """
+        Unregister the first listener registered with `callback`.
+
+        :param callback: The callback given at registration.
+        :param event: The event name or the pattern of the listener, `None`
+            for any.
+        """
+        for handle in self._callbacks.get(callback, ()):
+            if event is None or handle.event == event:
+                handle.remove()
+                return
+
+    def remove_event(self, event: str):
+        """
+        Unregister all the listeners of an event name or a pattern.
+
+        :param event: The event name or the pattern.
+        """
+        if self.is_pattern(event):
+            node = self._find(event)
+            handles = [] if node is None else list(node.handles)
+        else:
+            handles = list(self._events.get(event, ()))
+        for handle in handles:
+            handle.remove()
+
+    def clear(self):
+        """
+        Unregister all the listeners.
+        """
+        for handles in list(self._callbacks.values()):
+            for handle in list(handles):
+                handle._handlers = None
+        self._events.clear()
+        self._patterns = Node()
+        self._callbacks.clear()
+        self._snapshots.clear()
+
+    def listeners(self, event: str):
+        """
+        :param event: An event name.
+        :return: The functions to call when `event` is triggered, in
+            registration order.
+        """
+        snapshot = self._snapshots.get(event)
+        if snapshot is None:
+            snapshot = self._snapshot(event)
+        return snapshot
+
+    def _snapshot(self, event: str):
+        """
+        :private:
+
+        Build and cache the snapshot of the listeners of `event`: its own
+        listeners, and the listeners of the patterns that match it, bound
+        to its name.
+
+        :param event: An event name.
+        :return: The snapshot.
+        """
+        handles = list(self._events.get(event, ()))
+        node = self._patterns
+        wildcards = False
+        for segment in event.split(SEPARATOR):
+            if node.handles:
+                handles.extend(node.handles)
+                wildcards = True
+            if (child := node.children.get(segment)) is None:
+                break
+            node = child
+        if wildcards:
+            handles.sort(key=lambda handle: handle._order)
+        snapshot = tuple(
+            partial(handle._listener, event)
+            if self.is_pattern(handle.event) else handle._listener
+            for handle in handles
+        )
+        if len(self._snapshots) >= MAX_SNAPSHOTS:
+            self._snapshots.clear()
+        self._snapshots[event] = snapshot
+        return snapshot
+
+
+__all__ = "Handlers", "Handle", "WILDCARD", "SEPARATOR", "MAX_SNAPSHOTS"
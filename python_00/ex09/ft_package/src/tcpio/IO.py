@@ -1,4 +1,6 @@
-from .Event import Event
+from .Handlers import Handlers, Handle
+from .Offloaded import Offloaded, default_executor
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from typing import TypeVar, ParamSpec, Callable, Any, overload, Final
 from abc import ABC, abstractmethod
@@ -11,51 +13,184 @@ P = ParamSpec('P')
 class IO(ABC):
     """
     Base class for event-based I/O.
+
+    Event listeners run on the event loop, unless they are registered with
+    an `executor` (or `threaded=True`): they run in that executor then, and
+    their `emit` calls are scheduled back on the event loop (see
+    `tcpio.Offloaded`).
+
+    Listeners may also listen to the wildcard patterns `*` and `prefix.*`,
+    they get the name of the triggered event as their first argument.
+    `add_listener` returns a handle that removes the listener in O(1), and
+    triggering an event does not depend on the number of listeners of the
+    other events (see `tcpio.Handlers`).
     """
-    _events: Final[dict[str, list[Event]]] = field(
+    _handlers: Final[Handlers] = field(
         init=False,
-        default_factory=dict,
+        default_factory=Handlers,
     )
 
     @abstractmethod
-    def emit(self, event: str, *args: object, **kwargs: object) -> None:
+    def emit(
+            self,
+            event: str,
+            *args: object,
+            **kwargs: object,
+    ) -> bool | None:
         """
         Emit the event `event` with `args` and `kwargs` as arguments.
 
         :param event: The event to emit.
         :param args: The arguments to pass to the event's callbacks.
         :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :return: Whether the message was queued, if the IO can tell.
+        """
+        ...
+
+    @overload
+    def on(
+            self,
+            *,
+            executor: Executor | None = None,
+            threaded: bool = False,
+            ordered: bool = False,
+    ) -> Callable[[Callable[P, RT]], Callable[P, RT]]:
+        """
+        Get a decorator that adds a new event listener on the event
+        `callback.__name__`, with the given options.
+
+        :param executor: The executor to run the listener in, `None` to
+            run it on the event loop.
+        :param threaded: Whether to run the listener in the thread pool
+            shared by `tcpio` if `executor` is `None`.
+        :param ordered: Whether the offloaded calls for a same client must
+            run one after the other.
+        :return: The decorator.
         """
         ...
 
     @overload
-    def on(self, __callback: Callable[P, RT]) -> Callable[P, RT]:
+    def on(
+            self,
+            __callback: Callable[P, RT],
+            *,
+            executor: Executor | None = None,
+            threaded: bool = False,
+            ordered: bool = False,
+    ) -> Callable[P, RT]:
         """
         Add a new event listener on the event `__callback.__name__`.
 
         :param __callback: The event listener to add.
+        :param executor: The executor to run the listener in, `None` to
+            run it on the event loop.
+        :param threaded: Whether to run the listener in the thread pool
+            shared by `tcpio` if `executor` is `None`.
+        :param ordered: Whether the offloaded calls for a same client must
+            run one after the other.
         :return: `__callback`.
         """
         ...
 
     @overload
-    def on(self, __event: str, __callback: Callable[P, RT]) -> Callable[P, RT]:
+    def on(
+            self,
+            __event: str,
+            __callback: Callable[P, RT],
+            *,
+            executor: Executor | None = None,
+            threaded: bool = False,
+            ordered: bool = False,
+    ) -> Callable[P, RT]:
         """
         Add a new event listener on the event `__event`.
 
         :param __event: The event to listen to.
         :param __callback: The event listener to add.
+        :param executor: The executor to run the listener in, `None` to
+            run it on the event loop.
+        :param threaded: Whether to run the listener in the thread pool
+            shared by `tcpio` if `executor` is `None`.
+        :param ordered: Whether the offloaded calls for a same client must
+            run one after the other.
         :return: `__callback`.
         """
         ...
 
-    def on(self, *args: Any):
+    def on(
+            self,
+            *args: Any,
+            executor: Executor | None = None,
+            threaded: bool = False,
+            ordered: bool = False,
+    ):
+        if not args:
+            return lambda callback: self.on(
+                callback,
+                executor=executor,
+                threaded=threaded,
+                ordered=ordered,
+            )
         if len(args) == 1:
-            return self.on(args[0].__name__, args[0])
+            return self.on(
+                args[0].__name__,
+                args[0],
+                executor=executor,
+                threaded=threaded,
+                ordered=ordered,
+            )
         event, callback = args
-        self._events[event] = [*self._events.get(event, []), callback]
+        self.add_listener(
+            event,
+            callback,
+            executor=executor,
+            threaded=threaded,
+            ordered=ordered,
+        )
         return callback
 
+    def add_listener(
+            self,
+            event: str,
+            callback: Callable[..., object],
+            *,
+            executor: Executor | None = None,
+            threaded: bool = False,
+            ordered: bool = False,
+            once: bool = False,
+    ):
+        """
+        Add a new event listener on the event or the wildcard pattern
+        `event`, and get its handle.
+
+        :param event: The event or the wildcard pattern to listen to.
+        :param callback: The event listener to add.
+        :param executor: The executor to run the listener in, `None` to
+            run it on the event loop.
+        :param threaded: Whether to run the listener in the thread pool
+            shared by `tcpio` if `executor` is `None`.
+        :param ordered: Whether the offloaded calls for a same client must
+            run one after the other.
+        :param once: Whether to remove the listener when it is first
+            triggered.
+        :return: The handle of the listener, whose `remove` method removes
+            it.
+        """
+        listener: Callable[..., object] = callback
+        if executor is None and threaded:
+            executor = default_executor()
+        if executor is not None:
+            listener = Offloaded(self, callback, executor, ordered)
+        if once:
+            call = listener
+
+            def remove_then_call(*args: object, **kwargs: object):
+                handle.remove()
+                return call(*args, **kwargs)
+            listener = remove_then_call
+        handle: Handle = self._handlers.add(event, callback, listener)
+        return handle
+
     @overload
     def once(self, __callback: Callable[P, RT]) -> Callable[P, RT]:
         """
@@ -85,11 +220,8 @@ class IO(ABC):
         if len(args) == 1:
             return self.once(args[0].__name__, args[0])
         event, callback = args
-
-        def wrapper(*args: Any, **kwargs: Any) -> None:
-            self.off(wrapper)
-            callback(*args, **kwargs)
-        return self.on(event, wrapper)
+        self.add_listener(event, callback, once=True)
+        return callback
 
     @overload
     def off(self, __callback: Callable[..., object]) -> None:
@@ -130,18 +262,21 @@ class IO(ABC):
 
     def off(self, *args: Any):
         if not args:
-            self._events.clear()
+            self._handlers.clear()
         elif len(args) == 1:
             if isinstance(args[0], str):
-                self._events.pop(args[0], None)
+                self._handlers.remove_event(args[0])
             else:
-                for name, events in self._events.items():
-                    if args[0] in events:
-                        return self.off(name, args[0])
+                self._handlers.remove_callback(args[0])
         else:
-            self._events[args[0]].remove(args[1])
+            self._handlers.remove_callback(args[1], args[0])
 
-    def _trigger_event(self, event: str, *args: object, **kwargs: object):
+    def _trigger_event(
+            self,
+            event: str,
+            *args: object,
+            **kwargs: object,
+    ) -> object:
         """
         :private:
 
@@ -150,6 +285,56 @@ class IO(ABC):
         :param event: The event to trigger.
         :param args: The arguments to pass to the event's callbacks.
         :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :return: The value returned by the last listener that returned one,
+            `None` otherwise.
+        """
+        result = None
+        for callback in self._handlers.listeners(event):
+            if (value := callback(*args, **kwargs)) is not None:
+                result = value
+        return result
+
+    def _marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ) -> bool:
+        """
+        :private:
+
+        If the current thread does not run the event loop of this IO,
+        schedule `call(*args, **kwargs)` on the event loop.
+        By default, there is no event loop to schedule the call on.
+
+        :param call: The function to call.
+        :param args: The arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :return: Whether the call was scheduled, in which case the caller
+            must not perform it.
+        """
+        return False
+
+    def _order_key(self, args: tuple[object, ...]) -> object:
+        """
+        :private:
+
+        Get the key that the calls of an ordered offloaded listener are
+        serialized by. By default, all the calls of a listener are.
+
+        :param args: The arguments of the call.
+        :return: The ordering key.
+        """
+        return None
+
+    def _report_error(self, error: BaseException):
+        """
+        :private:
+
+        Trigger the `error` events with `error` on the event loop, from any
+        thread.
+
+        :param error: The error to report.
         """
-        for callback in self._events.get(event, []):
-            callback(*args, **kwargs)
+        if not self._marshal(self._report_error, (error,)):
+            self._trigger_event("error", error)
@@ -0,0 +1,256 @@
+from dataclasses import dataclass, field
+from bisect import bisect
+from functools import partial
+from ipaddress import ip_address
+from itertools import accumulate
+from random import Random
+from socket import AF_INET
+from time import monotonic
+from typing import Callable, Final
+from .Address import resolve
+from .ClientPool import ClientPool
+from .Stats import Histogram
+from .Timers import Timer
+
+FINE_LATENCY_BOUNDS: Final = tuple(1e-6 * 2 ** (i / 8) for i in range(192))
+TICK: Final = 0.001
+
+
+@dataclass(slots=True)
+class LoadGenerator:
+    """
+    An open-loop load generator for a `tcpio.Server` on the local machine,
+    driving its connections with a `tcpio.ClientPool`.
+
+    The messages are emitted at a fixed rate, round-robin on the
+    connections, each with an `ack` callback, whatever the number of
+    replies still pending: the latency of a message is measured from the
+    time it was due to the time its reply arrived, so that a server that
+    falls behind delays every message due in the meantime, instead of
+    slowing the generator down and hiding its delays (the coordinated
+    omission of closed-loop generators).
+    The latencies are recorded in fixed-bucket histograms whose bounds are
+    about 9% apart (see `FINE_LATENCY_BOUNDS`).
+
+    :attr address: The address of the server, a Unix domain socket or a TCP
+        address that resolves to a loopback address.
+    :attr connections: The number of connections to open.
+    :attr rate: The number of messages to emit per second, across all the
+        connections.
+    :attr duration: The number of seconds to emit messages for.
+    :attr events: The event names to emit, with their relative weights.
+    :attr payload: The size of the `bytes` argument of each message.
+    :attr timeout: The number of seconds to wait for each reply.
+    :attr codec: The name of the codec to encode the messages with.
+    :attr seed: The seed of the random choice of the events.
+    """
+    address: Final[str]
+    connections: Final[int] = 100
+    rate: Final[float] = 1_000
+    duration: Final[float] = 10
+    events: Final[dict[str, float]] = field(
+        default_factory=lambda: {"ping": 1.}
+    )
+    payload: Final[int] = 16
+    timeout: Final[float] = 5
+    codec: Final[str] = "pickle"
+    seed: Final[int | None] = None
+
+    _pool: ClientPool = field(init=False)
+    _names: list[str] = field(init=False)
+    _weights: list[float] = field(init=False)
+    _random: Random = field(init=False)
+    _latency: Histogram = field(init=False)
+    _window: Histogram = field(init=False)
+    _max: float = field(init=False, default=0.)
+    _sent: int = field(init=False, default=0)
+    _acked: int = field(init=False, default=0)
+    _timeouts: int = field(init=False, default=0)
+    _errors: int = field(init=False, default=0)
+    _dropped: int = field(init=False, default=0)
+    _started: float = field(init=False, default=0.)
+    _ticker: Timer | None = field(init=False, default=None)
+
+    def __post_init__(self):
+        """
+        `tcpio.LoadGenerator` post constructor.
+
+        :raise ValueError: If the server is not on a loopback address, or
+            if the settings are invalid.
+        """
+        if self.connections <= 0 or self.rate <= 0 or self.duration <= 0:
+            raise ValueError(
+                "the connections, rate and duration must be positive"
+            )
+        if not self.events or min(self.events.values()) < 0 or \
+                not sum(self.events.values()):
+            raise ValueError(f"invalid event weights: {self.events!r}")
+        for family, *_, addr in resolve(self.address):
+            if family == AF_INET and not ip_address(addr[0]).is_loopback:
+                raise ValueError(
+                    f"{self.address} is not a loopback address"
+                )
+        self._pool = ClientPool(
+            connect_timeout=self.timeout,
+            handle_sigint=False,
+            codec=self.codec,
+        )
+        self._names = list(self.events)
+        self._weights = list(accumulate(self.events.values()))
+        self._random = Random(self.seed)
+        self._latency = Histogram(FINE_LATENCY_BOUNDS)
+        self._window = Histogram(FINE_LATENCY_BOUNDS)
+
+    def run(
+            self,
+            report: Callable[[dict[str, float]], object] | None = None,
+            every: float = 1.,
+    ):
+        """
+        Connect to the server, emit the messages for `duration` seconds,
+        wait for their replies or their timeouts, and close the
+        connections.
+
+        :param report: Called every `every` seconds while the messages are
+            emitted, with the counters and the latencies of the last
+            interval (see `report`).
+        :param every: The number of seconds between the calls of `report`.
+        :return: The final report, over the whole run.
+        :raise ConnectionError: If some connections could not be made
+            within `timeout` seconds.
+        """
+        pool = self._pool
+        connections = [
+            pool.connect(self.address) for _ in range(self.connections)
+        ]
+        deadline = monotonic() + self.timeout
+        while not all(c._handshaken for c in connections):
+            if monotonic() >= deadline:
+                pool.close()
+                raise ConnectionError(
+                    f"could not connect {self.connections} connections to "
+                    f"{self.address} within {self.timeout} seconds"
+                )
+            pool.sleep(0.01)
+        self._started = monotonic()
+        self._ticker = pool.call_every(TICK, self._tick, connections)
+        reporter = None
+        if report is not None:
+            reporter = pool.call_every(every, self._report, report, every)
+        while self._ticker is not None or len(pool._acks):
+            pool.sleep(every)
+        if reporter is not None:
+            reporter.cancel()
+        pool.close()
+        return self.report()
+
+    def _tick(self, connections: list[ClientPool.Connection]):
+        """
+        :private:
+
+        Emit the messages that are due, each on the next connection, and
+        stop once `duration` seconds have passed.
+
+        :param connections: The connections to emit the messages on.
+        """
+        now = monotonic()
+        end = self._started + self.duration
+        due = int((min(now, end) - self._started) * self.rate)
+        names, weights = self._names, self._weights
+        total = weights[-1]
+        data = bytes(self.payload)
+        while self._sent < due:
+            intended = self._started + self._sent / self.rate
+            connection = connections[self._sent % len(connections)]
+            event = names[bisect(weights, self._random.random() * total)]
+            self._sent += 1
+            if not connection.request(
+                event, data,
+                ack=partial(self._reply, intended),
+                timeout=self.timeout,
+            ):
+                self._dropped += 1
+        if now >= end and self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+
+    def _reply(self, intended: float, reply: object):
+        """
+        :private:
+
+        Record the latency of a message, or count its failure.
+
+        :param intended: When the message was due.
+        :param reply: The reply of the server, or the error of the ack.
+        """
+        if isinstance(reply, TimeoutError):
+            self._timeouts += 1
+        elif isinstance(reply, (ConnectionError, RuntimeError)):
+            self._errors += 1
+        else:
+            latency = monotonic() - intended
+            self._acked += 1
+            self._latency.record(latency)
+            self._window.record(latency)
+            if latency > self._max:
+                self._max = latency
+
+    def _report(
+            self,
+            report: Callable[[dict[str, float]], object],
+            every: float,
+    ):
+        """
+        :private:
+
+        Call `report` with the latencies of the last interval, and start a
+        new one.
+
+        :param report: The callback to call.
+        :param every: The length of the interval, in seconds.
+        """
+        window, self._window = self._window, Histogram(FINE_LATENCY_BOUNDS)
+        report(self._summary(window, every))
+
+    def _summary(self, latency: Histogram, elapsed: float):
+        """
+        :private:
+
+        :param latency: The latencies to summarize.
+        :param elapsed: The number of seconds they were recorded over.
+        :return: The counters, the throughput of the replies, and the
+            percentiles of `latency`, in seconds.
+        """
+        return {
+            "elapsed": monotonic() - self._started,
+            "sent": self._sent,
+            "acked": self._acked,
+            "timeouts": self._timeouts,
+            "errors": self._errors,
+            "dropped": self._dropped,
+            "throughput": latency._count / max(elapsed, 1e-9),
+            "p50": latency.quantile(0.5),
+            "p90": latency.quantile(0.9),
+            "p99": latency.quantile(0.99),
+            "p999": latency.quantile(0.999),
+        }
+
+    def report(self):
+        """
+        Get the report of the whole run so far: the counters of the
+        messages sent, acknowledged, timed out, failed by a lost
+        connection, or dropped by a congested one, the throughput of the
+        replies over `duration`, and the latency percentiles and maximum,
+        in seconds.
+
+        :return: The report as a dict.
+        """
+        return {
+            **self._summary(self._latency, min(
+                monotonic() - self._started, self.duration,
+            )),
+            "max": self._max,
+        }
+
+
+__all__ = "LoadGenerator", "FINE_LATENCY_BOUNDS", "TICK"
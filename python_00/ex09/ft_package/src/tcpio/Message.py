@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from typing import TypeAlias
+
+EventRef: TypeAlias = str | int | tuple[int, str]
 
 
 @dataclass(slots=True, frozen=True)
@@ -7,10 +10,18 @@ class Message:
     This class represents the kind of data that is sent between the client
     and the server.
 
-    :attr event: The event that the message is associated with.
-    :attr args: The arguments of the event.
+    :attr event: The event that the message is associated with: its name,
+        its symbol ID on the connection, or a `(symbol ID, name)` pair that
+        defines the symbol. `None` for the reply to an acknowledged message.
+    :attr args: The arguments of the event, or the reply as single item.
     :attr kwargs: The keyword arguments of the event.
+    :attr ack: The correlation ID of an acknowledged message or of its
+        reply, `None` for the other messages.
     """
-    event: str
+    event: EventRef | None
     args: tuple[object, ...]
     kwargs: dict[str, object]
+    ack: int | None = None
+
+
+__all__ = "Message", "EventRef"
@@ -0,0 +1,149 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Final, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .IO import IO
+
+_default_executor: ThreadPoolExecutor | None = None
+_default_executor_lock = Lock()
+
+Call = tuple[tuple[object, ...], dict[str, object], Future[object]]
+
+
+def default_executor():
+    """
+    Get the thread pool shared by the listeners registered with
+    `threaded=True`, creating it on first use. Its size is bounded by the
+    default of `concurrent.futures.ThreadPoolExecutor`.
+
+    :return: The shared thread pool.
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(
+                thread_name_prefix="tcpio",
+            )
+        return _default_executor
+
+
+@dataclass(slots=True, eq=False)
+class Offloaded:
+    """
+    An event listener that runs its callback in an executor instead of the
+    event loop's thread.
+
+    The `emit` calls made by the callback from a thread of the executor are
+    scheduled back on the event loop. Exceptions raised by the callback
+    trigger the `error` events on the event loop.
+    If `ordered` is `True`, the calls that share an ordering key (the
+    client, see `tcpio.IO._order_key`) run one after the other, in the
+    order they were triggered, instead of concurrently.
+
+    Calling an `Offloaded` listener returns a future of the callback's
+    result, which is how the reply of an acknowledged message is deferred
+    until the call is done. It compares equal to its callback, so that it
+    can be removed with `off(callback)`.
+
+    :attr io: The IO that the listener is registered on.
+    :attr callback: The callback to run.
+    :attr executor: The executor to run the callback in.
+    :attr ordered: Whether to serialize the calls per ordering key.
+    """
+    io: Final["IO"]
+    callback: Final[Callable[..., object]]
+    executor: Final[Executor]
+    ordered: Final[bool] = False
+
+    _pending: dict[object, deque[Call]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _lock: Lock = field(init=False, default_factory=Lock)
+
+    def __eq__(self, other: object):
+        return other is self or other == self.callback
+
+    def __hash__(self):
+        return hash(self.callback)
+
+    def __call__(self, *args: object, **kwargs: object):
+        if not self.ordered:
+            return self._submit(None, args, kwargs)
+        key = self.io._order_key(args)
+        with self._lock:
+            if (pending := self._pending.get(key)) is not None:
+                result: Future[object] = Future()
+                pending.append((args, kwargs, result))
+                return result
+            self._pending[key] = deque()
+        return self._submit(key, args, kwargs)
+
+    def _submit(
+            self,
+            key: object,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            result: Future[object] | None = None,
+    ):
+        """
+        :private:
+
+        Submit one call of the callback to the executor.
+
+        :param key: The ordering key of the call, if ordered.
+        :param args: The arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :param result: The future returned for the call when it was
+            queued, if it was.
+        :return: The future of the call.
+        """
+        future = self.executor.submit(self.callback, *args, **kwargs)
+        future.add_done_callback(
+            lambda future: self._done(key, future, result)
+        )
+        return future
+
+    def _done(
+            self,
+            key: object,
+            future: Future[object],
+            result: Future[object] | None,
+    ):
+        """
+        :private:
+
+        Report the exception of a finished call, pass its outcome to the
+        future returned for it when it was queued, and submit the next call
+        with the same ordering key, if any.
+
+        :param key: The ordering key of the call, if ordered.
+        :param future: The future of the finished call.
+        :param result: The future returned for the call when it was
+            queued, if it was.
+        """
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            self.io._report_error(error)
+        if result is not None:
+            if future.cancelled():
+                result.cancel()
+            elif error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(future.result())
+        if not self.ordered:
+            return
+        with self._lock:
+            pending = self._pending[key]
+            if not pending:
+                del self._pending[key]
+                return
+            args, kwargs, queued = pending.popleft()
+        self._submit(key, args, kwargs, queued)
+
+
+__all__ = "Offloaded", "default_executor"
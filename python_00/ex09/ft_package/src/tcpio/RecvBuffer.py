@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from socket import socket
+from typing import Final
+
+
+@dataclass(slots=True)
+class RecvBuffer:
+    """
+    A growable receive buffer backed by a reusable `bytearray`.
+
+    Incoming data is written at the write cursor with `socket.recv_into`
+    and frames are read at the read cursor through `memoryview`s, so no
+    data is copied while decoding. The pending bytes are only moved back
+    to the front of the buffer when the free space at its end is too
+    small to receive another chunk.
+
+    :attr chunk_size: The minimum free space to reserve before each read.
+    """
+    chunk_size: Final[int] = 4096
+
+    _data: bytearray = field(init=False)
+    _start: int = field(init=False, default=0)
+    _end: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        """
+        `tcpio.RecvBuffer` post constructor.
+        """
+        self._data = bytearray(self.chunk_size)
+
+    def __len__(self):
+        """
+        :return: The number of bytes that are waiting to be read.
+        """
+        return self._end - self._start
+
+    def view(self):
+        """
+        Get a view over the bytes that are waiting to be read.
+        The view must be released before the next call to `recv_from`.
+
+        :return: A `memoryview` over the readable bytes.
+        """
+        return memoryview(self._data)[self._start:self._end]
+
+    def consume(self, size: int):
+        """
+        Advance the read cursor by `size` bytes.
+
+        :param size: The number of bytes to mark as read.
+        """
+        self._start += size
+        if self._start >= self._end:
+            self._start = self._end = 0
+
+    def get_buffer(self):
+        """
+        Get a view over the free space after the write cursor, at least one
+        chunk long. Once data is written into it, `advance` must be called.
+
+        :return: A writable `memoryview` over the free space.
+        """
+        self._reserve(self.chunk_size)
+        return memoryview(self._data)[self._end:]
+
+    def advance(self, size: int):
+        """
+        Advance the write cursor by `size` bytes.
+
+        :param size: The number of bytes written into the free space.
+        """
+        self._end += size
+
+    def recv_from(self, sock: socket):
+        """
+        Receive up to one chunk from `sock` into the free space of the buffer.
+
+        :param sock: The socket to receive data from.
+        :return: The number of bytes received (0 on end of stream).
+        :raise BlockingIOError: If no data is available on `sock`.
+        """
+        with self.get_buffer() as free:
+            received = sock.recv_into(free, self.chunk_size)
+        self._end += received
+        return received
+
+    def _reserve(self, size: int):
+        """
+        :private:
+
+        Make sure that at least `size` bytes are free after the write cursor,
+        by compacting the buffer first and growing it only if needed.
+
+        :param size: The number of free bytes required.
+        """
+        if len(self._data) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start and len(self._data) - pending >= size:
+            self._data[:pending] = memoryview(self._data)[
+                self._start:self._end
+            ]
+            self._start, self._end = 0, pending
+            return
+        self._data.extend(bytes(max(len(self._data), pending + size)))
+
+
+__all__ = "RecvBuffer",
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Final, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .FrameIO import FrameIO
+    from .Server import Server
+    from .aio.AsyncServer import AsyncServer
+
+
+@dataclass(slots=True)
+class Room:
+    """
+    The target of a room broadcast, returned by `tcpio.Server.to` and
+    `tcpio.Server.Client.to` (or their `tcpio.aio` counterparts).
+    Rooms are chained with `to` to emit to the members of any of them:
+    `server.to("game-1").to("spectators").emit("score", 3)`.
+
+    :attr names: The names of the targeted rooms.
+    :attr clients: The clients that the events are emitted to.
+    """
+    names: Final[tuple[str, ...]]
+
+    _server: Final["Server | AsyncServer"]
+    _exclude: Final["FrameIO | None"] = None
+
+    def to(self, room: str):
+        """
+        :param room: The name of another room.
+        :return: The target of a broadcast to the members of `room` too.
+        """
+        return Room((*self.names, room), self._server, self._exclude)
+
+    @property
+    def clients(self):
+        """
+        `clients` getter.
+
+        :return: The clients that the events are emitted to.
+        """
+        return [
+            client for client in self._server._rooms.members(self.names)
+            if client is not self._exclude
+        ]
+
+    def emit(self, event: str, *args: object, **kwargs: object):
+        """
+        Emit an event to the members of the targeted rooms, and to the
+        members of the other processes in prefork mode.
+        The message is encoded once per codec and event symbol, like with
+        `tcpio.Server.emit`, and each member receives it once.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        """
+        self._server._broadcast(event, args, kwargs, self._exclude, self.names)
+
+
+__all__ = "Room",
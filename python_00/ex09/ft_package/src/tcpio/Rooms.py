@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import Generic, Iterable, TypeVar
+
+C = TypeVar("C")
+
+
+@dataclass(slots=True)
+class Rooms(Generic[C]):
+    """
+    The rooms of a server: named groups of clients that events can be
+    emitted to, indexed both ways so that a room's members and a client's
+    rooms are found without scanning the other clients or rooms.
+
+    Clients are indexed by identity, and empty rooms are forgotten.
+    """
+    _members: dict[str, dict[int, C]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _memberships: dict[int, set[str]] = field(
+        init=False,
+        default_factory=dict,
+    )
+
+    def join(self, client: C, room: str):
+        """
+        Add `client` to the room `room`.
+
+        :param client: The client to add.
+        :param room: The name of the room.
+        """
+        self._members.setdefault(room, {})[id(client)] = client
+        self._memberships.setdefault(id(client), set()).add(room)
+
+    def leave(self, client: C, room: str):
+        """
+        Remove `client` from the room `room`, if it is a member.
+
+        :param client: The client to remove.
+        :param room: The name of the room.
+        """
+        members = self._members.get(room)
+        if members is None or members.pop(id(client), None) is None:
+            return
+        if not members:
+            del self._members[room]
+        rooms = self._memberships[id(client)]
+        rooms.discard(room)
+        if not rooms:
+            del self._memberships[id(client)]
+
+    def leave_all(self, client: C):
+        """
+        Remove `client` from all its rooms.
+
+        :param client: The client to remove.
+        """
+        for room in self._memberships.pop(id(client), ()):
+            members = self._members[room]
+            del members[id(client)]
+            if not members:
+                del self._members[room]
+
+    def rooms_of(self, client: C):
+        """
+        :param client: A client.
+        :return: The names of the rooms that `client` is a member of.
+        """
+        return frozenset(self._memberships.get(id(client), ()))
+
+    def members(self, rooms: Iterable[str]):
+        """
+        :param rooms: The names of the rooms.
+        :return: The clients that are members of at least one of `rooms`,
+            each listed once.
+        """
+        rooms = tuple(rooms)
+        if len(rooms) == 1:
+            return list(self._members.get(rooms[0], {}).values())
+        return list({
+            key: client
+            for room in rooms
+            for key, client in self._members.get(room, {}).items()
+        }.values())
+
+
+__all__ = "Rooms",
@@ -0,0 +1,225 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import ClassVar, Final
+import select
+
+READ: Final = 1
+WRITE: Final = 4
+ERROR: Final = 8
+
+
+@dataclass(slots=True)
+class Selector(ABC):
+    """
+    Base class for the readiness notification backends of `tcpio`.
+
+    Events are expressed with the `READ`, `WRITE` and `ERROR` flags of this
+    module. A hang up is reported as `READ | ERROR`, so that the next read
+    on the file descriptor detects the end of stream.
+
+    :attr name: The name of the backend.
+    :attr edge_triggered: Whether a file descriptor is only reported when
+        its readiness changes, in which case it must be read and written
+        until it would block, and its interest must be re-armed with
+        `modify` when new data is queued.
+    """
+    name: ClassVar[str]
+    edge_triggered: ClassVar[bool] = False
+
+    @abstractmethod
+    def register(self, fd: int, events: int) -> None:
+        """
+        Start watching `fd` for `events`.
+
+        :param fd: The file descriptor to watch.
+        :param events: The events to watch.
+        """
+        ...
+
+    @abstractmethod
+    def modify(self, fd: int, events: int) -> None:
+        """
+        Change the events watched on `fd`.
+
+        :param fd: The watched file descriptor.
+        :param events: The new events to watch.
+        """
+        ...
+
+    @abstractmethod
+    def unregister(self, fd: int) -> None:
+        """
+        Stop watching `fd`.
+
+        :param fd: The file descriptor to forget.
+        """
+        ...
+
+    @abstractmethod
+    def select(self, timeout: float | None = None) -> list[tuple[int, int]]:
+        """
+        Wait until at least one watched file descriptor is ready.
+
+        :param timeout: The maximum number of seconds to wait, `None` to
+            wait forever.
+        :return: The ready file descriptors along with their events.
+        """
+        ...
+
+    def close(self) -> None:
+        """
+        Release the resources held by the backend.
+        """
+
+
+def _from_native(events: int, err: int, hup: int):
+    """
+    :private:
+
+    Convert the `poll`/`epoll` events `events` to `tcpio` events.
+
+    :param events: The native events.
+    :param err: The native error flag.
+    :param hup: The native hang up flag.
+    :return: The converted events.
+    """
+    if events & (err | hup):
+        return (events & (READ | WRITE)) | READ | ERROR
+    return events & (READ | WRITE)
+
+
+PREFERENCE: Final = "epoll", "poll", "select"
+BACKENDS: Final[dict[str, type[Selector]]] = {}
+
+if hasattr(select, "poll"):
+    @dataclass(slots=True)
+    class PollSelector(Selector):
+        """
+        Level-triggered backend based on `select.poll`.
+        """
+        name: ClassVar[str] = "poll"
+
+        _poller: select.poll = field(init=False, default_factory=select.poll)
+
+        def register(self, fd: int, events: int):
+            self._poller.register(fd, events & (READ | WRITE))
+
+        def modify(self, fd: int, events: int):
+            self._poller.modify(fd, events & (READ | WRITE))
+
+        def unregister(self, fd: int):
+            self._poller.unregister(fd)
+
+        def select(self, timeout: float | None = None):
+            return [
+                (fd, _from_native(events, select.POLLERR, select.POLLHUP))
+                for fd, events in self._poller.poll(
+                    None if timeout is None else timeout * 1000
+                )
+            ]
+
+    BACKENDS["poll"] = PollSelector
+
+
+if hasattr(select, "epoll"):
+    @dataclass(slots=True)
+    class EpollSelector(Selector):
+        """
+        Edge-triggered backend based on `select.epoll` (Linux only).
+        Its cost only depends on the number of ready file descriptors.
+        """
+        name: ClassVar[str] = "epoll"
+        edge_triggered: ClassVar[bool] = True
+
+        _epoll: select.epoll = field(init=False, default_factory=select.epoll)
+
+        def register(self, fd: int, events: int):
+            self._epoll.register(
+                fd, (events & (READ | WRITE)) | select.EPOLLET,
+            )
+
+        def modify(self, fd: int, events: int):
+            self._epoll.modify(
+                fd, (events & (READ | WRITE)) | select.EPOLLET,
+            )
+
+        def unregister(self, fd: int):
+            self._epoll.unregister(fd)
+
+        def select(self, timeout: float | None = None):
+            return [
+                (fd, _from_native(events, select.EPOLLERR, select.EPOLLHUP))
+                for fd, events in self._epoll.poll(
+                    -1 if timeout is None else timeout
+                )
+            ]
+
+        def close(self):
+            self._epoll.close()
+
+    BACKENDS["epoll"] = EpollSelector
+
+
+@dataclass(slots=True)
+class SelectSelector(Selector):
+    """
+    Level-triggered backend based on `select.select`, available everywhere
+    but limited to `FD_SETSIZE` file descriptors on most platforms.
+    """
+    name: ClassVar[str] = "select"
+
+    _readers: set[int] = field(init=False, default_factory=set)
+    _writers: set[int] = field(init=False, default_factory=set)
+
+    def register(self, fd: int, events: int):
+        self.modify(fd, events)
+
+    def modify(self, fd: int, events: int):
+        for watched, flag in (self._readers, READ), (self._writers, WRITE):
+            if events & flag:
+                watched.add(fd)
+            else:
+                watched.discard(fd)
+
+    def unregister(self, fd: int):
+        self._readers.discard(fd)
+        self._writers.discard(fd)
+
+    def select(self, timeout: float | None = None):
+        readable, writable, failed = select.select(
+            self._readers, self._writers, self._readers, timeout,
+        )
+        ready: dict[int, int] = {}
+        for fds, flag in (readable, READ), (writable, WRITE), \
+                (failed, READ | ERROR):
+            for fd in fds:
+                ready[fd] = ready.get(fd, 0) | flag
+        return list(ready.items())
+
+
+BACKENDS["select"] = SelectSelector
+
+
+def make_selector(backend: str | None = None) -> Selector:
+    """
+    Create a selector using the backend named `backend`.
+    If this backend is not available on the current platform, fall back to
+    the best available one (`epoll`, then `poll`, then `select`).
+
+    :param backend: The name of the backend, `None` for the best available.
+    :return: The created selector.
+    :raise ValueError: If `backend` is not a known backend name.
+    """
+    if backend is not None and backend not in PREFERENCE:
+        raise ValueError(f"unknown selector backend: {backend}")
+    if backend in BACKENDS:
+        return BACKENDS[backend]()
+    return next(
+        BACKENDS[name] for name in PREFERENCE if name in BACKENDS
+    )()
+
+
+__all__ = (
+    "Selector", "SelectSelector", "PREFERENCE", "BACKENDS", "make_selector",
+    "READ", "WRITE", "ERROR",
+)
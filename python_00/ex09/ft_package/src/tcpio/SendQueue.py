@@ -0,0 +1,141 @@
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from socket import socket
+from typing import Callable
+import os
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+
+@dataclass(slots=True)
+class SendQueue:
+    """
+    A queue of encoded frames waiting to be sent.
+
+    Frames are never concatenated: they are flushed in batches with a single
+    `socket.sendmsg` call, and a partially sent frame is replaced by a
+    `memoryview` over its remaining bytes, so each byte is copied once by the
+    kernel and never by the queue.
+
+    :attr pending: The number of bytes waiting to be sent.
+    """
+    _frames: deque[memoryview] = field(init=False, default_factory=deque)
+    _pending: int = field(init=False, default=0)
+    _partial: bool = field(init=False, default=False)
+
+    def __len__(self):
+        """
+        :return: The number of frames waiting to be sent.
+        """
+        return len(self._frames)
+
+    @property
+    def pending(self):
+        """
+        `pending` getter.
+
+        :return: The number of bytes waiting to be sent.
+        """
+        return self._pending
+
+    def push(self, frame: bytes | memoryview):
+        """
+        Add `frame` at the end of the queue.
+
+        :param frame: The encoded frame to send.
+        """
+        if frame:
+            self._frames.append(memoryview(frame))
+            self._pending += len(frame)
+
+    def prepend(self, frame: bytes | memoryview):
+        """
+        Add `frame` at the front of the queue, so that it is sent first.
+
+        :param frame: The encoded frame to send.
+        """
+        if frame:
+            self._frames.appendleft(memoryview(frame))
+            self._pending += len(frame)
+
+    def send_to(self, sock: socket):
+        """
+        Send as many queued frames as possible to `sock`.
+
+        :param sock: The socket to send the frames to.
+        :return: The number of bytes sent.
+        """
+        total = 0
+        while self._frames:
+            try:
+                if len(self._frames) == 1 or not hasattr(sock, "sendmsg"):
+                    sent = sock.send(self._frames[0])
+                else:
+                    sent = sock.sendmsg(list(islice(self._frames, IOV_MAX)))
+            except BlockingIOError:
+                break
+            total += sent
+            if not self._advance(sent):
+                break
+        return total
+
+    def take(self):
+        """
+        Remove all the queued frames from the queue.
+
+        :return: The removed frames, in order.
+        """
+        frames = list(self._frames)
+        self.clear()
+        return frames
+
+    def clear(self):
+        """
+        Drop all the queued frames.
+        """
+        self._frames.clear()
+        self._pending = 0
+        self._partial = False
+
+    def restart(self, keep: Callable[[memoryview], bool]):
+        """
+        Prepare the queue for a new connection: drop the partially sent
+        frame at its front, if any, and the frames rejected by `keep`.
+
+        :param keep: Whether a queued frame is still valid on a new
+            connection.
+        """
+        if self._partial:
+            self._pending -= len(self._frames.popleft())
+            self._partial = False
+        kept = [frame for frame in self._frames if keep(frame)]
+        self._frames = deque(kept)
+        self._pending = sum(len(frame) for frame in kept)
+
+    def _advance(self, size: int):
+        """
+        :private:
+
+        Remove `size` sent bytes from the front of the queue.
+
+        :param size: The number of bytes that were sent.
+        :return: `False` if a frame was only partially sent.
+        """
+        self._pending -= size
+        while size:
+            frame = self._frames[0]
+            if size < len(frame):
+                self._frames[0] = frame[size:]
+                self._partial = True
+                return False
+            size -= len(frame)
+            self._frames.popleft()
+            self._partial = False
+        return True
+
+
+__all__ = "SendQueue", "IOV_MAX"
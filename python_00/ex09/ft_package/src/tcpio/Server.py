@@ -1,43 +1,100 @@
-from typing import TypeAlias, Final
+from typing import Final, Iterable, cast
 from typing_extensions import override
-from select import poll, POLLIN, POLLOUT
-from dataclasses import dataclass, field, InitVar
+from dataclasses import dataclass, field, replace, InitVar
 from .IO import IO
+from .EventLoop import EventLoop
 from .SocketIO import SocketIO
-from socket import socket, getaddrinfo, AF_INET, SOCK_STREAM, \
-    IPPROTO_TCP, AddressFamily, SocketKind, error as SocketError, \
-    SOCK_NONBLOCK
-from time import time
-from signal import signal, SIGINT
+from .FrameIO import FrameIO, HANDSHAKE, PING, broadcast
+from .Codec import Codec, CODECS, get_codec
+from .Compression import Compression
+from .Backpressure import Backpressure
+from .Selector import Selector, make_selector, READ, WRITE
+from .Waker import Waker
+from .Bus import Bus
+from .Room import Room
+from .Rooms import Rooms
+from .Acks import Acks
+from .Timers import Timer, Timers
+from .Stats import Stats
+from .Address import AddressInfo, is_unix, split_address, resolve
+from socket import socket, SOCK_STREAM, error as SocketError, \
+    SOCK_NONBLOCK, SOL_SOCKET, SO_REUSEADDR, socketpair
+from time import monotonic
+from functools import partial
+from threading import get_ident
+from signal import signal, SIGINT, SIGTERM, SIG_DFL
 from types import FrameType
+from ipaddress import ip_address
+import socket as socket_module
+import signal as signal_module
+import os
 import sys
 import atexit
+import stat
+import traceback
 
-AddressInfo: TypeAlias = list[tuple[
-    AddressFamily,
-    SocketKind,
-    int,
-    str,
-    tuple[str, int] | tuple[str, int, int, int],
-]]
+RESTART_DELAY: Final = 1.
 
 
 @dataclass(slots=True)
-class Server(IO):
+class Server(EventLoop, IO):
     """
     An event-based TCP server.
 
+    In prefork mode (see `start`), the process that starts the server only
+    supervises its worker processes: each worker has its own listening
+    socket bound to the same address with `SO_REUSEPORT`, its own event
+    loop and its own clients, and inherits the event listeners added
+    before the server was started. A worker that crashes is restarted, at
+    most once per `RESTART_DELAY` seconds.
+    The supervisor is also the hub of a broadcast bus: the messages emitted
+    to all the clients by a worker or by the supervisor are relayed to the
+    clients of every worker (see `tcpio.Bus`).
+
+    Clients can join rooms, to emit events to a group of clients with
+    `to(room).emit(...)` at a cost proportional to the size of the group.
+    Rooms are local to a worker, but the events emitted to a room reach its
+    members in every worker.
+
+    Calls can be scheduled on the event loop with `call_later` and
+    `call_every` (see `tcpio.Timers`), they run while the server sleeps.
+
+    With a `heartbeat_interval`, a client that sent nothing for that long
+    is pinged, and once it missed `heartbeat_misses` pings in a row, it is
+    reaped: its connection is closed and the `error` events are triggered
+    with a `TimeoutError`. Each client has a single timer, which is only
+    rescheduled when it fires, so receiving data costs no more than
+    recording its time, and each check only touches its own client.
+
+    The server listens on a TCP address (`host:port`) or on a Unix domain
+    socket (`unix:/path/to.sock`), whose file is removed when the server
+    exits. In prefork mode, the workers share the Unix domain socket of the
+    supervisor, instead of binding their own. Clients in the same process
+    can also connect through a socket pair, see `pair`.
+
+    A server created with `collect_stats=True` collects runtime metrics, see
+    `stats`. With a `stats_event` too, the clients connected from a
+    loopback address get the metrics as the reply of an acknowledged
+    `stats_event` message.
+
     :attr socket: The server's internal socket.
     :attr clients: The list of connected clients.
-    :attr host: The server's host name.
-    :attr port: The server's port number.
+    :attr host: The server's host name, or the path of its Unix domain
+        socket.
+    :attr port: The server's port number, empty for a Unix domain socket.
+    :attr reaped: The number of clients reaped for missing their
+        heartbeats.
     :attr special_events: Special events that are triggered by the server.
 
     List of special events:
-        - `connection` -> A client connects to the server, the callback takes
-            a `tcpio.Server.Client` as its first argument.
+        - `connection` -> A client connects to the server and completes its
+            handshake, the callback takes a `tcpio.Server.Client` as its
+            first argument.
         - `disconnection` -> A client disconnects from the server, the callback
             takes a `tcpio.Server.Client` as its first argument.
+        - `drain` -> A congested client's queued bytes fell to its low
+            watermark, the callback takes a `tcpio.Server.Client` as its
+            first argument.
         - `error` -> Triggered when an error occurs, the callback takes
             an `Exception` as its first argument.
     """
@@ -48,9 +105,14 @@ class Server(IO):
 
         :attr addr: The client's address.
         :attr socket: The client's internal socket.
+        :attr rooms: The names of the rooms that the client is a member of.
         """
         addr: Final[object]
         _server: Final["Server"]
+        _last_seen: float
+        _pinged_at: float
+        _missed: int
+        _heartbeat: Timer | None
 
         @override
         def __init__(
@@ -71,14 +133,126 @@ class Server(IO):
             super(Server.Client, self).__init__(socket, buffer_size)
             self.addr = addr
             self._server = server
+            self._compression = Compression(
+                server._compression_threshold,
+                server._compression_level,
+            )
+            self._backpressure = replace(server._backpressure)
+            self._acks = server._acks
+            self._timers = server._timers
+            self._waker = server._waker
+            self._stats = server._stats
+            self._last_seen = monotonic()
+            self._pinged_at = 0.
+            self._missed = 0
+            self._heartbeat = None
 
         def __del__(self):
             self._socket.close()
 
         @override
-        def _trigger_event(self, event: str, *args: object, **kwargs: object):
-            self._server._trigger_event(event, self, *args, **kwargs)
-            super(Server.Client, self)._trigger_event(event, *args, **kwargs)
+        def _recv(self):
+            self._last_seen = monotonic()
+            return super(Server.Client, self)._recv()
+
+        @override
+        def _trigger_event(
+                self,
+                event: str,
+                *args: object,
+                **kwargs: object,
+        ) -> object:
+            result = self._server._trigger_event(event, self, *args, **kwargs)
+            own = super(Server.Client, self)._trigger_event(
+                event, *args, **kwargs,
+            )
+            return result if own is None else own
+
+        @override
+        def _handshake(self, pkt: bytes):
+            codec, *symbols = pkt[len(HANDSHAKE):].decode(
+                errors="replace",
+            ).split("\0") if pkt.startswith(HANDSHAKE) else ("",)
+            if codec not in self._server._codecs:
+                self._queue(self._handshake_frame(""))
+                try:
+                    self._flush()
+                except OSError:
+                    pass
+                self._server._trigger_event("error", ConnectionRefusedError(
+                    f"{self.addr} proposed an unsupported codec: {codec!r}"
+                ))
+                return False
+            if not self._define_symbols(symbols):
+                return False
+            self._codec = self._server._codecs[codec]
+            self._handshaken = True
+            self._queue(self._handshake_frame(codec))
+            self._server._trigger_event("connection", self)
+            return True
+
+        @override
+        def _want_write(self):
+            selector = self._server._selector
+            fd = self._socket.fileno()
+            if fd in self._server._clients:
+                selector.modify(fd, READ | WRITE)
+
+        @override
+        def _overflow(self):
+            self._server._waker.call_soon(partial(self._server._abort, self))
+
+        @override
+        def _report_error(self, error: BaseException):
+            self._server._report_error(error)
+
+        @property
+        def rooms(self):
+            """
+            `rooms` getter.
+
+            :return: The names of the rooms that the client is a member of.
+            """
+            return self._server._rooms.rooms_of(self)
+
+        def join(self, room: str):
+            """
+            Add the client to the room `room`, until it leaves it or
+            disconnects.
+
+            :param room: The name of the room.
+            """
+            if not self._marshal(self.join, (room,)):
+                self._server._rooms.join(self, room)
+
+        def leave(self, room: str):
+            """
+            Remove the client from the room `room`.
+
+            :param room: The name of the room.
+            """
+            if not self._marshal(self.leave, (room,)):
+                self._server._rooms.leave(self, room)
+
+        def to(self, room: str):
+            """
+            :param room: The name of a room.
+            :return: The target of a broadcast to the members of `room`,
+                except this client.
+            """
+            return Room((room,), self._server, self)
+
+        def broadcast(self, event: str, *args: object, **kwargs: object):
+            """
+            Emit an event to all the other clients connected to the server,
+            the message is encoded once like with `tcpio.Server.emit`.
+
+            :param event: The event to emit.
+            :param args: The arguments to pass to the event's callbacks.
+            :param kwargs: The keyword arguments to pass to the event's
+                callbacks.
+            """
+            self._server._broadcast(event, args, kwargs, self)
 
         def disconnect(self, trigger_disconnection: bool = True):
             """
@@ -90,53 +264,268 @@ class Server(IO):
             self._server.disconnect(self, trigger_disconnection)
 
     _socket: socket = field(init=False)
-    _clients: list[Client] = field(init=False, default_factory=list)
-    _poller: poll = field(init=False, default_factory=poll)
+    _clients: dict[int, Client] = field(init=False, default_factory=dict)
+    _rooms: Rooms[Client] = field(init=False, default_factory=Rooms)
+    _acks: Acks = field(init=False, default_factory=Acks)
+    _selector: Selector = field(init=False)
+    _backend: str | None = field(init=False)
+    _workers: dict[int, tuple[float, Bus]] = field(
+        init=False,
+        default_factory=dict,
+    )
+    _hub: dict[int, Bus] = field(init=False, default_factory=dict)
+    _bus: Bus | None = field(init=False, default=None)
+    _restarts: int = field(init=False, default=0)
+    _timers: Timers = field(init=False, default_factory=Timers)
+    _waker: Waker = field(init=False, default_factory=Waker)
+    _codecs: dict[str, Codec] = field(init=False)
+    _compression_threshold: int | None = field(init=False)
+    _compression_level: int = field(init=False)
+    _backpressure: Backpressure = field(init=False)
     _stopped: bool = field(init=False, default=False)
     _addr_info: AddressInfo = field(init=False)
     _host: str = field(init=False)
     _port: str = field(init=False)
+    _unix: bool = field(init=False)
     _bound: bool = field(init=False, default=False)
     _first_start: bool = field(init=False, default=True)
+    _heartbeat_interval: float | None = field(init=False)
+    _heartbeat_misses: int = field(init=False)
+    _reaped: int = field(init=False, default=0)
+    _stats: Stats | None = field(init=False, default=None)
 
     address: InitVar[str] = "localhost:3000"
     handle_sigint: InitVar[bool] = True
+    backend: InitVar[str | None] = None
+    codecs: InitVar[Iterable[str] | None] = None
+    compression_threshold: InitVar[int | None] = None
+    compression_level: InitVar[int] = -1
+    high_watermark: InitVar[int | None] = None
+    low_watermark: InitVar[int | None] = None
+    overflow: InitVar[str] = "drop"
+    heartbeat_interval: InitVar[float | None] = None
+    heartbeat_misses: InitVar[int] = 2
+    collect_stats: InitVar[bool] = False
+    stats_event: InitVar[str | None] = None
 
-    def __post_init__(self, address: str, handle_sigint: bool):
+    def __post_init__(
+            self,
+            address: str,
+            handle_sigint: bool,
+            backend: str | None,
+            codecs: Iterable[str] | None,
+            compression_threshold: int | None,
+            compression_level: int,
+            high_watermark: int | None,
+            low_watermark: int | None,
+            overflow: str,
+            heartbeat_interval: float | None,
+            heartbeat_misses: int,
+            collect_stats: bool,
+            stats_event: str | None,
+    ):
         """
         `tcpio.Server` post constructor.
 
-        :param address: The address to bind the server to.
+        :param address: The address to bind the server to, `host:port` or
+            `unix:/path/to.sock`.
         :param handle_sigint: Whether or not to handle SIGINT (Ctrl+C).
+        :param backend: The selector backend to use (`epoll`, `poll` or
+            `select`), `None` for the best one available on the platform.
+        :param codecs: The names of the codecs that the clients may use,
+            `None` to accept every registered codec.
+        :param compression_threshold: The minimum size of a message to
+            compress it, `None` to never compress the messages.
+        :param compression_level: The zlib compression level (0-9, -1 for
+            the default).
+        :param high_watermark: The maximum number of outgoing bytes queued
+            per client, `None` for no limit.
+        :param low_watermark: The number of queued bytes under which a
+            congested client is drained, half of `high_watermark` by
+            default.
+        :param overflow: What to do with the messages emitted to a
+            congested client: `drop` them, `disconnect` the client, or
+            `block` the event loop until the client is drained (see
+            `tcpio.Backpressure`).
+        :param heartbeat_interval: The number of seconds without receiving
+            anything from a client before pinging it, `None` to never ping
+            the clients.
+        :param heartbeat_misses: The number of pings in a row that a client
+            may leave unanswered before it is reaped.
+        :param collect_stats: Whether to collect runtime metrics (see
+            `tcpio.Stats`).
+        :param stats_event: The event that the local clients may emit with
+            an `ack` callback to get the metrics, `None` for no such event.
+        :raise ValueError: If the watermarks, the overflow policy or the
+            heartbeat settings are invalid.
         """
+        if heartbeat_interval is not None and heartbeat_interval <= 0:
+            raise ValueError(
+                f"heartbeat interval must be positive: {heartbeat_interval!r}"
+            )
+        if heartbeat_misses < 0:
+            raise ValueError(
+                f"heartbeat misses must not be negative: {heartbeat_misses!r}"
+            )
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_misses = heartbeat_misses
+        if collect_stats:
+            self._stats = Stats()
+            if stats_event is not None:
+                self.on(stats_event, self._serve_stats)
+        self._compression_threshold = compression_threshold
+        self._compression_level = compression_level
+        self._backpressure = Backpressure(
+            high_watermark,
+            low_watermark,
+            overflow,
+        )
+        self._backend = backend
+        self._selector = make_selector(backend)
+        self._codecs = dict(CODECS) if codecs is None else {
+            name: get_codec(name) for name in codecs
+        }
         if handle_sigint:
             def sigint_handler(sig: int, frame: FrameType | None):
                 self.stop()
             signal(SIGINT, sigint_handler)
-        port_sep = address.rfind(":")
-        self._host = address[:port_sep]
-        self._port = address[port_sep+1:]
-        self._socket = socket(
-            AF_INET, SOCK_STREAM | SOCK_NONBLOCK, IPPROTO_TCP)
-        self._addr_info = getaddrinfo(
-            host=self._host,
-            port=self._port,
-            family=AF_INET,
-            type=SOCK_STREAM,
-            proto=IPPROTO_TCP,
-        )
+        self._host, self._port = split_address(address)
+        self._unix = is_unix(address)
+        self._addr_info = resolve(address)
+        family, _, proto, _, _ = self._addr_info[0]
+        self._socket = socket(family, SOCK_STREAM | SOCK_NONBLOCK, proto)
 
     @override
     def emit(self, event: str, *args: object, **kwargs: object):
         """
-        Emit an event to all the clients connected to the server.
+        Emit an event to all the clients connected to the server, and to
+        the clients of the other processes in prefork mode.
+        The message is encoded once per codec and event symbol, and the same
+        frame is queued on every client that does not compress it.
 
         :param event: The event to emit.
         :param args: The arguments to pass to the event's callbacks.
         :param kwargs: The keyword arguments to pass to the event's callbacks.
         """
-        for client in self.clients:
-            client.emit(event, *args, **kwargs)
+        self._broadcast(event, args, kwargs)
+
+    def to(self, room: str):
+        """
+        :param room: The name of a room.
+        :return: The target of a broadcast to the members of `room`.
+        """
+        return Room((room,), self)
+
+    def _broadcast(
+            self,
+            event: str,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            exclude: FrameIO | None = None,
+            rooms: tuple[str, ...] = (),
+    ):
+        """
+        :private:
+
+        Emit an event to all the local clients, or to the members of
+        `rooms`, except `exclude`, and publish it on the broadcast bus in
+        prefork mode.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :param exclude: The client to skip, if any.
+        :param rooms: The names of the rooms to emit the event to, none to
+            emit it to all the clients.
+        """
+        if self._marshal(
+            self._broadcast, (event, args, kwargs, exclude, rooms),
+        ):
+            return
+        broadcast(
+            self._rooms.members(rooms) if rooms else self._clients.values(),
+            event, args, kwargs, exclude,
+        )
+        if self._bus is not None or self._hub:
+            try:
+                message = Bus.encode(event, args, kwargs, rooms)
+            except Exception as error:
+                self._report_error(error)
+                return
+            self._publish(message)
+
+    def _publish(self, message: bytes, exclude: Bus | None = None):
+        """
+        :private:
+
+        Send a bus message to the supervisor from a worker, or to all the
+        workers except `exclude` from the supervisor.
+
+        :param message: The encoded bus message.
+        :param exclude: The bus that the message comes from, if any.
+        """
+        buses = self._hub.values() if self._bus is None else (self._bus,)
+        for bus in buses:
+            if bus is not exclude and bus.publish(message):
+                self._selector.modify(bus.fileno(), READ | WRITE)
+
+    def _deliver(self, message: bytes):
+        """
+        :private:
+
+        Emit the event of a bus message to the local clients, or to the
+        local members of its rooms.
+
+        :param message: The encoded bus message.
+        """
+        event, args, kwargs, rooms = Bus.decode(message)
+        broadcast(
+            self._rooms.members(rooms) if rooms else self._clients.values(),
+            event, args, kwargs,
+        )
+
+    def _bus_event(self, bus: Bus, event: int):
+        """
+        :private:
+
+        Process the I/O events of a bus socket: relay the received messages
+        to the other workers on the supervisor, or deliver them to the
+        clients on a worker. A worker stops when its supervisor is gone.
+
+        :param bus: The bus whose socket is ready.
+        :param event: The selector events of the socket.
+        """
+        messages = bus.receive() if event & READ else []
+        if messages is None or event & WRITE and not bus.send():
+            if bus is self._bus:
+                self.stop()
+            else:
+                self._close_bus(bus)
+            return
+        for message in messages:
+            if bus is self._bus:
+                self._deliver(message)
+            else:
+                self._publish(message, bus)
+        if event & WRITE and not bus:
+            self._selector.modify(bus.fileno(), READ)
+
+    def _close_bus(self, bus: Bus):
+        """
+        :private:
+
+        Close the supervisor's end of a worker's bus, if still open.
+
+        :param bus: The bus to close.
+        """
+        if self._hub.get(bus.fileno()) is bus:
+            del self._hub[bus.fileno()]
+            self._selector.unregister(bus.fileno())
+            bus.close()
+
+    @override
+    def _order_key(self, args: tuple[object, ...]):
+        return id(args[0]) if args else None
 
     def _atexit(self):
         """
@@ -144,10 +533,40 @@ class Server(IO):
         Wait for the server to be stopped and disconnect all the clients.
         """
         self.wait()
-        for client in self._clients:
+        for client in list(self._clients.values()):
             client.disconnect()
         self._clients.clear()
         self._socket.close()
+        self._selector.close()
+        self._waker.close()
+        if self._bound and self._bus is None and self._unix:
+            try:
+                os.unlink(self._host)
+            except OSError:
+                pass
+
+    def _unlink_stale(self):
+        """
+        :private:
+
+        Remove the file of the Unix domain socket of the server if it was
+        left by a server that is gone, so that it can be bound again. The
+        socket of a live server is left alone, and binding fails then.
+        """
+        try:
+            if not stat.S_ISSOCK(os.stat(self._host).st_mode):
+                return
+        except OSError:
+            return
+        probe = socket(socket_module.AF_UNIX, SOCK_STREAM)
+        try:
+            probe.connect(self._host)
+        except ConnectionRefusedError:
+            os.unlink(self._host)
+        except OSError:
+            pass
+        finally:
+            probe.close()
 
     @property
     def socket(self):
@@ -165,7 +584,7 @@ class Server(IO):
 
         :return: A copy of the server's connected clients.
         """
-        return list(self._clients)
+        return list(self._clients.values())
 
     @property
     def host(self):
@@ -185,6 +604,47 @@ class Server(IO):
         """
         return self._port
 
+    def stats(self):
+        """
+        Get a snapshot of the runtime metrics of the server (see
+        `tcpio.Stats.snapshot`), along with its number of `clients` and of
+        `reaped` clients. In prefork mode, each worker has its own metrics.
+
+        :return: The metrics as a dict, `None` if the server was created
+            without `collect_stats=True`.
+        """
+        if self._stats is None:
+            return None
+        return {
+            **self._stats.snapshot(),
+            "clients": len(self._clients),
+            "reaped": self._reaped,
+        }
+
+    def _serve_stats(self, client: Client):
+        """
+        :private:
+
+        Reply to the `stats_event` messages of the local clients with the
+        metrics.
+
+        :param client: The client asking for the metrics.
+        :return: The metrics, `None` if the client is not local.
+        """
+        addr = client.addr
+        if isinstance(addr, tuple) and not ip_address(addr[0]).is_loopback:
+            return None
+        return self.stats()
+
+    @property
+    def reaped(self):
+        """
+        `reaped` getter.
+
+        :return: The number of clients reaped for missing their heartbeats.
+        """
+        return self._reaped
+
     @property
     def special_events(self):
         """
@@ -192,13 +652,15 @@ class Server(IO):
 
         :return: The server's special event names.
         """
-        return "connection", "disconnection", "error"
+        return "connection", "disconnection", "drain", "error"
 
     def stop(self):
         """
         Stop the server.
+        Safe to call from a signal handler or from another thread.
         """
         self._stopped = True
+        self._waker.wake()
 
     def disconnect(self, client: Client, trigger_disconnection: bool = True):
         """
@@ -210,85 +672,394 @@ class Server(IO):
         :param trigger_disconnection: Whether or not to trigger the
             `disconnection` events on the server.
         """
+        if self._marshal(self.disconnect, (client, trigger_disconnection)):
+            return
         if trigger_disconnection:
             self._trigger_event("disconnection", client)
-        self._poller.unregister(client._socket.fileno())
-        client._socket.setblocking(True)
-        client._socket.send(
-            client._send_buffer + (0).to_bytes(8, sys.byteorder)
-        )
-        self._clients.remove(client)
+        fd = client._socket.fileno()
+        self._selector.unregister(fd)
+        client._send_queue.push((0).to_bytes(8, sys.byteorder))
+        try:
+            client._flush()
+        except OSError:
+            pass
+        del self._clients[fd]
+        self._forget(client)
+
+    def _abort(self, client: Client):
+        """
+        :private:
+
+        Close the connection of a client without sending its queued frames,
+        and trigger the `disconnection` events.
+
+        :param client: The client to disconnect.
+        """
+        fd = client._socket.fileno()
+        if self._clients.get(fd) is not client:
+            return
+        self._selector.unregister(fd)
+        del self._clients[fd]
+        if client._handshaken:
+            self._trigger_event("disconnection", client)
+        self._forget(client)
+        client._socket.close()
+
+    def _forget(self, client: Client):
+        """
+        :private:
+
+        Remove a disconnected client from its rooms, and fail the
+        acknowledgements that it still owes with a `ConnectionError`.
+
+        :param client: The disconnected client.
+        """
+        self._rooms.leave_all(client)
+        if self._stats is not None:
+            self._stats.disconnections += 1
+        if client._heartbeat is not None:
+            client._heartbeat.cancel()
+            client._heartbeat = None
+        self._acks.cancel(client, ConnectionError(
+            f"{client.addr} disconnected before acknowledging"
+        ))
 
     def wait(self):
         """
         Wait for the server to be stopped.
+        In prefork mode, stop the workers before returning.
         """
         while not self._stopped:
             self.sleep()
+        self._stop_workers()
 
     def sleep(self, seconds: float = 0):
         """
         Sleep for `seconds` seconds or until the server gets stopped,
         while sleeping, process the incoming and outgoing data of the
-        connected clients.
+        connected clients. If `seconds` is 0, sleep until the next event.
+        The server blocks in its selector while there is nothing to do.
+        In prefork mode, the supervisor restarts the crashed workers while
+        sleeping. The timers that are due run while sleeping too, and the
+        selector never blocks past the next one.
 
         :param seconds: The number of seconds to sleep.
         """
-        begin = time()
+        deadline = monotonic() + seconds
+        self._waker.thread = get_ident()
         while not self._stopped:
-            for fd, event in self._poller.poll(0):
+            timeout = self._timers.timeout(
+                max(deadline - monotonic(), 0) if seconds else None
+            )
+            ready = self._selector.select(timeout)
+            busy = monotonic()
+            for fd, event in ready:
                 if fd == self._socket.fileno():
-                    incoming, addr = self._socket.accept()
-                    incoming.setblocking(False)
-                    self._clients.append(
-                        Server.Client(
-                            socket=incoming,
-                            addr=addr,
-                            server=self,
-                        )
-                    )
-                    self._trigger_event("connection", self.clients[-1])
-                    self._poller.register(incoming, POLLIN | POLLOUT)
-                else:
-                    client = next(
-                        client for client in self.clients
-                        if client._socket.fileno() == fd
-                    )
-                    if event & POLLIN:
-                        if client._recv() is False:
-                            self._poller.unregister(fd)
-                            self._trigger_event("disconnection", client)
-                            self._clients.remove(client)
-                    if event & POLLOUT:
+                    self._accept()
+                elif fd == self._waker.fileno():
+                    self._waker.drain()
+                    if self._workers:
+                        self._reap()
+                elif (client := self._clients.get(fd)) is not None:
+                    if event & READ and client._recv() is False:
+                        if fd in self._clients:
+                            self._selector.unregister(fd)
+                            if client._handshaken:
+                                self._trigger_event("disconnection", client)
+                            del self._clients[fd]
+                            self._forget(client)
+                            client._socket.close()
+                        continue
+                    if event & WRITE:
                         client._send()
+                        if not client._send_queue and fd in self._clients:
+                            self._selector.modify(fd, READ)
+                elif (bus := self._hub.get(fd)) is not None:
+                    self._bus_event(bus, event)
+                elif self._bus is not None and fd == self._bus.fileno():
+                    self._bus_event(self._bus, event)
+            self._timers.run()
+            if self._stats is not None:
+                self._stats.loop_lag.record(monotonic() - busy)
+            if monotonic() >= deadline:
+                break
 
-            if time() - begin > seconds:
+    def _accept(self):
+        """
+        :private:
+
+        Accept all the pending connections. Their `connection` events are
+        triggered once their handshake is received.
+        """
+        while True:
+            try:
+                incoming, addr = self._socket.accept()
+            except BlockingIOError:
                 break
+            self._adopt(incoming, addr)
+
+    def _adopt(self, incoming: socket_module.socket, addr: object):
+        """
+        :private:
+
+        Serve a new connection, accepted or created by `pair`.
+
+        :param incoming: The socket of the connection.
+        :param addr: The address of the client.
+        """
+        incoming.setblocking(False)
+        client = Server.Client(
+            socket=incoming,
+            addr=addr,
+            server=self,
+        )
+        self._clients[incoming.fileno()] = client
+        self._selector.register(incoming.fileno(), READ)
+        if self._stats is not None:
+            self._stats.connections += 1
+        if self._heartbeat_interval is not None:
+            client._heartbeat = self._timers.call_later(
+                self._heartbeat_interval, self._check, client,
+            )
+
+    def pair(self):
+        """
+        Create a connection to the server that does not go through its
+        listening socket, for a client in the same process: the server end
+        of a socket pair is served like an accepted connection, and the
+        other end is returned, see `tcpio.Client`. Its `connection` events
+        are triggered once its handshake is received.
+        Safe to call from another thread.
+
+        :return: The client end of the socket pair.
+        """
+        server_end, client_end = socketpair()
+        if not self._marshal(self._adopt, (server_end, "")):
+            self._adopt(server_end, "")
+        return client_end
+
+    def _check(self, client: Client):
+        """
+        :private:
+
+        Check the heartbeat of a client, when its timer fires. A ping is
+        missed if nothing was received from the client since. If nothing
+        was received for `heartbeat_interval` seconds, ping the client, or
+        reap it if it missed `heartbeat_misses` pings in a row, then
+        schedule the next check.
+        Clients are only pinged once handshaken, the ones that never
+        complete their handshake are reaped all the same.
+
+        :param client: The client to check.
+        """
+        interval = cast(float, self._heartbeat_interval)
+        now = monotonic()
+        if client._last_seen > client._pinged_at:
+            client._missed = 0
+        idle = now - client._last_seen
+        if idle < interval:
+            delay = interval - idle
+        elif client._missed >= self._heartbeat_misses:
+            client._heartbeat = None
+            self._reaped += 1
+            self._trigger_event("error", TimeoutError(
+                f"{client.addr} missed {client._missed} heartbeats"
+            ))
+            self._abort(client)
+            return
+        else:
+            if client._handshaken:
+                client._push(PING)
+            client._pinged_at = now
+            client._missed += 1
+            delay = interval
+        client._heartbeat = self._timers.call_later(delay, self._check, client)
 
-    def start(self, block: bool = False):
+    def start(self, block: bool = False, workers: int = 0):
         """
         Start the server, if `block` is `True`, the `wait` method will be
         called just before returning.
+        If `workers` is not 0, start the server in prefork mode: fork
+        `workers` worker processes that serve the clients, while this
+        process supervises them from its `sleep` and `wait` methods.
+        The workers are stopped along with the supervisor.
 
         :param block: Whether or not to block until the server is stopped.
+        :param workers: The number of worker processes to fork.
+        :raise RuntimeError: If the server is already started, or if the
+            platform does not support the prefork mode.
         """
         if self._bound:
             raise RuntimeError("Server already started")
+        if workers and not (
+            hasattr(os, "fork") and (
+                self._unix or hasattr(socket_module, "SO_REUSEPORT")
+            )
+        ):
+            raise RuntimeError("prefork mode requires fork and SO_REUSEPORT")
+        if self._unix:
+            self._unlink_stale()
+        else:
+            self._socket.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        if workers and not self._unix:
+            self._socket.setsockopt(
+                SOL_SOCKET, socket_module.SO_REUSEPORT, 1,
+            )
+        for addr in self._addr_info:
+            try:
+                self._socket.bind(addr[4])
+            except SocketError:
+                continue
+            else:
+                self._bound = True
+                break
         if not self._bound:
-            for addr in self._addr_info:
-                try:
-                    self._socket.bind(addr[4])
-                except SocketError:
-                    continue
-                else:
-                    self._bound = True
-                    break
-            if not self._bound:
-                self._trigger_event("error", "failed to bind")
-                return
-            atexit.register(self._atexit)
-            self._socket.listen(128)
-            self._poller.register(self._socket, POLLIN)
+            self._trigger_event("error", "failed to bind")
+            return
+        atexit.register(self._atexit)
+        self._selector.register(self._waker.fileno(), READ)
         self._stopped = False
+        if workers:
+            if self._unix:
+                self._socket.listen(128)
+            signal(signal_module.SIGCHLD, self._sigchld_handler)
+            for _ in range(workers):
+                self._fork()
+        else:
+            self._socket.listen(128)
+            self._selector.register(self._socket.fileno(), READ)
         if block:
             self.wait()
+
+    def _sigchld_handler(self, sig: int, frame: FrameType | None):
+        """
+        :private:
+
+        Wake up the supervisor when a worker exits.
+        """
+        self._waker.wake()
+
+    def _fork(self):
+        """
+        :private:
+
+        Fork a new worker process, linked to the supervisor by a new bus.
+        In the worker, replace the selector, the waker and the listening
+        socket inherited from the supervisor by new ones (a Unix domain
+        socket is shared with the supervisor instead), serve the clients
+        until the worker is stopped (by `SIGTERM` or `stop`), then exit the
+        process.
+        """
+        supervisor_end, worker_end = socketpair()
+        pid = os.fork()
+        if pid:
+            worker_end.close()
+            bus = Bus(supervisor_end)
+            self._hub[bus.fileno()] = bus
+            self._selector.register(bus.fileno(), READ)
+            self._workers[pid] = monotonic(), bus
+            return
+        status = 1
+        try:
+            supervisor_end.close()
+            for bus in self._hub.values():
+                bus.close()
+            self._hub.clear()
+            self._bus = Bus(worker_end)
+            signal(signal_module.SIGCHLD, SIG_DFL)
+            signal(SIGTERM, lambda sig, frame: self.stop())
+            self._workers.clear()
+            self._restarts = 0
+            self._timers = Timers()
+            if self._stats is not None:
+                self._stats = Stats()
+            for inherited in self._selector, self._waker:
+                inherited.close()
+            self._selector = make_selector(self._backend)
+            self._waker = Waker()
+            if not self._unix:
+                address = self._socket.getsockname()
+                self._socket.close()
+                family, _, proto, _, _ = self._addr_info[0]
+                self._socket = socket(
+                    family, SOCK_STREAM | SOCK_NONBLOCK, proto,
+                )
+                self._socket.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+                self._socket.setsockopt(
+                    SOL_SOCKET, socket_module.SO_REUSEPORT, 1,
+                )
+                self._socket.bind(address)
+                self._socket.listen(128)
+            self._selector.register(self._socket.fileno(), READ)
+            self._selector.register(self._waker.fileno(), READ)
+            self._selector.register(self._bus.fileno(), READ)
+            self._atexit()
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def _reap(self):
+        """
+        :private:
+
+        Collect the exited workers, and schedule the restart of the ones
+        that crashed while the server is running.
+        """
+        for pid, (started, bus) in list(self._workers.items()):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if not done:
+                continue
+            del self._workers[pid]
+            self._close_bus(bus)
+            code = os.waitstatus_to_exitcode(status)
+            if code and not self._stopped:
+                self._trigger_event("error", ChildProcessError(
+                    f"worker {pid} exited with status {code}"
+                ))
+                self._restarts += 1
+                self._timers.call_later(
+                    max(started + RESTART_DELAY - monotonic(), 0),
+                    self._restart,
+                )
+        if not self._workers and not self._restarts:
+            self.stop()
+
+    def _restart(self):
+        """
+        :private:
+
+        Fork a worker in place of a crashed one, unless the server was
+        stopped in the meantime.
+        """
+        self._restarts -= 1
+        if not self._stopped:
+            self._fork()
+
+    def _stop_workers(self):
+        """
+        :private:
+
+        Stop all the workers with `SIGTERM`, and wait for them to exit.
+        """
+        for pid in self._workers:
+            try:
+                os.kill(pid, SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid, (_, bus) in self._workers.items():
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._close_bus(bus)
+        self._workers.clear()
+
+
+__all__ = "Server", "AddressInfo", "RESTART_DELAY"
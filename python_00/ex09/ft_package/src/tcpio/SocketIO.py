@@ -1,17 +1,21 @@
 from dataclasses import dataclass, field
-from .IO import IO
-from .Message import Message
+from .FrameIO import FrameIO, HANDSHAKE, COMPRESSED
+from .RecvBuffer import RecvBuffer
+from .Timers import Timers
+from .Waker import Waker
 from socket import socket
-import pickle as pkl
-import sys as sys
-from typing import cast, Final
+from typing import Callable, Final
 from typing_extensions import override
+import sys
 
 
 @dataclass(slots=True)
-class SocketIO(IO):
+class SocketIO(FrameIO):
     """
-    Base class for a buffered socket I/O.
+    Base class for a buffered socket I/O, see `tcpio.FrameIO` for the
+    protocol. Its timers run on the event loop that watches the socket,
+    and its calls from other threads are scheduled on that loop through
+    its waker.
 
     :attr socket: The socket to use.
     :attr buffer_size: The size of the read buffer.
@@ -19,17 +23,20 @@ class SocketIO(IO):
     _socket: socket
     buffer_size: Final[int] = 4096
 
-    _recv_buffer: bytes = field(init=False, default=b'')
-    _send_buffer: bytes = field(init=False, default=b'')
+    _timers: Timers = field(init=False, default_factory=Timers)
+    _waker: Waker = field(init=False)
+
+    def __post_init__(self):
+        """
+        `tcpio.SocketIO` post constructor.
+        """
+        super(SocketIO, self).__post_init__()
+        self._recv_buffer = RecvBuffer(self.buffer_size)
 
     @property
     def socket(self):
         return self._socket
 
-    @override
-    def emit(self, event: str, *args: object, **kwargs: object):
-        self._send_buffer += self._encode(event, *args, **kwargs)
-
     def _recv(self):
         """
         :private:
@@ -37,67 +44,108 @@ class SocketIO(IO):
         Receive data from the socket and decode it.
         Trigger the events corresponding to the decoded data.
 
-        :return: True if the socket is still connected, False otherwise.
+        :return: True if the socket is still connected, False otherwise,
+            including when the peer reset the connection.
         """
         while True:
             try:
-                buffer = self._socket.recv(self.buffer_size)
+                received = self._recv_buffer.recv_from(self._socket)
             except BlockingIOError:
                 break
-            if not buffer:
+            except ConnectionError:
                 return False
-            self._recv_buffer += buffer
-            if len(buffer) < self.buffer_size:
-                break
-        while (pkt := self._decode()) is not None:
-            if pkt == "EOF":
+            if not received or not self._dispatch():
                 return False
-            self._trigger_event(pkt.event, *pkt.args, **pkt.kwargs)
+            if received < self.buffer_size:
+                break
         return True
 
-    def _encode(self, event: str, *args: object, **kwargs: object):
+    def _send(self) -> None:
         """
         :private:
 
-        Encode the event `event` with `args` and `kwargs` as arguments.
+        Send the queued frames to the socket, or as many as possible.
+        Trigger the `drain` events if the connection was congested and its
+        queued bytes fell to the low watermark.
+        """
+        if self._stats is not None:
+            self._stats.send_queue.record(self._send_queue.pending)
+        self._send_queue.send_to(self._socket)
+        if self._backpressure.drained(self._send_queue.pending):
+            self._trigger_event("drain")
+
+    @override
+    def _marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ):
+        return self._waker.marshal(call, args, kwargs)
 
-        :param event: The event to encode.
-        :param args: The arguments to pass to the event's callbacks.
-        :param kwargs: The keyword arguments to pass to the event's callbacks.
-        :return: The encoded event.
+    @override
+    def _call_later(
+            self,
+            delay: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        return self._timers.call_later(delay, callback, *args)
+
+    @override
+    def _block(self):
+        self._socket.setblocking(True)
+        try:
+            while self._backpressure.congested:
+                self._send()
+        except OSError:
+            return False
+        finally:
+            self._socket.setblocking(False)
+        return True
+
+    def _flush(self):
         """
-        pkt = pkl.dumps(
-            Message(event=event, args=args, kwargs=kwargs),
-        )
-        return len(pkt).to_bytes(8, sys.byteorder) + pkt
+        :private:
 
-    def _decode(self):
+        Send all the queued frames, blocking until they are sent.
+        """
+        self._socket.setblocking(True)
+        try:
+            while self._send_queue:
+                self._send()
+        finally:
+            self._socket.setblocking(False)
+
+    @staticmethod
+    def _resendable(frame: memoryview):
         """
         :private:
 
-        Decode the next event in the receive buffer, if any.
+        Check whether a frame queued on a previous connection can be sent
+        on a new one: handshakes and frames compressed with the previous
+        connection's zlib stream cannot.
 
-        :return: The first decoded event, or `None` if there is no event
-            to decode.
+        :param frame: The queued frame.
+        :return: Whether the frame can be sent on a new connection.
         """
-        if len(self._recv_buffer) < 8 or (pkt_size := int.from_bytes(
-            self._recv_buffer[:8],
-            sys.byteorder,
-        )) > len(self._recv_buffer) + 8:
-            return None
-        if pkt_size:
-            pkt = cast(Message, pkl.loads(self._recv_buffer[8:pkt_size+8]))
-        else:
-            pkt = "EOF"
-        self._recv_buffer = self._recv_buffer[pkt_size+8:]
-        return pkt
+        return not int.from_bytes(frame[:8], sys.byteorder) & COMPRESSED \
+            and frame[8:8 + len(HANDSHAKE)] != HANDSHAKE
 
-    def _send(self) -> None:
+    def _new_session(self):
         """
         :private:
 
-        Send the data in the send buffer to the socket, or as much as possible.
+        Start a new session once the socket of a client is connected: drop
+        the state of the previous connection, and queue the handshake
+        before the frames queued while the client was down.
         """
-        if self._send_buffer:
-            bytes = self._socket.send(self._send_buffer)
-            self._send_buffer = self._send_buffer[bytes:]
+        self._handshaken = False
+        self._in_symbols.clear()
+        self._compression.reset()
+        self._send_queue.restart(self._resendable)
+        self._send_queue.prepend(
+            self._handshake_frame(self._codec.name, self._out_symbols)
+        )
+        if self._stats is not None:
+            self._stats.connections += 1
@@ -0,0 +1,215 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Final
+
+LATENCY_BOUNDS: Final = tuple(1e-6 * 2 ** i for i in range(24))
+SIZE_BOUNDS: Final = tuple(2 ** i for i in range(6, 27))
+MAX_EVENTS: Final = 1024
+OTHER_EVENTS: Final = "<other>"
+
+
+@dataclass(slots=True)
+class Histogram:
+    """
+    A histogram with fixed buckets: recording a value costs a binary search
+    among the bounds and an increment, and its memory never grows.
+
+    :attr bounds: The upper bounds of the buckets, in increasing order.
+        The values above the last bound fall in an extra bucket.
+    """
+    bounds: Final[tuple[float, ...]] = LATENCY_BOUNDS
+
+    _counts: list[int] = field(init=False)
+    _count: int = field(init=False, default=0)
+    _sum: float = field(init=False, default=0.)
+
+    def __post_init__(self):
+        """
+        `tcpio.Histogram` post constructor.
+        """
+        self._counts = [0] * (len(self.bounds) + 1)
+
+    def record(self, value: float):
+        """
+        Count `value` in its bucket.
+
+        :param value: The value to record.
+        """
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+
+    def quantile(self, q: float):
+        """
+        :param q: The quantile, between 0 and 1.
+        :return: The upper bound of the bucket holding the quantile `q` of
+            the recorded values, `inf` if it is the extra bucket, `0` if no
+            value was recorded.
+        """
+        if not self._count:
+            return 0.
+        rank = q * self._count
+        seen = 0
+        for bound, count in zip(self.bounds, self._counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        """
+        :return: The number and the sum of the recorded values, their
+            median and 99th percentile (see `quantile`), and the
+            `(upper bound, count)` pairs of the non-empty buckets.
+        """
+        bounds = (*self.bounds, float("inf"))
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": [
+                (bounds[index], count)
+                for index, count in enumerate(self._counts) if count
+            ],
+        }
+
+
+@dataclass(slots=True)
+class EventStats:
+    """
+    The counters of one event name.
+
+    :attr messages_in: The number of messages received.
+    :attr bytes_in: The size of the frames received, headers included.
+    :attr messages_out: The number of messages queued.
+    :attr bytes_out: The size of the frames queued, headers included.
+    :attr handlers: The time spent in the listeners of the received
+        messages, in seconds.
+    """
+    messages_in: int = 0
+    bytes_in: int = 0
+    messages_out: int = 0
+    bytes_out: int = 0
+    handlers: Histogram = field(default_factory=Histogram)
+
+    def snapshot(self):
+        """
+        :return: The counters, as a dict.
+        """
+        return {
+            "messages_in": self.messages_in,
+            "bytes_in": self.bytes_in,
+            "messages_out": self.messages_out,
+            "bytes_out": self.bytes_out,
+            "handlers": self.handlers.snapshot(),
+        }
+
+
+@dataclass(slots=True)
+class Stats:
+    """
+    The runtime metrics of a `tcpio` event loop and of its connections.
+
+    They are only updated by the thread running the event loop, with plain
+    counters and fixed-bucket histograms, so that they can stay enabled in
+    production. At most `MAX_EVENTS` event names get their own counters,
+    the messages of the next ones are counted under `OTHER_EVENTS`, so
+    that a peer cannot grow them without bound.
+    The time spent in the listeners only covers the part that runs on the
+    event loop: starting a coroutine or submitting an offloaded call.
+
+    :attr loop_lag: The time spent processing each iteration of the event
+        loop, during which new events wait, in seconds.
+    :attr send_queue: The outgoing bytes queued on a connection, sampled
+        each time the event loop sends them.
+    :attr connections: The number of connections made.
+    :attr disconnections: The number of connections lost or closed.
+    :attr decode_errors: The number of frames that could not be decoded.
+    """
+    loop_lag: Histogram = field(init=False, default_factory=Histogram)
+    send_queue: Histogram = field(
+        init=False,
+        default_factory=lambda: Histogram(SIZE_BOUNDS),
+    )
+    connections: int = field(init=False, default=0)
+    disconnections: int = field(init=False, default=0)
+    decode_errors: int = field(init=False, default=0)
+
+    _events: dict[str, EventStats] = field(init=False, default_factory=dict)
+    _started: float = field(init=False, default_factory=monotonic)
+    _last: tuple[float, int, int] = field(init=False)
+
+    def __post_init__(self):
+        """
+        `tcpio.Stats` post constructor.
+        """
+        self._last = self._started, 0, 0
+
+    def event(self, name: str):
+        """
+        :param name: An event name.
+        :return: The counters of the event `name`.
+        """
+        if (stats := self._events.get(name)) is None:
+            if len(self._events) >= MAX_EVENTS:
+                name = OTHER_EVENTS
+            stats = self._events.setdefault(name, EventStats())
+        return stats
+
+    def received(self, name: str, size: int, seconds: float):
+        """
+        Count a received message.
+
+        :param name: The event name of the message.
+        :param size: The size of its frame.
+        :param seconds: The time spent in its listeners.
+        """
+        stats = self.event(name)
+        stats.messages_in += 1
+        stats.bytes_in += size
+        stats.handlers.record(seconds)
+
+    def sent(self, name: str, size: int):
+        """
+        Count a queued message.
+
+        :param name: The event name of the message.
+        :param size: The size of its frame.
+        """
+        stats = self.event(name)
+        stats.messages_out += 1
+        stats.bytes_out += size
+
+    def snapshot(self):
+        """
+        Get the metrics as a dict. The rates of connections and
+        disconnections are computed since the previous snapshot.
+
+        :return: The metrics.
+        """
+        now = monotonic()
+        since, connections, disconnections = self._last
+        self._last = now, self.connections, self.disconnections
+        elapsed = max(now - since, 1e-9)
+        return {
+            "uptime": now - self._started,
+            "events": {
+                name: stats.snapshot()
+                for name, stats in list(self._events.items())
+            },
+            "loop_lag": self.loop_lag.snapshot(),
+            "send_queue": self.send_queue.snapshot(),
+            "connections": self.connections,
+            "connections_per_second":
+                (self.connections - connections) / elapsed,
+            "disconnections": self.disconnections,
+            "disconnections_per_second":
+                (self.disconnections - disconnections) / elapsed,
+            "decode_errors": self.decode_errors,
+        }
+
+
+__all__ = "Stats", "EventStats", "Histogram", "LATENCY_BOUNDS", \
+    "SIZE_BOUNDS", "MAX_EVENTS", "OTHER_EVENTS"
@@ -0,0 +1,194 @@
+from dataclasses import dataclass, field
+from heapq import heapify, heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import Callable, Final, Iterator
+
+COMPACT_THRESHOLD: Final = 64
+
+
+@dataclass(slots=True, eq=False)
+class Timer:
+    """
+    A call scheduled on a `tcpio.Timers` heap, returned by `call_later` and
+    `call_every`.
+
+    :attr deadline: When the call is due, in `time.monotonic` seconds.
+    :attr interval: The period of a repeating timer, `None` if the call
+        happens once.
+    :attr cancelled: Whether the timer was cancelled.
+    """
+    deadline: float
+    interval: Final[float | None]
+    _callback: Final[Callable[..., object]]
+    _args: Final[tuple[object, ...]]
+
+    cancelled: bool = field(init=False, default=False)
+    _timers: "Timers | None" = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
+        """
+        `tcpio.Timer` post constructor.
+
+        :raise ValueError: If `interval` is not positive.
+        """
+        if self.interval is not None and self.interval <= 0:
+            raise ValueError(f"interval must be positive: {self.interval!r}")
+
+    def cancel(self):
+        """
+        Cancel the timer, if it did not happen yet.
+        Safe to call from any thread, and more than once.
+        """
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self._timers is not None:
+            self._timers._cancelled += 1
+
+
+@dataclass(slots=True)
+class Timers:
+    """
+    The timers of a `tcpio` event loop, in a heap ordered by deadline.
+
+    The event loop caps its selector timeout with `timeout`, and calls
+    `run` on each iteration. Scheduling a timer costs O(log n), and
+    cancelling one costs O(1): cancelled timers stay in the heap until they
+    reach its top, or until they make up more than half of it, when the
+    heap is rebuilt without them. This keeps both the memory and the cost
+    of the timers proportional to the live ones, even when a timeout per
+    connection is rescheduled all the time.
+    """
+    _heap: list[tuple[float, int, Timer]] = field(
+        init=False,
+        default_factory=list,
+    )
+    _ids: Iterator[int] = field(init=False, default_factory=count)
+    _cancelled: int = field(init=False, default=0)
+
+    def __len__(self):
+        """
+        :return: The number of scheduled timers.
+        """
+        return len(self._heap) - self._cancelled
+
+    def call_later(
+            self,
+            delay: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        """
+        Schedule `callback(*args)` in `delay` seconds.
+
+        :param delay: The number of seconds to wait.
+        :param callback: The function to call.
+        :param args: The arguments of the call.
+        :return: The timer, to cancel the call.
+        """
+        timer = Timer(monotonic() + delay, None, callback, args)
+        self.schedule(timer)
+        return timer
+
+    def call_every(
+            self,
+            interval: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        """
+        Schedule `callback(*args)` every `interval` seconds, starting in
+        `interval` seconds, until the timer is cancelled.
+
+        :param interval: The number of seconds between the calls.
+        :param callback: The function to call.
+        :param args: The arguments of the calls.
+        :return: The timer, to cancel the calls.
+        :raise ValueError: If `interval` is not positive.
+        """
+        timer = Timer(monotonic() + interval, interval, callback, args)
+        self.schedule(timer)
+        return timer
+
+    def schedule(self, timer: Timer):
+        """
+        Add a timer created elsewhere to the heap, typically a timer
+        created by another thread and handed over to the event loop.
+
+        :param timer: The timer to schedule.
+        """
+        if timer.cancelled:
+            return
+        timer._timers = self
+        heappush(self._heap, (timer.deadline, next(self._ids), timer))
+
+    def timeout(self, timeout: float | None = None):
+        """
+        :param timeout: The timeout that the event loop would use otherwise,
+            `None` to wait forever.
+        :return: The timeout capped by the time left before the next
+            deadline.
+        """
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            self._drop(heappop(heap)[2])
+        if not heap:
+            return timeout
+        left = max(heap[0][0] - monotonic(), 0)
+        return left if timeout is None else min(timeout, left)
+
+    def run(self):
+        """
+        Call the timers that are due. A repeating timer is rescheduled
+        before it is called, one `interval` after its previous deadline, or
+        after now if the event loop fell behind.
+        """
+        now = monotonic()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timer = heappop(heap)[2]
+            if timer.cancelled:
+                self._drop(timer)
+                continue
+            if timer.interval is None:
+                timer._timers = None
+            else:
+                timer.deadline += timer.interval
+                if timer.deadline <= now:
+                    timer.deadline = now + timer.interval
+                heappush(heap, (timer.deadline, next(self._ids), timer))
+            timer._callback(*timer._args)
+        if self._cancelled > COMPACT_THRESHOLD and \
+                self._cancelled * 2 > len(heap):
+            self._compact()
+
+    def _drop(self, timer: Timer):
+        """
+        :private:
+
+        Forget a cancelled timer popped from the heap.
+
+        :param timer: The cancelled timer.
+        """
+        timer._timers = None
+        self._cancelled -= 1
+
+    def _compact(self):
+        """
+        :private:
+
+        Rebuild the heap without the cancelled timers.
+        """
+        live = []
+        for entry in self._heap:
+            if entry[2].cancelled:
+                entry[2]._timers = None
+            else:
+                live.append(entry)
+        heapify(live)
+        self._heap = live
+        self._cancelled = 0
+
+
+__all__ = "Timer", "Timers"
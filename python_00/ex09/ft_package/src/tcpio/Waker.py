@@ -0,0 +1,113 @@
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from socket import socket, socketpair
+from threading import get_ident
+from typing import Callable
+
+
+@dataclass(slots=True)
+class Waker:
+    """
+    A self-pipe that interrupts a blocking `tcpio.Selector.select` call.
+
+    The reading end is watched by the event loop, and writing a byte on the
+    other end from a signal handler (or any other thread) makes the loop
+    return from the selector.
+    Other threads may also schedule calls on the event loop's thread with
+    `call_soon` or `marshal`, they run when the loop drains the waker.
+
+    :attr thread: The identifier of the thread running the event loop,
+        `None` until the loop runs.
+    """
+    thread: int | None = field(init=False, default=None)
+
+    _reader: socket = field(init=False)
+    _writer: socket = field(init=False)
+    _calls: deque[Callable[[], object]] = field(
+        init=False,
+        default_factory=deque,
+    )
+
+    def __post_init__(self):
+        """
+        `tcpio.Waker` post constructor.
+        """
+        self._reader, self._writer = socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+    def fileno(self):
+        """
+        :return: The file descriptor to watch for reading.
+        """
+        return self._reader.fileno()
+
+    def wake(self):
+        """
+        Wake up the event loop watching this waker.
+        """
+        try:
+            self._writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def drain(self):
+        """
+        Consume the pending wake ups, then run the scheduled calls.
+        """
+        try:
+            while self._reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        while self._calls:
+            self._calls.popleft()()
+
+    def in_loop(self):
+        """
+        :return: Whether the current thread runs the event loop, or the
+            loop never ran.
+        """
+        return self.thread is None or self.thread == get_ident()
+
+    def call_soon(self, call: Callable[[], object]):
+        """
+        Schedule `call` on the event loop's thread, and wake the loop up.
+        Safe to call from any thread.
+
+        :param call: The function to call, without arguments.
+        """
+        self._calls.append(call)
+        self.wake()
+
+    def marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ):
+        """
+        If the current thread does not run the event loop, schedule
+        `call(*args, **kwargs)` on it.
+
+        :param call: The function to call.
+        :param args: The arguments of the call.
+        :param kwargs: The keyword arguments of the call.
+        :return: Whether the call was scheduled, in which case the caller
+            must not perform it.
+        """
+        if self.in_loop():
+            return False
+        self.call_soon(partial(call, *args, **(kwargs or {})))
+        return True
+
+    def close(self):
+        """
+        Close both ends of the waker.
+        """
+        self._reader.close()
+        self._writer.close()
+
+
+__all__ = "Waker",
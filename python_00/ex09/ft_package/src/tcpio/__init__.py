@@ -1,4 +1,5 @@
 from .Client import Client
+from .ClientPool import ClientPool
 from .Server import Server
 
-__all__ = "Client", "Server"
+__all__ = "Client", "ClientPool", "Server"
@@ -0,0 +1,234 @@
+from asyncio import BaseTransport, Event, Future, get_running_loop, sleep, \
+    wait_for, TimeoutError as WaitTimeoutError
+from dataclasses import dataclass
+from typing import Final
+from typing_extensions import override
+from ..Codec import get_codec
+from ..Compression import Compression
+from ..Backpressure import Backpressure
+from ..Backoff import Backoff, RECONNECTION_DELAY, RECONNECTION_DELAY_MAX
+from ..Address import is_unix, split_address
+from ..Client import CONNECTION_ATTEMPT_DELAY
+from .ProtocolIO import ProtocolIO
+
+
+@dataclass(slots=True, init=False)
+class AsyncClient(ProtocolIO):
+    """
+    A client running on an asyncio event loop, that connects to a
+    `tcpio.Server` or a `tcpio.aio.AsyncServer`.
+    Callbacks may be coroutine functions.
+    The client connects to a TCP address (`host:port`) or to a Unix domain
+    socket (`unix:/path/to.sock`).
+
+    :attr host: The client's host name, or the path of the Unix domain
+        socket of the server.
+    :attr port: The client's port number, empty for a Unix domain socket.
+    :attr connected: Whether the client is connected to the server.
+    :attr special_events: Special events that are triggered by the client.
+
+    List of special events:
+        - `connect` -> The server accepted the client's handshake, the
+            callback takes no arguments.
+        - `disconnect` -> The client is disconnected from the server, the
+            callback takes no arguments.
+        - `drain` -> The client was congested and its queued bytes fell to
+            its low watermark, the callback takes no arguments.
+        - `error` -> Triggered when an error occurs, the callback takes
+            an `Exception` as its first argument.
+    """
+    host: Final[str]
+    port: Final[str]
+    connect_timeout: Final[float]
+    reconnection: Final[bool]
+    reconnection_attempts: Final[int]
+    reconnection_delay: Final[float]
+    reconnection_delay_max: Final[float]
+
+    _unix: bool
+    _disconnected: Event
+    _accepted: Future[bool] | None
+    _reconnect: Backoff
+
+    @override
+    def __init__(
+            self,
+            address: str,
+            connect_timeout: float = 1,
+            reconnection: bool = True,
+            reconnection_attempts: int = 0,
+            reconnection_delay: float = RECONNECTION_DELAY,
+            reconnection_delay_max: float = RECONNECTION_DELAY_MAX,
+            buffer_size: int = 4096,
+            codec: str = "pickle",
+            compression_threshold: int | None = None,
+            compression_level: int = -1,
+            high_watermark: int | None = None,
+            low_watermark: int | None = None,
+            overflow: str = "drop",
+    ):
+        """
+        `tcpio.aio.AsyncClient` constructor.
+
+        :param address: The address of the server to connect to,
+            `host:port` or `unix:/path/to.sock`.
+        :param connect_timeout: The timeout for the connection.
+        :param reconnection: Whether to attempt to reconnect to the server.
+        :param reconnection_attempts: The number of reconnection attempts
+            (0 = infinite).
+        :param reconnection_delay: The first delay between reconnection
+            attempts (doubled on each retry, and drawn at random between
+            half and all of its value).
+        :param reconnection_delay_max: The maximum delay between reconnection
+            attempts.
+        :param buffer_size: The size of the client's internal buffer.
+        :param codec: The name of the codec to encode the messages with, it
+            must be accepted by the server.
+        :param compression_threshold: The minimum size of a message to
+            compress it, `None` to never compress the messages.
+        :param compression_level: The zlib compression level (0-9, -1 for
+            the default).
+        :param high_watermark: The maximum number of outgoing bytes queued,
+            `None` for no limit.
+        :param low_watermark: The number of queued bytes under which the
+            client is drained, half of `high_watermark` by default.
+        :param overflow: What to do with the messages emitted while the
+            client is congested: `drop` them or `disconnect` the client (see
+            `tcpio.Backpressure`).
+        :raise ValueError: If the watermarks or the overflow policy are
+            invalid.
+        """
+        if overflow == "block":
+            raise ValueError("an event loop cannot block on a connection")
+        self.host, self.port = split_address(address)
+        self._unix = is_unix(address)
+        super(AsyncClient, self).__init__(buffer_size)
+        self._codec = get_codec(codec)
+        self._compression = Compression(
+            compression_threshold,
+            compression_level,
+        )
+        self._backpressure = Backpressure(
+            high_watermark,
+            low_watermark,
+            overflow,
+        )
+        self.connect_timeout = connect_timeout
+        self.reconnection = reconnection
+        self.reconnection_attempts = reconnection_attempts
+        self.reconnection_delay = reconnection_delay
+        self.reconnection_delay_max = reconnection_delay_max
+        self._disconnected = Event()
+        self._disconnected.set()
+        self._accepted = None
+        self._reconnect = Backoff(
+            reconnection_attempts,
+            reconnection_delay,
+            reconnection_delay_max,
+        )
+
+    @property
+    def connected(self):
+        """
+        `connected` getter.
+
+        :return: Whether the client is connected to the server.
+        """
+        return self._handshaken
+
+    @property
+    def special_events(self):
+        """
+        `special_events` getter.
+
+        :return: Special events that are triggered by the client.
+        """
+        return "connect", "disconnect", "drain", "error"
+
+    @override
+    def connection_made(self, transport: BaseTransport):
+        super(AsyncClient, self).connection_made(transport)
+        self._disconnected.clear()
+        self._in_symbols.clear()
+        self._compression.reset()
+        self._queue(
+            self._handshake_frame(self._codec.name, self._out_symbols)
+        )
+        self._send()
+
+    @override
+    def connection_lost(self, exc: Exception | None):
+        handshaken = self._handshaken
+        super(AsyncClient, self).connection_lost(exc)
+        self._disconnected.set()
+        if self._accepted is not None and not self._accepted.done():
+            self._accepted.set_result(False)
+        if handshaken:
+            self._trigger_event("disconnect")
+
+    @override
+    def _handshake(self, pkt: bytes):
+        if not super(AsyncClient, self)._handshake(pkt):
+            return False
+        if self._accepted is not None and not self._accepted.done():
+            self._accepted.set_result(True)
+        self._trigger_event("connect")
+        return True
+
+    def disconnect(self):
+        """
+        Disconnect the client from the server, once the frames already
+        emitted are sent.
+        """
+        if self._transport is not None:
+            self._transport.close()
+
+    async def wait(self):
+        """
+        Wait for the client to disconnect.
+        """
+        await self._disconnected.wait()
+
+    async def connect(self):
+        """
+        Connect the client to the server and wait for the server to accept
+        its handshake.
+        The host name of the server is resolved on each attempt, and its
+        IPv4 and IPv6 addresses are raced like `tcpio.Client.connect` does.
+        If `reconnection` was set to `True` in the constructor, attempt to
+        reconnect to the server after a randomized backoff (see
+        `tcpio.Backoff`) if the connection fails.
+        Trigger the `error` events on each failed attempt with a
+        `ConnectionError` as their first argument.
+        When the handshake is accepted, trigger the `connect` event.
+
+        :return: Whether the client is connected.
+        """
+        if self._transport is not None:
+            return self._handshaken
+        loop = get_running_loop()
+        self._reconnect.reset()
+        while True:
+            self._accepted = loop.create_future()
+            try:
+                await wait_for(loop.create_unix_connection(
+                    lambda: self,
+                    self.host,
+                ) if self._unix else loop.create_connection(
+                    lambda: self,
+                    self.host,
+                    int(self.port),
+                    happy_eyeballs_delay=CONNECTION_ATTEMPT_DELAY,
+                ), self.connect_timeout)
+            except (OSError, WaitTimeoutError):
+                self._trigger_event("error", ConnectionError(
+                    f"cannot connect to {self.host}:{self.port}"
+                ))
+            else:
+                return await self._accepted
+            if not self.reconnection or self._reconnect.fail():
+                return False
+            await sleep(self._reconnect.next_delay())
+
+
+__all__ = "AsyncClient",
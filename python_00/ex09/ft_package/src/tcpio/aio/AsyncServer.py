@@ -0,0 +1,465 @@
+from asyncio import BaseTransport, Event, get_running_loop, \
+    AbstractEventLoop, Server as LoopServer
+from dataclasses import dataclass, field, replace, InitVar
+from socket import AF_INET
+from typing import Callable, Final, Iterable
+from typing_extensions import override
+from ..IO import IO
+from ..Codec import Codec, CODECS, get_codec
+from ..Compression import Compression
+from ..Backpressure import Backpressure
+from ..FrameIO import FrameIO, HANDSHAKE, broadcast
+from ..Room import Room
+from ..Rooms import Rooms
+from ..Acks import Acks
+from ..Address import is_unix, split_address
+from .ProtocolIO import ProtocolIO, marshal, trigger
+from .Tasks import Tasks
+import os
+import sys
+
+
+@dataclass(slots=True)
+class AsyncServer(IO):
+    """
+    An event-based TCP server running on an asyncio event loop, compatible
+    with `tcpio.Client` and `tcpio.aio.AsyncClient`.
+    Callbacks may be coroutine functions.
+    Clients can join rooms, like the clients of a `tcpio.Server`.
+    The server listens on a TCP address (`host:port`) or on a Unix domain
+    socket (`unix:/path/to.sock`), whose file is removed when the server
+    is stopped.
+
+    :attr socket: The server's listening socket, once started.
+    :attr clients: The list of connected clients.
+    :attr host: The server's host name, or the path of its Unix domain
+        socket.
+    :attr port: The server's port number, empty for a Unix domain socket.
+    :attr special_events: Special events that are triggered by the server.
+
+    List of special events:
+        - `connection` -> A client connects to the server and completes its
+            handshake, the callback takes a `tcpio.aio.AsyncServer.Client`
+            as its first argument.
+        - `disconnection` -> A client disconnects from the server, the callback
+            takes a `tcpio.aio.AsyncServer.Client` as its first argument.
+        - `drain` -> A congested client's queued bytes fell to its low
+            watermark, the callback takes a `tcpio.aio.AsyncServer.Client`
+            as its first argument.
+        - `error` -> Triggered when an error occurs, the callback takes
+            an `Exception` as its first argument.
+    """
+    @dataclass(slots=True, init=False)
+    class Client(ProtocolIO):
+        """
+        A client connected to a `tcpio.aio.AsyncServer`.
+
+        :attr addr: The client's address.
+        :attr rooms: The names of the rooms that the client is a member of.
+        """
+        addr: object
+        _server: Final["AsyncServer"]
+
+        @override
+        def __init__(self, server: "AsyncServer", buffer_size: int = 4096):
+            """
+            `tcpio.aio.AsyncServer.Client` constructor.
+
+            :param server: The server that the client is connected to.
+            :param buffer_size: The size of the client's internal buffer.
+            """
+            super(AsyncServer.Client, self).__init__(buffer_size)
+            self.addr = None
+            self._server = server
+            self._compression = Compression(
+                server._compression_threshold,
+                server._compression_level,
+            )
+            self._backpressure = replace(server._backpressure)
+            self._acks = server._acks
+
+        @override
+        def connection_made(self, transport: BaseTransport):
+            super(AsyncServer.Client, self).connection_made(transport)
+            self.addr = transport.get_extra_info("peername")
+            self._server._clients[id(self)] = self
+
+        @override
+        def connection_lost(self, exc: Exception | None):
+            handshaken = self._handshaken
+            super(AsyncServer.Client, self).connection_lost(exc)
+            if self._server._clients.pop(id(self), None) and handshaken:
+                self._server._trigger_event("disconnection", self)
+            self._server._rooms.leave_all(self)
+
+        @override
+        def _trigger_event(
+                self,
+                event: str,
+                *args: object,
+                **kwargs: object,
+        ) -> object:
+            result = self._server._trigger_event(event, self, *args, **kwargs)
+            own = super(AsyncServer.Client, self)._trigger_event(
+                event, *args, **kwargs,
+            )
+            return result if own is None else own
+
+        @override
+        def _handshake(self, pkt: bytes):
+            codec, *symbols = pkt[len(HANDSHAKE):].decode(
+                errors="replace",
+            ).split("\0") if pkt.startswith(HANDSHAKE) else ("",)
+            if codec not in self._server._codecs:
+                self._queue(self._handshake_frame(""))
+                self._server._trigger_event("error", ConnectionRefusedError(
+                    f"{self.addr} proposed an unsupported codec: {codec!r}"
+                ))
+                return False
+            if not self._define_symbols(symbols):
+                return False
+            self._codec = self._server._codecs[codec]
+            self._handshaken = True
+            self._queue(self._handshake_frame(codec))
+            self._server._trigger_event("connection", self)
+            return True
+
+        @override
+        def _marshal(
+                self,
+                call: Callable[..., object],
+                args: tuple[object, ...] = (),
+                kwargs: dict[str, object] | None = None,
+        ):
+            return self._server._marshal(call, args, kwargs)
+
+        @override
+        def _report_error(self, error: BaseException):
+            self._server._report_error(error)
+
+        @property
+        def rooms(self):
+            """
+            `rooms` getter.
+
+            :return: The names of the rooms that the client is a member of.
+            """
+            return self._server._rooms.rooms_of(self)
+
+        def join(self, room: str):
+            """
+            Add the client to the room `room`, until it leaves it or
+            disconnects.
+
+            :param room: The name of the room.
+            """
+            if not self._marshal(self.join, (room,)):
+                self._server._rooms.join(self, room)
+
+        def leave(self, room: str):
+            """
+            Remove the client from the room `room`.
+
+            :param room: The name of the room.
+            """
+            if not self._marshal(self.leave, (room,)):
+                self._server._rooms.leave(self, room)
+
+        def to(self, room: str):
+            """
+            :param room: The name of a room.
+            :return: The target of a broadcast to the members of `room`,
+                except this client.
+            """
+            return Room((room,), self._server, self)
+
+        def broadcast(self, event: str, *args: object, **kwargs: object):
+            """
+            Emit an event to all the other clients connected to the server,
+            the message is encoded once like with
+            `tcpio.aio.AsyncServer.emit`.
+
+            :param event: The event to emit.
+            :param args: The arguments to pass to the event's callbacks.
+            :param kwargs: The keyword arguments to pass to the event's
+                callbacks.
+            """
+            self._server._broadcast(event, args, kwargs, self)
+
+        def disconnect(self, trigger_disconnection: bool = True):
+            """
+            Call `self._server.disconnect(self, trigger_disconnection)`.
+
+            :param trigger_disconnection: Whether or not to trigger the
+                `disconnection` events on the server.
+            """
+            self._server.disconnect(self, trigger_disconnection)
+
+    _server: LoopServer | None = field(init=False, default=None)
+    _loop: AbstractEventLoop | None = field(init=False, default=None)
+    _clients: dict[int, Client] = field(init=False, default_factory=dict)
+    _rooms: Rooms[Client] = field(init=False, default_factory=Rooms)
+    _acks: Acks = field(init=False, default_factory=Acks)
+    _tasks: Tasks = field(init=False, default_factory=Tasks)
+    _stopped: Event = field(init=False, default_factory=Event)
+    _codecs: dict[str, Codec] = field(init=False)
+    _compression_threshold: int | None = field(init=False)
+    _compression_level: int = field(init=False)
+    _backpressure: Backpressure = field(init=False)
+    _host: str = field(init=False)
+    _port: str = field(init=False)
+    _unix: bool = field(init=False)
+
+    address: InitVar[str] = "localhost:3000"
+    codecs: InitVar[Iterable[str] | None] = None
+    compression_threshold: InitVar[int | None] = None
+    compression_level: InitVar[int] = -1
+    high_watermark: InitVar[int | None] = None
+    low_watermark: InitVar[int | None] = None
+    overflow: InitVar[str] = "drop"
+
+    def __post_init__(
+            self,
+            address: str,
+            codecs: Iterable[str] | None,
+            compression_threshold: int | None,
+            compression_level: int,
+            high_watermark: int | None,
+            low_watermark: int | None,
+            overflow: str,
+    ):
+        """
+        `tcpio.aio.AsyncServer` post constructor.
+
+        :param address: The address to bind the server to, `host:port` or
+            `unix:/path/to.sock`.
+        :param codecs: The names of the codecs that the clients may use,
+            `None` to accept every registered codec.
+        :param compression_threshold: The minimum size of a message to
+            compress it, `None` to never compress the messages.
+        :param compression_level: The zlib compression level (0-9, -1 for
+            the default).
+        :param high_watermark: The maximum number of outgoing bytes queued
+            per client, `None` for no limit.
+        :param low_watermark: The number of queued bytes under which a
+            congested client is drained, half of `high_watermark` by
+            default.
+        :param overflow: What to do with the messages emitted to a
+            congested client: `drop` them or `disconnect` the client (see
+            `tcpio.Backpressure`).
+        :raise ValueError: If the watermarks or the overflow policy are
+            invalid.
+        """
+        if overflow == "block":
+            raise ValueError("an event loop cannot block on a connection")
+        self._compression_threshold = compression_threshold
+        self._compression_level = compression_level
+        self._backpressure = Backpressure(
+            high_watermark,
+            low_watermark,
+            overflow,
+        )
+        self._codecs = dict(CODECS) if codecs is None else {
+            name: get_codec(name) for name in codecs
+        }
+        self._host, self._port = split_address(address)
+        self._unix = is_unix(address)
+
+    @override
+    def emit(self, event: str, *args: object, **kwargs: object):
+        """
+        Emit an event to all the clients connected to the server.
+        The message is encoded once per codec and event symbol, and the same
+        frame is queued on every client that does not compress it.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        """
+        self._broadcast(event, args, kwargs)
+
+    def to(self, room: str):
+        """
+        :param room: The name of a room.
+        :return: The target of a broadcast to the members of `room`.
+        """
+        return Room((room,), self)
+
+    def _broadcast(
+            self,
+            event: str,
+            args: tuple[object, ...],
+            kwargs: dict[str, object],
+            exclude: FrameIO | None = None,
+            rooms: tuple[str, ...] = (),
+    ):
+        """
+        :private:
+
+        Emit an event to all the clients, or to the members of `rooms`,
+        except `exclude`.
+
+        :param event: The event to emit.
+        :param args: The arguments to pass to the event's callbacks.
+        :param kwargs: The keyword arguments to pass to the event's callbacks.
+        :param exclude: The client to skip, if any.
+        :param rooms: The names of the rooms to emit the event to, none to
+            emit it to all the clients.
+        """
+        if self._marshal(
+            self._broadcast, (event, args, kwargs, exclude, rooms),
+        ):
+            return
+        broadcast(
+            self._rooms.members(rooms) if rooms else self._clients.values(),
+            event, args, kwargs, exclude,
+        )
+
+    @override
+    def _trigger_event(
+            self,
+            event: str,
+            *args: object,
+            **kwargs: object,
+    ) -> object:
+        return trigger(
+            self._handlers.listeners(event), self._tasks, args, kwargs,
+        )
+
+    @override
+    def _marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ):
+        return marshal(self._loop, call, args, kwargs)
+
+    @override
+    def _order_key(self, args: tuple[object, ...]):
+        return id(args[0]) if args else None
+
+    @property
+    def socket(self):
+        """
+        `socket` getter.
+
+        :return: The server's listening socket, `None` if not started.
+        """
+        return self._server.sockets[0] if self._server is not None else None
+
+    @property
+    def clients(self):
+        """
+        `clients` getter.
+
+        :return: A copy of the server's connected clients.
+        """
+        return list(self._clients.values())
+
+    @property
+    def host(self):
+        """
+        `host` getter.
+
+        :return: The server's host name.
+        """
+        return self._host
+
+    @property
+    def port(self):
+        """
+        `port` getter.
+
+        :return: The server's port number.
+        """
+        return self._port
+
+    @property
+    def special_events(self):
+        """
+        `special_events` getter.
+
+        :return: The server's special event names.
+        """
+        return "connection", "disconnection", "drain", "error"
+
+    def stop(self):
+        """
+        Stop the server: close its listening socket and disconnect all the
+        clients, without triggering their `disconnection` events.
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if self._unix:
+                try:
+                    os.unlink(self._host)
+                except OSError:
+                    pass
+        for client in list(self._clients.values()):
+            self.disconnect(client, False)
+        self._stopped.set()
+
+    def disconnect(self, client: Client, trigger_disconnection: bool = True):
+        """
+        Disconnect the client from the server, if `trigger_disconnection` is
+        `True`, the `disconnection` events will be triggered before the
+        client gets disconnected. The frames already emitted to the client
+        are still sent before the connection is closed.
+
+        :param client: The client to disconnect.
+        :param trigger_disconnection: Whether or not to trigger the
+            `disconnection` events on the server.
+        """
+        if self._marshal(self.disconnect, (client, trigger_disconnection)):
+            return
+        if self._clients.pop(id(client), None) is None:
+            return
+        if trigger_disconnection:
+            self._trigger_event("disconnection", client)
+        self._rooms.leave_all(client)
+        if client._transport is not None:
+            client._transport.write((0).to_bytes(8, sys.byteorder))
+            client._transport.close()
+
+    async def wait(self):
+        """
+        Wait for the server to be stopped.
+        """
+        await self._stopped.wait()
+
+    async def start(self, block: bool = False):
+        """
+        Start the server on the running event loop, if `block` is `True`,
+        the `wait` method will be awaited just before returning.
+
+        :param block: Whether or not to block until the server is stopped.
+        """
+        if self._server is not None:
+            raise RuntimeError("Server already started")
+        self._loop = get_running_loop()
+        try:
+            if self._unix:
+                self._server = await self._loop.create_unix_server(
+                    lambda: AsyncServer.Client(self),
+                    self._host,
+                    backlog=128,
+                )
+            else:
+                self._server = await self._loop.create_server(
+                    lambda: AsyncServer.Client(self),
+                    self._host,
+                    int(self._port),
+                    family=AF_INET,
+                    backlog=128,
+                )
+        except OSError as error:
+            self._trigger_event("error", error)
+            return
+        self._stopped.clear()
+        if block:
+            await self.wait()
+
+
+__all__ = "AsyncServer",
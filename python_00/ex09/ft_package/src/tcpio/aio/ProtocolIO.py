@@ -0,0 +1,195 @@
+from asyncio import BufferedProtocol, BaseTransport, Transport, \
+    AbstractEventLoop, iscoroutine, get_running_loop
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Final, Iterable, cast
+from typing_extensions import override
+from ..FrameIO import FrameIO
+from ..RecvBuffer import RecvBuffer
+from .Tasks import Tasks
+
+
+@dataclass(slots=True)
+class ProtocolIO(FrameIO, BufferedProtocol):
+    """
+    Base class for a `tcpio` connection driven by an asyncio transport.
+
+    The transport receives the incoming bytes directly into the receive
+    buffer through the `BufferedProtocol` interface, and buffers the
+    outgoing frames itself. Frames emitted while there is no transport are
+    queued, and written once the connection is made. Frames emitted while
+    the transport is closing are dropped.
+
+    Callbacks may be coroutine functions, their coroutines are run in
+    tasks on the event loop. Such tasks only start on the next iteration of
+    the loop, so the listeners of a new connection must be added by a
+    regular function to receive its first messages.
+
+    The transport's write buffer counts in the outgoing bytes bounded by
+    the watermarks, and its low water limit is set to the low watermark, so
+    that `resume_writing` tells when a congested connection is drained. An
+    event loop cannot block on a connection, so the `block` overflow policy
+    is not supported.
+
+    :attr buffer_size: The size of the read buffer.
+    """
+    buffer_size: Final[int] = 4096
+
+    _transport: Transport | None = field(init=False, default=None)
+    _loop: AbstractEventLoop | None = field(init=False, default=None)
+    _tasks: Tasks = field(init=False, default_factory=Tasks)
+
+    def __post_init__(self):
+        """
+        `tcpio.aio.ProtocolIO` post constructor.
+        """
+        super(ProtocolIO, self).__post_init__()
+        self._recv_buffer = RecvBuffer(self.buffer_size)
+
+    @override
+    def connection_made(self, transport: BaseTransport):
+        self._transport = cast(Transport, transport)
+        self._loop = get_running_loop()
+        if self._backpressure.high is not None:
+            low = self._backpressure.low
+            self._transport.set_write_buffer_limits(low, low)
+
+    @override
+    def connection_lost(self, exc: Exception | None):
+        self._transport = None
+        self._handshaken = False
+        self._acks.cancel(self, ConnectionError(
+            "disconnected before acknowledging"
+        ))
+
+    @override
+    def resume_writing(self):
+        if self._backpressure.drained(self._pending()):
+            self._trigger_event("drain")
+
+    @override
+    def get_buffer(self, sizehint: int):
+        return self._recv_buffer.get_buffer()
+
+    @override
+    def buffer_updated(self, nbytes: int):
+        self._recv_buffer.advance(nbytes)
+        if not self._dispatch() and self._transport is not None:
+            self._transport.close()
+
+    @override
+    def _trigger_event(
+            self,
+            event: str,
+            *args: object,
+            **kwargs: object,
+    ) -> object:
+        return trigger(
+            self._handlers.listeners(event), self._tasks, args, kwargs,
+        )
+
+    @override
+    def _marshal(
+            self,
+            call: Callable[..., object],
+            args: tuple[object, ...] = (),
+            kwargs: dict[str, object] | None = None,
+    ):
+        return marshal(self._loop, call, args, kwargs)
+
+    @override
+    def _call_later(
+            self,
+            delay: float,
+            callback: Callable[..., object],
+            *args: object,
+    ):
+        return (self._loop or get_running_loop()).call_later(
+            delay, callback, *args,
+        )
+
+    @override
+    def _push(self, frame: bytes | memoryview):
+        if self._transport is None:
+            self._send_queue.push(frame)
+        elif not self._transport.is_closing():
+            self._transport.write(frame)
+
+    @override
+    def _pending(self):
+        if self._transport is None:
+            return self._send_queue.pending
+        return self._transport.get_write_buffer_size()
+
+    @override
+    def _overflow(self):
+        if self._transport is None:
+            self._send_queue.clear()
+        else:
+            self._transport.abort()
+
+    def _send(self):
+        """
+        :private:
+
+        Write the frames queued while there was no transport.
+        """
+        if self._transport is not None and self._send_queue:
+            self._transport.writelines(self._send_queue.take())
+
+
+def trigger(
+        callbacks: Iterable[Callable[..., object]],
+        tasks: Tasks,
+        args: tuple[object, ...],
+        kwargs: dict[str, object],
+) -> object:
+    """
+    Call the event listeners `callbacks`, and run the coroutines they
+    return in `tasks`.
+
+    :param callbacks: The event listeners to call.
+    :param tasks: The tasks of the IO that the listeners belong to.
+    :param args: The arguments to pass to the callbacks.
+    :param kwargs: The keyword arguments to pass to the callbacks.
+    :return: The value returned by the last listener that returned one
+        (its task if it was a coroutine), `None` otherwise.
+    """
+    result = None
+    for callback in callbacks:
+        if iscoroutine(value := callback(*args, **kwargs)):
+            value = tasks.spawn(value)
+        if value is not None:
+            result = value
+    return result
+
+
+def marshal(
+        loop: AbstractEventLoop | None,
+        call: Callable[..., object],
+        args: tuple[object, ...],
+        kwargs: dict[str, object] | None,
+):
+    """
+    If the current thread does not run `loop`, schedule
+    `call(*args, **kwargs)` on it.
+
+    :param loop: The event loop to schedule the call on, `None` if there
+        is none yet.
+    :param call: The function to call.
+    :param args: The arguments of the call.
+    :param kwargs: The keyword arguments of the call.
+    :return: Whether the call was scheduled.
+    """
+    if loop is None:
+        return False
+    try:
+        if get_running_loop() is loop:
+            return False
+    except RuntimeError:
+        pass
+    loop.call_soon_threadsafe(partial(call, *args, **(kwargs or {})))
+    return True
+
+
+__all__ = "ProtocolIO", "marshal", "trigger"
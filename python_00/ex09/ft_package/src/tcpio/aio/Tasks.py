@@ -0,0 +1,59 @@
+from asyncio import Task, get_running_loop
+from dataclasses import dataclass, field
+from typing import Coroutine
+
+
+@dataclass(slots=True)
+class Tasks:
+    """
+    The tasks running the coroutines returned by the callbacks of an
+    asyncio based `tcpio.IO`.
+
+    A strong reference to each task is kept until it is done, and the
+    exceptions they raise are reported to the loop's exception handler.
+    """
+    _tasks: set[Task[object]] = field(init=False, default_factory=set)
+
+    def __len__(self):
+        """
+        :return: The number of running tasks.
+        """
+        return len(self._tasks)
+
+    def spawn(self, coro: Coroutine[object, object, object]):
+        """
+        Run `coro` in a new task on the running loop.
+
+        :param coro: The coroutine to run.
+        :return: The new task.
+        """
+        task = get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def cancel(self):
+        """
+        Cancel all the running tasks.
+        """
+        for task in self._tasks:
+            task.cancel()
+
+    def _done(self, task: Task[object]):
+        """
+        :private:
+
+        Forget `task` and report its exception, if any.
+
+        :param task: The task that is done.
+        """
+        self._tasks.discard(task)
+        if not task.cancelled() and (error := task.exception()) is not None:
+            task.get_loop().call_exception_handler({
+                "message": "Unhandled exception in a tcpio callback",
+                "exception": error,
+                "task": task,
+            })
+
+
+__all__ = "Tasks",
@@ -0,0 +1,4 @@
+from .AsyncClient import AsyncClient
+from .AsyncServer import AsyncServer
+
+__all__ = "AsyncClient", "AsyncServer"
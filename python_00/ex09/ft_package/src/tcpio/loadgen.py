@@ -0,0 +1,128 @@
+"""
+Generate load on a `tcpio.Server` running on the local machine, and report
+the throughput and the latency percentiles of its replies.
+
+    python -m tcpio.loadgen localhost:3000 -c 1000 -r 20000 -d 30 \\
+        -e ping -e search:0.2
+
+Each `-e` option adds an event to the mix, with an optional relative
+weight. Every message is emitted with `request`, so the server's
+listeners of those events are expected to be fast, their return value is
+the reply. See `tcpio.LoadGenerator` for the way the load is generated.
+"""
+from argparse import ArgumentParser
+from .LoadGenerator import LoadGenerator
+import json
+import sys
+
+
+def event_weight(spec: str):
+    """
+    :param spec: An event name, optionally followed by `:` and a weight.
+    :return: The event name and its weight, 1 by default.
+    :raise ValueError: If the weight is not a number.
+    """
+    name, _, weight = spec.partition(":")
+    return name, float(weight) if weight else 1.
+
+
+def print_report(report: dict[str, float]):
+    """
+    Print one line of an interval report.
+
+    :param report: The report of the interval (see
+        `tcpio.LoadGenerator.report`).
+    """
+    print(
+        f"{report['elapsed']:>7.1f} {report['sent']:>10} "
+        f"{report['acked']:>10} {report['throughput']:>10.0f} "
+        f"{report['p50'] * 1e3:>9.2f} {report['p99'] * 1e3:>9.2f} "
+        f"{report['timeouts']:>8} {report['errors']:>7}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None):
+    """
+    Run the load generator with the command line arguments `argv`.
+
+    :param argv: The command line arguments, `sys.argv[1:]` by default.
+    :return: The exit status: 1 if some messages were not acknowledged,
+        0 otherwise.
+    """
+    parser = ArgumentParser(
+        prog="python -m tcpio.loadgen",
+        description="Generate load on a tcpio.Server running on the local "
+                    "machine, and report the throughput and the latency "
+                    "percentiles of its replies.",
+    )
+    parser.add_argument("address", help="the address of the server, on a "
+                                        "loopback interface, or "
+                                        "unix:/path/to.sock")
+    parser.add_argument("-c", "--connections", type=int, default=100,
+                        help="the number of connections (default: 100)")
+    parser.add_argument("-r", "--rate", type=float, default=1_000,
+                        help="the messages per second, across all the "
+                             "connections (default: 1000)")
+    parser.add_argument("-d", "--duration", type=float, default=10,
+                        help="the number of seconds to emit messages for "
+                             "(default: 10)")
+    parser.add_argument("-e", "--event", action="append", type=event_weight,
+                        metavar="NAME[:WEIGHT]", dest="events",
+                        help="an event of the mix (default: ping)")
+    parser.add_argument("-s", "--payload", type=int, default=16,
+                        help="the size of the payload of each message, in "
+                             "bytes (default: 16)")
+    parser.add_argument("-t", "--timeout", type=float, default=5,
+                        help="the number of seconds to wait for each reply "
+                             "(default: 5)")
+    parser.add_argument("--codec", default="pickle",
+                        help="the codec of the messages (default: pickle)")
+    parser.add_argument("--seed", type=int,
+                        help="the seed of the random choice of the events")
+    parser.add_argument("--every", type=float, default=1.,
+                        help="the number of seconds between the interval "
+                             "reports (default: 1)")
+    parser.add_argument("--json", action="store_true",
+                        help="print the final report as JSON")
+    args = parser.parse_args(argv)
+    events: dict[str, float] = {}
+    for name, weight in args.events or [("ping", 1.)]:
+        events[name] = events.get(name, 0.) + weight
+    try:
+        generator = LoadGenerator(
+            args.address,
+            connections=args.connections,
+            rate=args.rate,
+            duration=args.duration,
+            events=events,
+            payload=args.payload,
+            timeout=args.timeout,
+            codec=args.codec,
+            seed=args.seed,
+        )
+    except (ValueError, OSError) as error:
+        parser.error(str(error))
+    print(f"{'time s':>7} {'sent':>10} {'acked':>10} {'acked/s':>10} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'timeouts':>8} {'errors':>7}")
+    try:
+        report = generator.run(print_report, args.every)
+    except ConnectionError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\nsent {report['sent']}, acked {report['acked']}, "
+              f"timeouts {report['timeouts']}, errors {report['errors']}, "
+              f"dropped {report['dropped']}")
+        print(f"throughput {report['throughput']:.0f} replies/s")
+        print("latency ms: " + ", ".join(
+            f"{name} {report[name] * 1e3:.2f}"
+            for name in ("p50", "p90", "p99", "p999", "max")
+        ))
+    return 0 if report["acked"] == report["sent"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
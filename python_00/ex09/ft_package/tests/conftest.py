@@ -0,0 +1,106 @@
+"""
+Fixtures shared by the tests of `tcpio`. The servers and the clients of a
+test run in its thread: `pump` runs their event loops in turn.
+"""
+from socket import create_connection, socket
+from time import monotonic
+from typing import Callable, Iterator
+from tcpio import Server, Client
+from tcpio.FrameIO import HANDSHAKE
+from helpers import frame
+import pytest
+
+
+@pytest.fixture
+def pump():
+    """
+    :return: A function that runs the event loops of the given servers and
+        clients in turn, until `until()` is true or `timeout` seconds
+        passed, and returns whether `until()` became true.
+    """
+    def pump(
+            *loops: Server | Client,
+            until: Callable[[], object] = lambda: False,
+            timeout: float = 2,
+    ):
+        deadline = monotonic() + timeout
+        while monotonic() < deadline:
+            for loop in loops:
+                loop.sleep(0.002)
+            if until():
+                return True
+        return False
+    return pump
+
+
+@pytest.fixture
+def make_server() -> Iterator[Callable[..., Server]]:
+    """
+    :return: A function that starts a server on a free port of 127.0.0.1
+        with the given options. The servers are closed after the test.
+    """
+    servers: list[Server] = []
+
+    def make_server(**options: object):
+        server = Server("127.0.0.1:0", handle_sigint=False, **options)
+        server.start()
+        servers.append(server)
+        return server
+    yield make_server
+    for server in servers:
+        server.stop()
+        server.socket.close()
+
+
+@pytest.fixture
+def make_client() -> Iterator[Callable[..., Client]]:
+    """
+    :return: A function that connects a client to a server of the test
+        through a socket pair, with the given options. The clients are
+        disconnected after the test.
+    """
+    clients: list[Client] = []
+
+    def make_client(server: Server, **options: object):
+        client = Client(server, handle_sigint=False, **options)
+        assert client.connect()
+        clients.append(client)
+        return client
+    yield make_client
+    for client in clients:
+        client.disconnect()
+        client.socket.close()
+
+
+@pytest.fixture
+def make_peer(pump: Callable[..., bool]) -> Iterator[Callable[..., socket]]:
+    """
+    :return: A function that connects a raw socket to a server, sends the
+        handshake proposing `codec` and waits for the answer. The sockets
+        are closed after the test.
+    """
+    peers: list[socket] = []
+
+    def make_peer(server: Server, codec: str = "json", symbols: str = ""):
+        peer = create_connection(server.socket.getsockname(), timeout=2)
+        peers.append(peer)
+        peer.sendall(frame(HANDSHAKE + codec.encode() + symbols.encode()))
+        expected = frame(HANDSHAKE + codec.encode())
+        received = b""
+
+        def answered():
+            nonlocal received
+            peer.setblocking(False)
+            try:
+                received += peer.recv(len(expected) - len(received))
+            except BlockingIOError:
+                pass
+            finally:
+                peer.setblocking(True)
+            return len(received) == len(expected)
+        assert pump(server, until=answered)
+        assert received == expected
+        return peer
+    yield make_peer
+    for peer in peers:
+        peer.close()
@@ -0,0 +1,33 @@
+"""
+Helpers for the tests of `tcpio` that talk to a server through a raw
+socket.
+"""
+from socket import socket
+import sys
+
+
+def frame(pkt: bytes):
+    """
+    :param pkt: An encoded message.
+    :return: The frame carrying `pkt`, with its size header.
+    """
+    return len(pkt).to_bytes(8, sys.byteorder) + pkt
+
+
+def closed(peer: socket):
+    """
+    :param peer: A raw socket connected to a server.
+    :return: Whether the server closed the connection, ignoring the bytes
+        it still had to send.
+    """
+    peer.setblocking(False)
+    try:
+        while peer.recv(65536):
+            pass
+        return True
+    except BlockingIOError:
+        return False
+    except ConnectionError:
+        return True
+    finally:
+        peer.setblocking(True)
@@ -0,0 +1,111 @@
+from asyncio import run, sleep as async_sleep
+from tcpio import Server
+from tcpio.aio import AsyncServer, AsyncClient
+import pytest
+
+
+def test_ack_receives_the_reply(make_server, make_client, pump):
+    server = make_server()
+    server.on("add", lambda client, a, b: a + b)
+    client = make_client(server)
+    replies = []
+    client.request("add", 1, 2, ack=replies.append)
+    assert pump(server, client, until=lambda: replies)
+    assert replies == [3]
+
+
+def test_emit_passes_ack_and_timeout_through(make_server, make_client, pump):
+    server = make_server()
+    received = []
+    server.on("options", lambda client, **options: received.append(options))
+    client = make_client(server)
+    client.emit("options", ack="yes", timeout=3)
+    assert pump(server, client, until=lambda: received)
+    assert received == [{"ack": "yes", "timeout": 3}]
+    assert not client._acks
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_offloaded_listener_replies(make_server, make_client, pump, fail):
+    server = make_server()
+    errors, replies = [], []
+    server.on("error", errors.append)
+
+    @server.on(threaded=True)
+    def divide(client: Server.Client, a: int, b: int):
+        return a / b
+
+    client = make_client(server)
+    client.request("divide", 1, 0 if fail else 2, ack=replies.append)
+    assert pump(server, client, until=lambda: replies)
+    if fail:
+        assert isinstance(replies[0], RuntimeError)
+        assert "ZeroDivisionError" in str(replies[0])
+        assert isinstance(errors[0], ZeroDivisionError)
+    else:
+        assert replies == [0.5]
+        assert not errors
+
+
+def test_unencodable_reply_fails_the_ack(make_server, make_client, pump):
+    server = make_server(codecs=("json",))
+    errors, replies = [], []
+    server.on("error", errors.append)
+    server.on("raw", lambda client: b"raw bytes")
+    client = make_client(server, codec="json")
+    client.request("raw", ack=replies.append)
+    assert pump(server, client, until=lambda: replies)
+    assert isinstance(replies[0], RuntimeError)
+    assert isinstance(errors[0], TypeError)
+    assert client.connected
+
+
+def test_ack_times_out(make_server, make_client, pump):
+    server = make_server()
+    client = make_client(server)
+    replies = []
+    client.request("ignored", ack=replies.append, timeout=0.05)
+    assert pump(client, until=lambda: replies)
+    assert isinstance(replies[0], TimeoutError)
+    pump(server, client, timeout=0.05)
+    assert len(replies) == 1
+
+
+def test_ack_fails_when_the_connection_is_lost(
+        make_server, make_client, pump,
+):
+    server = make_server()
+    connections, replies = [], []
+    server.on("connection", connections.append)
+    client = make_client(server)
+    assert pump(server, client, until=lambda: connections)
+    client.request("ignored", ack=replies.append)
+    server.disconnect(connections[0])
+    assert pump(client, until=lambda: replies)
+    assert isinstance(replies[0], ConnectionError)
+
+
+def test_failed_coroutine_fails_the_ack():
+    async def main():
+        server = AsyncServer("127.0.0.1:0")
+
+        @server.on
+        async def fail(client: AsyncServer.Client):
+            await async_sleep(0)
+            raise KeyError("missing")
+
+        await server.start()
+        port = server.socket.getsockname()[1]
+        client = AsyncClient(f"127.0.0.1:{port}")
+        await client.connect()
+        replies = []
+        client.request("fail", ack=replies.append, timeout=2)
+        while not replies:
+            await async_sleep(0.01)
+        client.disconnect()
+        server.stop()
+        return replies[0]
+
+    reply = run(main())
+    assert isinstance(reply, RuntimeError)
+    assert "KeyError" in str(reply)
@@ -0,0 +1,59 @@
+from asyncio import Event, run, wait_for
+from tcpio.aio import AsyncServer, AsyncClient
+
+
+async def serve():
+    server = AsyncServer("127.0.0.1:0")
+
+    @server.on
+    def connection(client):
+        client.on("ping", lambda value: client.emit("pong", value))
+
+    await server.start()
+    return server, server.socket.getsockname()[1]
+
+
+def test_round_trip():
+    async def main():
+        server, port = await serve()
+        client = AsyncClient(f"127.0.0.1:{port}", codec="json")
+        received, done = [], Event()
+        client.on("pong", lambda value: (received.append(value), done.set()))
+        assert await client.connect()
+        client.emit("ping", 42)
+        await wait_for(done.wait(), 2)
+        client.disconnect()
+        await client.wait()
+        server.stop()
+        return received
+    assert run(main()) == [42]
+
+
+def test_host_names_are_resolved():
+    async def main():
+        server, port = await serve()
+        client = AsyncClient(f"localhost:{port}")
+        connected = await client.connect()
+        client.disconnect()
+        await client.wait()
+        server.stop()
+        return connected
+    assert run(main())
+
+
+def test_failed_attempts_report_connection_errors():
+    async def main():
+        server, port = await serve()
+        server.stop()
+        client = AsyncClient(
+            f"127.0.0.1:{port}",
+            reconnection_attempts=3,
+            reconnection_delay=0.001,
+        )
+        errors = []
+        client.on("error", errors.append)
+        return await client.connect(), errors
+    connected, errors = run(main())
+    assert not connected
+    assert len(errors) == 3
+    assert all(isinstance(error, ConnectionError) for error in errors)
@@ -0,0 +1,72 @@
+from tcpio import Server
+
+
+def payload(n: int):
+    return f"message {n}: " + "the quick brown fox " * 20
+
+
+def congest(connection: Server.Client):
+    """
+    Emit compressible messages on `connection` until one is refused.
+
+    :return: The payloads of the messages that were queued.
+    """
+    queued = []
+    while connection.emit("x", payload(len(queued))):
+        queued.append(payload(len(queued)))
+    return queued
+
+
+def test_refused_messages_leave_the_stream_intact(
+        make_server, make_client, pump,
+):
+    server = make_server(compression_threshold=100, high_watermark=1000)
+    connections = []
+    server.on("connection", connections.append)
+    client = make_client(server)
+    errors, received = [], []
+    client.on("error", errors.append)
+    client.on("x", received.append)
+    client.on("y", lambda value: received.append(("y", value)))
+    assert pump(server, client, until=lambda: connections)
+    connection = connections[0]
+    expected = congest(connection)
+    assert connection.congested
+    assert not connection.emit("y", payload(-1))
+    assert "y" not in connection._out_symbols
+    assert pump(server, client, until=lambda: not connection.congested)
+    assert connection.emit("y", payload(-2))
+    assert connection.emit("x", payload(-3))
+    expected += [("y", payload(-2)), payload(-3)]
+    assert pump(server, client, until=lambda: len(received) == len(expected))
+    assert received == expected
+    assert not errors
+    assert client.connected
+
+
+def test_broadcast_checks_each_client(make_server, make_client, pump):
+    server = make_server(compression_threshold=100, high_watermark=1000)
+    connections = []
+    server.on("connection", connections.append)
+    slow = make_client(server)
+    assert pump(server, slow, until=lambda: connections)
+    fast = make_client(server)
+    assert pump(server, fast, until=lambda: len(connections) == 2)
+    errors, received = [], ([], [])
+    for client, messages in zip((slow, fast), received):
+        client.on("error", errors.append)
+        client.on("x", messages.append)
+        client.on("y", lambda value, messages=messages: messages.append(
+            ("y", value),
+        ))
+    expected = congest(connections[0])
+    server.emit("y", payload(-1))
+    assert "y" not in connections[0]._out_symbols
+    assert pump(server, slow, fast, until=lambda: not connections[0].congested)
+    server.emit("y", payload(-2))
+    assert pump(server, slow, fast, until=lambda: (
+        len(received[0]) == len(expected) + 1 and len(received[1]) == 2
+    ))
+    assert received[0] == expected + [("y", payload(-2))]
+    assert received[1] == [("y", payload(-1)), ("y", payload(-2))]
+    assert not errors
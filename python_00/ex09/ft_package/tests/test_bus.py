@@ -0,0 +1,55 @@
+from multiprocessing import get_context
+from socket import socket
+from tcpio import Server, Client
+import os
+import signal
+
+
+def serve(port: int):
+    server = Server(f"127.0.0.1:{port}", codecs=("pickle", "json"))
+
+    @server.on
+    def whoami(client: Server.Client):
+        return os.getpid()
+
+    @server.on
+    def shout(client: Server.Client):
+        server.emit("heard", b"raw bytes")
+        server.emit("heard", "text")
+
+    server.start(block=True, workers=2)
+
+
+def test_bus_only_encodes_for_the_codecs_in_use(pump):
+    with socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    supervisor = get_context("fork").Process(target=serve, args=(port,))
+    supervisor.start()
+    clients: list[Client] = []
+    pids: set[int] = set()
+    heard: list[list[object]] = []
+    try:
+        for codec in ("json", *("pickle",) * 16):
+            client = Client(
+                f"127.0.0.1:{port}", codec=codec, handle_sigint=False,
+            )
+            assert client.connect()
+            clients.append(client)
+            heard.append([])
+            client.on("heard", heard[-1].append)
+            client.request("whoami", ack=pids.add)
+        assert pump(*clients, until=lambda: len(pids) == 2)
+        clients[1].emit("shout")
+        assert pump(*clients, until=lambda: heard[0] and all(
+            len(messages) == 2 for messages in heard[1:]
+        ))
+        assert heard[0] == ["text"]
+        assert heard[1:] == [[b"raw bytes", "text"]] * 16
+        assert all(client.connected for client in clients)
+    finally:
+        for client in clients:
+            client.disconnect()
+            client.socket.close()
+        os.kill(supervisor.pid, signal.SIGINT)
+        supervisor.join(5)
@@ -0,0 +1,64 @@
+from tcpio import Client
+from tcpio.Codec import CODECS, get_codec
+import pytest
+
+VALUES = [None, True, False, 0, -1, 2 ** 70, -2 ** 70, 1.5, "héllo",
+          [1, [2, "three"]], {"k": {"nested": None}}]
+
+
+@pytest.mark.parametrize("name", CODECS)
+@pytest.mark.parametrize("event", ["hello", 3, (3, "hello")])
+def test_codec_round_trip(name, event):
+    codec = get_codec(name)
+    message = codec.decode(memoryview(
+        codec.encode(event, tuple(VALUES), {"values": VALUES}, 42)
+    ))
+    assert message.event == event
+    assert list(message.args) == VALUES
+    assert message.kwargs == {"values": VALUES}
+    assert message.ack == 42
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_round_trip_without_ack(name):
+    codec = get_codec(name)
+    message = codec.decode(memoryview(codec.encode(None, ("reply",), {})))
+    assert message.event is None and message.ack is None
+    assert list(message.args) == ["reply"] and message.kwargs == {}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_over_a_connection(name, make_server, make_client, pump):
+    server = make_server()
+    server.on("echo", lambda client, *args, **kwargs: [args, kwargs])
+    client = make_client(server, codec=name)
+    replies = []
+    client.request("echo", *VALUES, values=VALUES, ack=replies.append)
+    assert pump(server, client, until=lambda: replies)
+    args, kwargs = replies[0]
+    assert list(args) == VALUES and kwargs == {"values": VALUES}
+    assert server.clients[0]._codec.name == name
+
+
+def test_binary_codec_rejects_unsupported_types():
+    with pytest.raises(TypeError):
+        get_codec("binary").encode("hello", (object(),), {})
+
+
+def test_unknown_codec_name():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_unsupported_codec_is_refused(make_server, pump):
+    server = make_server(codecs=["json"])
+    server_errors, client_errors = [], []
+    server.on("error", server_errors.append)
+    client = Client(server, handle_sigint=False)
+    client.on("error", client_errors.append)
+    client.connect()
+    assert pump(server, client, until=lambda: client_errors)
+    assert isinstance(client_errors[0], ConnectionRefusedError)
+    assert isinstance(server_errors[0], ConnectionRefusedError)
+    assert pump(client, until=lambda: not client.connected)
+    client.socket.close()
@@ -0,0 +1,87 @@
+from tcpio.Compression import Compression
+from tcpio.FrameIO import COMPRESSED, HANDSHAKE
+from tcpio.SocketIO import SocketIO
+from helpers import frame, closed
+import pytest
+import sys
+import zlib
+
+
+def test_compression_threshold():
+    assert not Compression().should_compress(1 << 20)
+    compression = Compression(64)
+    assert not compression.should_compress(63)
+    assert compression.should_compress(64)
+
+
+def test_compression_streams_span_frames():
+    sender, receiver = Compression(0), Compression(0)
+    payloads = [b"hello world " * 100, b"hello world " * 100, b"bye"]
+    compressed = [sender.compress(payload) for payload in payloads]
+    assert len(compressed[1]) < len(compressed[0])
+    assert [bytes(receiver.decompress(memoryview(data)))
+            for data in compressed] == payloads
+
+
+def test_decompression_is_bounded():
+    compression = Compression(max_size=1 << 10)
+    with pytest.raises(ValueError):
+        compression.decompress(memoryview(zlib.compress(bytes(1 << 20))))
+    assert Compression(max_size=1 << 10).decompress(
+        memoryview(zlib.compress(bytes(1 << 10)))
+    ) == bytes(1 << 10)
+
+
+def test_compression_bomb_closes_the_connection(make_server, make_peer,
+                                                pump):
+    server = make_server()
+    errors = []
+    server.on("error", errors.append)
+    peer = make_peer(server)
+    bomb = zlib.compress(bytes(server.clients[0]._compression.max_size + 1))
+    peer.sendall((len(bomb) | COMPRESSED).to_bytes(8, sys.byteorder) + bomb)
+    assert pump(server, until=lambda: errors)
+    assert isinstance(errors[0], ValueError)
+    assert not server.clients
+    assert closed(peer)
+
+
+def test_compressed_frames_are_not_resent():
+    header = (COMPRESSED | 3).to_bytes(8, sys.byteorder)
+    assert not SocketIO._resendable(memoryview(header + b"abc"))
+    assert not SocketIO._resendable(memoryview(frame(HANDSHAKE + b"json")))
+    assert SocketIO._resendable(memoryview(frame(b"plain")))
+
+
+def test_compressed_round_trip(make_server, make_client, pump):
+    server = make_server(compression_threshold=64)
+    server.on("echo", lambda client, data: client.emit("echo", data))
+    client = make_client(server, compression_threshold=64)
+    payloads = ["short", "word " * 10_000, "other " * 50_000, "short"]
+    received = []
+    client.on("echo", received.append)
+    client.emit("echo", payloads[0])
+    assert pump(server, client, until=lambda: received)
+    assert client._compression._compressor is None
+    for payload in payloads[1:]:
+        client.emit("echo", payload)
+    assert pump(server, client, until=lambda: len(received) == 4)
+    assert received == payloads
+    assert client._compression._decompressor is not None
+    assert server.clients[0]._compression._decompressor is not None
+
+
+def test_compression_restarts_on_reconnection(make_server, make_client,
+                                              pump):
+    server = make_server(compression_threshold=64)
+    received = []
+    server.on("echo", lambda client, data: received.append(data))
+    client = make_client(server, compression_threshold=64)
+    client.emit("echo", "first " * 1_000)
+    assert pump(server, client, until=lambda: received)
+    server.disconnect(server.clients[0])
+    assert pump(client, until=lambda: not client.connected)
+    assert client.connect()
+    client.emit("echo", "second " * 1_000)
+    assert pump(server, client, until=lambda: len(received) == 2)
+    assert received == ["first " * 1_000, "second " * 1_000]
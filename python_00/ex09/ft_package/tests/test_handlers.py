@@ -0,0 +1,79 @@
+from tcpio.Handlers import Handlers
+
+
+def trigger(handlers: Handlers, event: str, *args: object):
+    return [callback(*args) for callback in handlers.listeners(event)]
+
+
+def test_patterns_match_longer_names_only():
+    handlers = Handlers()
+    handlers.add("chat.*", lambda event: f"pattern {event}")
+    handlers.add("chat", lambda: "name")
+    assert trigger(handlers, "chat") == ["name"]
+    assert trigger(handlers, "chat.message") == ["pattern chat.message"]
+    assert trigger(handlers, "chat.room.join") == ["pattern chat.room.join"]
+    assert trigger(handlers, "chatter") == []
+
+
+def test_wildcard_matches_everything():
+    handlers = Handlers()
+    handlers.add("*", lambda event: event)
+    assert trigger(handlers, "chat") == ["chat"]
+    assert trigger(handlers, "chat.message") == ["chat.message"]
+
+
+def test_registration_order_across_patterns():
+    handlers = Handlers()
+    handlers.add("chat.room.*", lambda event: 1)
+    handlers.add("chat.room.join", lambda: 2)
+    handlers.add("*", lambda event: 3)
+    handlers.add("chat.*", lambda event: 4)
+    handlers.add("chat.room.join", lambda: 5)
+    assert trigger(handlers, "chat.room.join") == [1, 2, 3, 4, 5]
+    assert trigger(handlers, "chat.room.leave") == [1, 3, 4]
+    assert trigger(handlers, "chat") == [3]
+
+
+def test_remove_during_trigger():
+    handlers = Handlers()
+    calls = []
+    second = handlers.add("chat.*", lambda event: calls.append(2))
+
+    def first(event: str):
+        calls.append(1)
+        second.remove()
+
+    handlers.add("chat.*", first)
+    handlers.add("chat.message", lambda: calls.append(3))
+    # `first` was registered after `second`, so the snapshot being
+    # triggered still calls `second`, the next trigger does not.
+    trigger(handlers, "chat.message")
+    trigger(handlers, "chat.message")
+    assert calls == [2, 1, 3, 1, 3]
+    assert not second.active
+
+
+def test_remove_own_listener_during_trigger():
+    handlers = Handlers()
+    calls = []
+
+    def once():
+        calls.append("once")
+        handle.remove()
+
+    handle = handlers.add("chat", once)
+    handlers.add("chat", lambda: calls.append("always"))
+    trigger(handlers, "chat")
+    trigger(handlers, "chat")
+    assert calls == ["once", "always", "always"]
+
+
+def test_removed_patterns_drop_their_nodes():
+    handlers = Handlers()
+    handle = handlers.add("chat.room.*", lambda event: None)
+    handlers.remove_event("chat.*")
+    assert handle.active
+    handle.remove()
+    assert not handlers._patterns.children
+    handlers.remove_event("chat.room.*")
+    assert trigger(handlers, "chat.room.join") == []
@@ -0,0 +1,29 @@
+from tcpio.FrameIO import PING, PONG
+from helpers import closed
+
+
+def test_ping_is_answered(make_server, make_peer, pump):
+    server = make_server()
+    peer = make_peer(server)
+    peer.sendall(PING)
+    pump(server, timeout=0.05)
+    assert peer.recv(len(PONG)) == PONG
+
+
+def test_silent_peers_are_reaped(make_server, make_peer, pump):
+    server = make_server(heartbeat_interval=0.02, heartbeat_misses=1)
+    errors = []
+    server.on("error", errors.append)
+    peer = make_peer(server)
+    assert pump(server, until=lambda: server.reaped == 1)
+    assert not server.clients
+    assert isinstance(errors[0], TimeoutError)
+    assert closed(peer)
+
+
+def test_live_clients_are_kept(make_server, make_client, pump):
+    server = make_server(heartbeat_interval=0.02, heartbeat_misses=1)
+    client = make_client(server)
+    pump(server, client, timeout=0.2)
+    assert server.reaped == 0
+    assert client.connected and len(server.clients) == 1
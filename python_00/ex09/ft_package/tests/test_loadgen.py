@@ -0,0 +1,39 @@
+from pathlib import Path
+from threading import Thread
+from tcpio import Server
+from tcpio.LoadGenerator import LoadGenerator
+import os
+import pytest
+import subprocess
+import sys
+import tcpio
+
+
+def test_help_without_docstrings():
+    env = {**os.environ, "PYTHONPATH": str(Path(tcpio.__file__).parents[1])}
+    result = subprocess.run(
+        [sys.executable, "-OO", "-m", "tcpio.loadgen", "--help"],
+        capture_output=True, text=True, env=env, timeout=30,
+    )
+    assert result.returncode == 0
+    assert "Generate load" in result.stdout
+
+
+@pytest.mark.parametrize("reports", [False, True])
+def test_run(reports):
+    server = Server("127.0.0.1:0", handle_sigint=False)
+    server.on("ping", lambda client, data: len(data))
+    server.start()
+    thread = Thread(target=server.wait)
+    thread.start()
+    host, port = server.socket.getsockname()
+    intervals = []
+    try:
+        report = LoadGenerator(
+            f"{host}:{port}", connections=2, rate=200, duration=0.2,
+        ).run(intervals.append if reports else None, every=0.05)
+    finally:
+        server.stop()
+        thread.join()
+    assert report["sent"] == report["acked"] > 0
+    assert bool(intervals) == reports
@@ -0,0 +1,43 @@
+from tcpio.FrameIO import COMPRESSED
+from helpers import frame, closed
+import marshal
+import pickle
+import pytest
+import sys
+
+MALFORMED = [
+    ("json", frame(b"not json")),
+    ("json", frame(b'["hello"]')),
+    ("json", frame(b'["hello",[],[]]')),
+    ("json", frame(b'["hello",[],{},"1"]')),
+    ("json", frame(b'[1.5,[],{}]')),
+    ("json", frame(b'[[0],[],{}]')),
+    ("json", frame(b'[[0,"hello","world"],[],{}]')),
+    ("binary", frame(b"\xff")),
+    ("binary", frame(b"s\x05hellot\x00m\x00i\x02N")),
+    ("pickle", frame(pickle.dumps(("hello", (), {1: 2})))),
+    ("pickle", frame(pickle.dumps(("hello", 5, {})))),
+    ("pickle", frame(pickle.dumps(((0, b"hello"), (), {})))),
+    ("marshal", frame(b"garbage")),
+    ("json", (5 | COMPRESSED).to_bytes(8, sys.byteorder) + b"12345"),
+]
+
+
+@pytest.mark.parametrize("codec, data", MALFORMED)
+def test_malformed_frame_closes_the_connection(
+        make_server, make_client, make_peer, pump, codec, data,
+):
+    server = make_server(collect_stats=True)
+    errors, received = [], []
+    server.on("error", errors.append)
+    server.on("hello", lambda client: received.append(client))
+    peer = make_peer(server, codec)
+    client = make_client(server)
+    peer.sendall(data)
+    assert pump(server, until=lambda: errors)
+    assert pump(server, until=lambda: closed(peer))
+    assert not received
+    assert server.stats()["decode_errors"] == 1
+    client.emit("hello")
+    assert pump(server, client, until=lambda: received)
+    assert server.clients == [received[0]]
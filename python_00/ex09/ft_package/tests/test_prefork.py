@@ -0,0 +1,78 @@
+from multiprocessing import get_context
+from socket import socket
+from time import monotonic
+from tcpio import Server, Client
+import os
+import signal
+import pytest
+
+
+def serve(port: int):
+    server = Server(f"127.0.0.1:{port}")
+    server.on("double", lambda client, value: value * 2)
+    server.on("whoami", lambda client: os.getpid())
+    server.start(block=True, workers=2)
+
+
+@pytest.fixture
+def supervisor():
+    with socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = get_context("fork").Process(target=serve, args=(port,))
+    process.start()
+    yield process, port
+    if process.is_alive():
+        os.kill(process.pid, signal.SIGINT)
+        process.join(5)
+
+
+def ask(port: int, pump, event: str, *args: object):
+    client = Client(f"127.0.0.1:{port}", handle_sigint=False)
+    replies = []
+    try:
+        if not client.connect():
+            return None
+        client.request(event, *args, ack=replies.append)
+        pump(client, until=lambda: replies)
+    finally:
+        client.disconnect()
+        client.socket.close()
+    return replies[0] if replies else None
+
+
+def workers(port: int, pump, count: int = 20):
+    return {ask(port, pump, "whoami") for _ in range(count)} - {None}
+
+
+def test_workers_share_the_address(supervisor, pump):
+    process, port = supervisor
+    assert ask(port, pump, "double", 21) == 42
+    pids = workers(port, pump)
+    assert len(pids) == 2 and process.pid not in pids
+
+
+def test_crashed_workers_are_restarted(supervisor, pump):
+    process, port = supervisor
+    pids = workers(port, pump)
+    assert len(pids) == 2
+    victim = pids.pop()
+    os.kill(victim, signal.SIGKILL)
+    deadline = monotonic() + 5
+    while monotonic() < deadline:
+        current = workers(port, pump, 10)
+        if len(current) == 2 and victim not in current:
+            break
+    assert len(current) == 2 and victim not in current
+    assert ask(port, pump, "double", 4) == 8
+
+
+def test_sigint_stops_the_workers(supervisor, pump):
+    process, port = supervisor
+    pids = workers(port, pump)
+    os.kill(process.pid, signal.SIGINT)
+    process.join(5)
+    assert process.exitcode is not None
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
@@ -0,0 +1,88 @@
+from socket import socket
+from typing import Iterator
+from tcpio import Client, ClientPool
+from tcpio.Backoff import Backoff
+import pytest
+
+
+@pytest.fixture
+def refused() -> Iterator[str]:
+    """
+    :return: The address of a port of 127.0.0.1 that refuses connections.
+    """
+    with socket() as bound:
+        bound.bind(("127.0.0.1", 0))
+        yield f"127.0.0.1:{bound.getsockname()[1]}"
+
+
+def test_backoff_doubles_up_to_its_maximum():
+    backoff = Backoff(0, 1, 4)
+    for nominal in 1, 2, 4, 4:
+        assert nominal / 2 <= backoff.next_delay() <= nominal
+    backoff.reset()
+    assert 0.5 <= backoff.next_delay() <= 1
+
+
+def test_backoff_counts_failures():
+    backoff = Backoff(2)
+    assert not backoff.fail()
+    assert backoff.fail()
+    backoff.reset()
+    assert backoff.failures == 0
+    assert not Backoff(0).fail()
+
+
+def test_client_gives_up_after_its_attempts(refused):
+    client = Client(
+        refused,
+        handle_sigint=False,
+        reconnection_attempts=3,
+        reconnection_delay=0.01,
+    )
+    errors = []
+    client.on("error", errors.append)
+    assert not client.connect()
+    assert len(errors) == 3
+    assert all(isinstance(error, ConnectionError) for error in errors)
+
+
+def test_pool_gives_up_after_its_attempts(refused, pump):
+    pool = ClientPool(
+        handle_sigint=False,
+        reconnection_attempts=2,
+        reconnection_delay=0.01,
+    )
+    errors = []
+    pool.on("error", errors.append)
+    connection = pool.connect(refused)
+    assert pump(pool, until=lambda: connection.closed)
+    assert len(errors) == 2
+    assert not pool.connections
+
+
+def test_pool_reconnects_lost_connections(make_server, pump):
+    server = make_server()
+    pool = ClientPool(handle_sigint=False, reconnection_delay=0.01)
+    connects = []
+    pool.on("connect", connects.append)
+    server.on("connection", lambda client: client.disconnect())
+    connection = pool.connect(f"127.0.0.1:{server.socket.getsockname()[1]}")
+    assert pump(server, pool, until=lambda: len(connects) >= 3)
+    assert connects[:3] == [connection] * 3
+    pool.close()
+
+
+def test_pool_disconnects_for_good(make_server, pump):
+    server = make_server()
+    pool = ClientPool(handle_sigint=False, reconnection_delay=0.01)
+    disconnects = []
+    pool.on("disconnect", disconnects.append)
+    connection = pool.connect(f"127.0.0.1:{server.socket.getsockname()[1]}")
+    assert pump(server, pool, until=lambda: connection.connected)
+    pool.disconnect(connection)
+    assert connection.closed and not connection.connected
+    assert disconnects == [connection] and not pool.connections
+    connection.connect()
+    pump(server, pool, timeout=0.05)
+    assert not connection.connected
+    pool.close()
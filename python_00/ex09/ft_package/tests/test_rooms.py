@@ -0,0 +1,65 @@
+from tcpio.Rooms import Rooms
+
+
+def test_rooms_are_indexed_both_ways():
+    rooms: Rooms[str] = Rooms()
+    rooms.join("alice", "a")
+    rooms.join("alice", "b")
+    rooms.join("bob", "b")
+    assert rooms.rooms_of("alice") == {"a", "b"}
+    assert sorted(rooms.members(["a", "b"])) == ["alice", "bob"]
+    rooms.leave("alice", "a")
+    assert rooms.members(["a"]) == []
+    rooms.leave_all("bob")
+    assert rooms.members(["b"]) == ["alice"]
+    rooms.leave_all("alice")
+    assert not rooms._members and not rooms._memberships
+
+
+def test_emit_to_rooms(make_server, make_client, pump):
+    server = make_server()
+    connected = []
+    server.on("connection", connected.append)
+    clients = []
+    for _ in range(4):
+        clients.append(make_client(server))
+        assert pump(server, *clients,
+                    until=lambda: len(connected) == len(clients))
+    received = [[] for _ in clients]
+    for client, messages in zip(clients, received):
+        client.on("message", messages.append)
+    first, second, third, _ = connected
+    first.join("a")
+    second.join("a")
+    second.join("b")
+    third.join("b")
+    server.to("a").to("b").emit("message", "ab")
+    server.to("a").emit("message", "a")
+    first.to("b").emit("message", "from first")
+    second.to("a").emit("message", "from second")
+    assert pump(server, *clients, until=lambda: len(received[0]) == 3)
+    pump(server, *clients, timeout=0.05)
+    assert received == [
+        ["ab", "a", "from second"],
+        ["ab", "a", "from first"],
+        ["ab", "from first"],
+        [],
+    ]
+
+
+def test_clients_leave_their_rooms(make_server, make_client, pump):
+    server = make_server()
+    connected = []
+    server.on("connection", connected.append)
+    clients = [make_client(server) for _ in range(2)]
+    assert pump(server, *clients, until=lambda: len(connected) == 2)
+    first, second = connected
+    first.join("a")
+    second.join("a")
+    assert first.rooms == {"a"}
+    first.leave("a")
+    assert not first.rooms
+    assert server.to("a").clients == [second]
+    server.disconnect(second)
+    assert pump(server, *clients, until=lambda: not clients[1].connected)
+    assert server.to("a").clients == []
@@ -0,0 +1,62 @@
+from socket import socketpair
+from tcpio import Client
+from tcpio.Selector import PREFERENCE, BACKENDS, READ, WRITE, ERROR, \
+    make_selector
+import pytest
+
+backends = pytest.mark.parametrize("backend", list(BACKENDS))
+
+
+def test_unknown_backend_is_refused():
+    with pytest.raises(ValueError):
+        make_selector("kqueue")
+
+
+def test_best_backend_is_preferred():
+    assert make_selector().name == next(
+        name for name in PREFERENCE if name in BACKENDS
+    )
+
+
+@backends
+def test_selector_reports_events(backend):
+    selector = make_selector(backend)
+    left, right = socketpair()
+    try:
+        selector.register(left.fileno(), READ | WRITE)
+        assert selector.select(0) == [(left.fileno(), WRITE)]
+        selector.modify(left.fileno(), READ)
+        assert selector.select(0) == []
+        right.sendall(b"x")
+        assert selector.select(1) == [(left.fileno(), READ)]
+        assert left.recv(1) == b"x"
+        right.close()
+        [(fd, events)] = selector.select(1)
+        assert fd == left.fileno() and events & READ
+        assert backend == "select" or events & ERROR
+        selector.unregister(left.fileno())
+        assert selector.select(0) == []
+    finally:
+        selector.close()
+        left.close()
+        right.close()
+
+
+@backends
+def test_round_trip(make_server, make_client, pump, backend):
+    server = make_server(backend=backend)
+    server.on("double", lambda client, value: value * 2)
+    clients = [make_client(server, backend=backend) for _ in range(2)]
+    host, port = server.socket.getsockname()
+    tcp = Client(f"{host}:{port}", handle_sigint=False, backend=backend)
+    assert tcp.connect()
+    clients.append(tcp)
+    replies = []
+    for value, client in enumerate(clients):
+        client.request("double", value, ack=replies.append)
+    assert pump(server, *clients, until=lambda: len(replies) == 3)
+    assert sorted(replies) == [0, 2, 4]
+    server.disconnect(server.clients[0])
+    assert pump(server, *clients,
+                until=lambda: sum(c.connected for c in clients) == 2)
+    tcp.disconnect()
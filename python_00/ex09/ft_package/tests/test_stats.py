@@ -0,0 +1,24 @@
+from tcpio.Stats import Histogram, Stats, MAX_EVENTS, OTHER_EVENTS
+
+
+def test_empty_histogram_quantile():
+    assert Histogram((1., 2.)).quantile(0.5) == 0.
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((1., 2., 4.))
+    for value in 0.5, 1.5, 1.5, 3., 10.:
+        histogram.record(value)
+    assert histogram.quantile(0) == 1.
+    assert histogram.quantile(0.2) == 1.
+    assert histogram.quantile(0.5) == 2.
+    assert histogram.quantile(0.8) == 4.
+    assert histogram.quantile(1) == float("inf")
+
+
+def test_event_names_are_bounded():
+    stats = Stats()
+    for index in range(MAX_EVENTS + 10):
+        stats.sent(f"event-{index}", 1)
+    assert len(stats.snapshot()["events"]) <= MAX_EVENTS + 1
+    assert OTHER_EVENTS in stats.snapshot()["events"]
@@ -0,0 +1,85 @@
+from tcpio import Client
+from tcpio.FrameIO import MAX_SYMBOLS
+from helpers import frame, closed
+
+
+def test_event_names_are_interned(make_server, make_client, pump):
+    server = make_server()
+    received = []
+    server.on("hello", lambda client, name: received.append(name))
+    client = make_client(server)
+    for name in "abc":
+        client.emit("hello", name)
+    assert pump(server, client, until=lambda: len(received) == 3)
+    assert received == ["a", "b", "c"]
+    assert client._out_symbols == {"hello": 0}
+    assert server.clients[0]._in_symbols == ["hello"]
+
+
+def test_symbols_survive_reconnection(make_server, make_client, pump):
+    server = make_server()
+    received = []
+    server.on("hello", lambda client, name: received.append(name))
+    client = make_client(server)
+    client.emit("hello", "first")
+    assert pump(server, client, until=lambda: received)
+    server.disconnect(server.clients[0])
+    assert pump(client, until=lambda: not client.connected)
+    assert client.connect()
+    client.emit("hello", "second")
+    assert pump(server, client, until=lambda: len(received) == 2)
+    assert received == ["first", "second"]
+    assert server.clients[0]._in_symbols == ["hello"]
+
+
+def test_undefined_symbol_is_a_protocol_error(make_server, make_peer, pump):
+    server = make_server()
+    errors = []
+    server.on("error", errors.append)
+    peer = make_peer(server)
+    peer.sendall(frame(b'[7,[],{}]'))
+    assert pump(server, until=lambda: errors)
+    assert isinstance(errors[0], ValueError)
+    assert "undefined symbol" in str(errors[0])
+    assert pump(server, until=lambda: closed(peer))
+    assert not server.clients
+
+
+def test_symbols_are_defined_in_order(make_server, make_peer, pump):
+    server = make_server()
+    errors, received = [], []
+    server.on("error", errors.append)
+    server.on("hello", lambda client: received.append(client))
+    peer = make_peer(server)
+    peer.sendall(frame(b'[[0,"hello"],[],{}]') + frame(b'[0,[],{}]') +
+                 frame(b'[[2,"skipped"],[],{}]'))
+    assert pump(server, until=lambda: errors)
+    assert len(received) == 2
+    assert isinstance(errors[0], ValueError)
+    assert pump(server, until=lambda: closed(peer))
+
+
+def test_symbol_table_is_bounded(make_server, make_peer, pump):
+    server = make_server()
+    errors = []
+    server.on("error", errors.append)
+    names = "".join(f"\0e{symbol}" for symbol in range(MAX_SYMBOLS))
+    peer = make_peer(server, symbols=names)
+    peer.sendall(frame(f'[[{MAX_SYMBOLS},"over"],[],{{}}]'.encode()))
+    assert pump(server, until=lambda: errors)
+    assert isinstance(errors[0], ValueError)
+    assert pump(server, until=lambda: closed(peer))
+
+
+def test_handshake_symbols_are_bounded(make_server, pump):
+    server = make_server()
+    errors = []
+    server.on("error", errors.append)
+    client = Client(server, handle_sigint=False)
+    client._out_symbols = {
+        f"e{symbol}": symbol for symbol in range(MAX_SYMBOLS + 1)
+    }
+    client.connect()
+    assert pump(server, client, until=lambda: errors)
+    assert isinstance(errors[0], ValueError)
+    assert pump(client, until=lambda: not client.connected)
@@ -0,0 +1,37 @@
+from threading import Thread
+from tcpio import ClientPool
+
+
+def test_call_later_and_call_every(make_server, pump):
+    server = make_server()
+    calls = []
+    server.call_later(0.02, calls.append, "later")
+    cancelled = server.call_later(0.01, calls.append, "cancelled")
+    cancelled.cancel()
+    ticker = server.call_every(0.01, calls.append, "tick")
+    assert pump(server, until=lambda: calls.count("tick") >= 3)
+    ticker.cancel()
+    pump(server, timeout=0.05)
+    ticks = calls.count("tick")
+    pump(server, timeout=0.05)
+    assert calls.count("tick") == ticks
+    assert "later" in calls and "cancelled" not in calls
+
+
+def test_timers_scheduled_from_another_thread(make_server, make_client, pump):
+    server = make_server()
+    client = make_client(server)
+    pool = ClientPool(handle_sigint=False)
+    calls = []
+    pump(server, client, timeout=0.01)
+    pool.sleep(0.01)
+    threads = [
+        Thread(target=loop.call_later, args=(0, calls.append, loop))
+        for loop in (server, client, pool)
+    ]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    assert not calls
+    assert pump(server, client, pool, until=lambda: len(calls) == 3)
+    assert calls == [server, client, pool]
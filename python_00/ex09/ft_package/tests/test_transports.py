@@ -0,0 +1,54 @@
+from pathlib import Path
+from socket import socket, AF_UNIX
+from tcpio import Server, Client
+import os
+
+
+def round_trip(server: Server, client: Client, pump):
+    replies = []
+    client.request("double", 21, ack=replies.append)
+    assert pump(server, client, until=lambda: replies)
+    return replies[0]
+
+
+def test_tcp_server_is_not_unix(make_server):
+    server = make_server()
+    assert not server._unix
+
+
+def test_socket_pair_round_trip(make_server, make_client, pump):
+    server = make_server()
+    server.on("double", lambda client, value: value * 2)
+    client = make_client(server)
+    assert round_trip(server, client, pump) == 42
+
+
+def test_unix_socket_round_trip(tmp_path: Path, pump):
+    path = tmp_path / "tcpio.sock"
+    server = Server(f"unix:{path}", handle_sigint=False)
+    server.on("double", lambda client, value: value * 2)
+    server.start()
+    assert server._unix and path.exists()
+    client = Client(f"unix:{path}", handle_sigint=False)
+    assert client.connect()
+    assert round_trip(server, client, pump) == 42
+    client.disconnect()
+    server.stop()
+    server._atexit()
+    assert not path.exists()
+
+
+def test_stale_unix_socket_is_replaced(tmp_path: Path, pump):
+    path = tmp_path / "tcpio.sock"
+    with socket(AF_UNIX) as stale:
+        stale.bind(str(path))
+    server = Server(f"unix:{path}", handle_sigint=False)
+    server.on("double", lambda client, value: value * 2)
+    server.start()
+    client = Client(f"unix:{path}", handle_sigint=False)
+    assert client.connect()
+    assert round_trip(server, client, pump) == 42
+    client.disconnect()
+    server.stop()
+    server._atexit()
+    assert not os.path.exists(path)